@@ -0,0 +1,19 @@
+//SPDX-License-Identifier: MPL-2.0
+pragma solidity 0.8.13;
+
+/**
+ * @title  MockRegistry
+ * @notice Local stand-in for the Yearn registry, returning whichever vault was last set for a token.
+ */
+contract MockRegistry {
+
+    // the vault returned by latestVault, mapped by the token it accepts
+    mapping(address => address) public latestVault;
+
+    event NewVault(address indexed token, address vault);
+
+    function setLatestVault(address _token, address _vault) external {
+        latestVault[_token] = _vault;
+        emit NewVault(_token, _vault);
+    }
+}
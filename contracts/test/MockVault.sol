@@ -0,0 +1,101 @@
+//SPDX-License-Identifier: MPL-2.0
+pragma solidity 0.8.13;
+
+import "../ERC20.sol";
+import "../SafeTransferLib.sol";
+
+interface I_Mintable {
+    function mint(address, uint256) external;
+
+    function burn(address, uint256) external;
+}
+
+/**
+ * @title  MockVault
+ * @notice Local stand-in for a Yearn v2 vault, so the yield paths of DeSchool can be
+ *         tested without forking mainnet. Shares are priced against the underlying
+ *         held by the vault, and yield is simulated by minting underlying into it,
+ *         which requires the vault to be a ward of the (test) DAI contract.
+ */
+contract MockVault is ERC20 {
+
+    ERC20 public immutable token;
+    // yield added to the vault's assets on every harvest, in basis points
+    uint256 public yieldPerHarvest;
+
+    event Harvested(uint256 yieldAdded, uint256 pricePerShare);
+
+    constructor(address _token, uint256 _yieldPerHarvest) ERC20("Mock Yearn DAI", "yvDAI", 18) {
+        token = ERC20(_token);
+        yieldPerHarvest = _yieldPerHarvest;
+    }
+
+    /**
+     * @notice deposit underlying and receive shares at the current share price
+     * @param  _amount amount of underlying to deposit
+     * @return shares  amount of shares minted to the sender
+     */
+    function deposit(uint256 _amount) external returns (uint256 shares) {
+        if (totalSupply == 0) {
+            shares = _amount;
+        } else {
+            shares = (_amount * totalSupply) / totalAssets();
+        }
+        _mint(msg.sender, shares);
+        SafeTransferLib.safeTransferFrom(token, msg.sender, address(this), _amount);
+    }
+
+    /**
+     * @notice burn shares and receive their value in underlying
+     * @param  _shares amount of shares to redeem
+     * @return amount  amount of underlying sent to the sender
+     */
+    function withdraw(uint256 _shares) external returns (uint256 amount) {
+        amount = (_shares * totalAssets()) / totalSupply;
+        _burn(msg.sender, _shares);
+        SafeTransferLib.safeTransfer(token, msg.sender, amount);
+    }
+
+    /**
+     * @notice simulate a strategy harvest, growing the vault's assets by yieldPerHarvest
+     */
+    function harvest() external {
+        uint256 yieldAdded = (totalAssets() * yieldPerHarvest) / 10000;
+        I_Mintable(address(token)).mint(address(this), yieldAdded);
+        emit Harvested(yieldAdded, pricePerShare());
+    }
+
+    /**
+     * @notice set the yield added on each harvest
+     * @param  _yieldPerHarvest yield in basis points of the vault's assets
+     */
+    function setYieldPerHarvest(uint256 _yieldPerHarvest) external {
+        yieldPerHarvest = _yieldPerHarvest;
+    }
+
+    /**
+     * @notice move the share price directly by minting or burning underlying held by the vault
+     * @param  _pricePerShare the new price of one share in underlying, scaled by 1e18
+     */
+    function setPricePerShare(uint256 _pricePerShare) external {
+        require(totalSupply > 0, "setPricePerShare: no shares");
+        uint256 target = (totalSupply * _pricePerShare) / 1e18;
+        uint256 assets = totalAssets();
+        if (target > assets) {
+            I_Mintable(address(token)).mint(address(this), target - assets);
+        } else {
+            I_Mintable(address(token)).burn(address(this), assets - target);
+        }
+    }
+
+    function totalAssets() public view returns (uint256) {
+        return token.balanceOf(address(this));
+    }
+
+    function pricePerShare() public view returns (uint256) {
+        if (totalSupply == 0) {
+            return 1e18;
+        }
+        return (totalAssets() * 1e18) / totalSupply;
+    }
+}
@@ -0,0 +1,44 @@
+//SPDX-License-Identifier: MPL-2.0
+pragma solidity 0.8.13;
+
+/**
+ * @title  Multicall
+ * @notice Local stand-in for Multicall2, aggregating read calls into a single eth_call.
+ *         tryAggregate has the same signature as the mainnet deployment, so readers
+ *         can point at either.
+ */
+contract Multicall {
+
+    struct Call {
+        address target;
+        bytes callData;
+    }
+
+    struct Result {
+        bool success;
+        bytes returnData;
+    }
+
+    /**
+     * @notice make every call, returning its success and return (or revert) data
+     * @param  requireSuccess revert the whole aggregate if any one call fails
+     * @param  calls          the target and calldata of each call
+     */
+    function tryAggregate(bool requireSuccess, Call[] calldata calls)
+        external
+        returns (Result[] memory results)
+    {
+        results = new Result[](calls.length);
+        for (uint256 i = 0; i < calls.length; i++) {
+            (bool success, bytes memory ret) = calls[i].target.call(calls[i].callData);
+            if (requireSuccess) {
+                require(success, "Multicall: call failed");
+            }
+            results[i] = Result(success, ret);
+        }
+    }
+
+    function getBlockNumber() external view returns (uint256) {
+        return block.number;
+    }
+}
@@ -0,0 +1,208 @@
+"""
+Content-hashed build cache for the contracts tree.
+
+Every source under `contracts/` is hashed together with everything it imports,
+directly or not. The hashes of the last successful compile and flatten are
+kept in `build/artifact_cache.json`, and each step only runs for sources
+whose dependency closure changed since:
+
+    python -m scripts.build_cache flatten   # re-flatten changed entry points into flattened/
+    python -m scripts.build_cache compile   # run `brownie compile` only if any closure changed
+
+The flatten step feeds Slither (`npm run sec:flatten`). `brownie test` and
+`brownie run` already recompile only what changed, so the compile step is
+for CI or standalone use, where it spares starting the compiler at all.
+
+Entry points are the sources no other source imports, outside `contracts/test`
+and other than the test token in `TEST_SOURCES`.
+They are flattened in the layout of brownie's `get_verification_info`, without
+compiling: one licence and pragma from the entry point, then every dependency
+in import order with its own imports, licence and pragmas removed.
+"""
+
+import hashlib
+import json
+import os
+import re
+import subprocess
+import sys
+from pathlib import PurePosixPath
+
+CONTRACTS_DIR = "contracts"
+FLATTENED_DIR = "flattened"
+MANIFEST_PATH = "build/artifact_cache.json"
+# deployed by the tests only, and pinned to a solc older than Slither runs with
+TEST_SOURCES = ("Dai.sol",)
+# bump to invalidate every cached artifact, e.g. when the flattened layout changes
+CACHE_VERSION = 1
+
+_IMPORT = re.compile(r"""^\s*import\s+(?:[^'";]*\s+from\s+)?["']([^"']+)["']\s*;[^\n]*\n?""", re.M)
+_PRAGMA = re.compile(r"^\s*pragma\s+[^;]+;[^\n]*\n?", re.M)
+_LICENSE = re.compile(r"^\s*//\s*SPDX-License-Identifier:[^\n]*\n?", re.M)
+
+
+def source_graph(contracts_dir=CONTRACTS_DIR):
+    """{source: set of sources it imports}, as paths relative to `contracts_dir`."""
+    graph = {}
+    for root, _, files in os.walk(contracts_dir):
+        for name in sorted(files):
+            if not name.endswith(".sol"):
+                continue
+            path = PurePosixPath(os.path.relpath(os.path.join(root, name), contracts_dir))
+            with open(os.path.join(contracts_dir, path)) as fp:
+                imports = _IMPORT.findall(fp.read())
+            graph[str(path)] = {_resolve(path, target) for target in imports}
+    return graph
+
+
+def _resolve(path, target):
+    parts = []
+    for part in (path.parent / target).parts:
+        if part == "..":
+            parts.pop()
+        elif part != ".":
+            parts.append(part)
+    return str(PurePosixPath(*parts))
+
+
+def import_order(graph, source):
+    """The dependencies of `source`, each after everything it imports, then `source` itself."""
+    order, seen = [], set()
+
+    def visit(path):
+        if path in seen:
+            return
+        seen.add(path)
+        for dependency in sorted(graph[path]):
+            visit(dependency)
+        order.append(path)
+
+    visit(source)
+    return order
+
+
+def closure_hashes(contracts_dir=CONTRACTS_DIR, graph=None):
+    """{source: sha256 of the source and every source it depends on}."""
+    graph = graph or source_graph(contracts_dir)
+    digests = {}
+    for path in graph:
+        with open(os.path.join(contracts_dir, path), "rb") as fp:
+            digests[path] = hashlib.sha256(fp.read()).hexdigest()
+    hashes = {}
+    for path in graph:
+        closure = sorted(import_order(graph, path))
+        content = "\n".join(f"{dep}:{digests[dep]}" for dep in closure)
+        hashes[path] = hashlib.sha256(f"{CACHE_VERSION}\n{content}".encode()).hexdigest()
+    return hashes
+
+
+def entry_points(graph):
+    imported = set().union(*graph.values()) if graph else set()
+    return sorted(
+        path
+        for path in graph
+        if path not in imported and not path.startswith("test/") and path not in TEST_SOURCES
+    )
+
+
+def flatten(source, contracts_dir=CONTRACTS_DIR, graph=None):
+    """`source` and its dependencies as a single file."""
+    graph = graph or source_graph(contracts_dir)
+    *dependencies, _ = import_order(graph, source)
+    with open(os.path.join(contracts_dir, source)) as fp:
+        root = fp.read()
+    licenses = re.findall(r"SPDX-License-Identifier:(.*)\n", root)
+    license_identifier = licenses[0].strip() if licenses else "NONE"
+    pragma = _PRAGMA.search(root)
+    parts = [
+        f"// SPDX-License-Identifier: {license_identifier}\n\n"
+        + (pragma.group(0).strip() if pragma else "")
+    ]
+    for path in dependencies:
+        with open(os.path.join(contracts_dir, path)) as fp:
+            parts.append(f"// Part: {path}\n\n{_strip(fp.read())}")
+    parts.append(f"// File: {PurePosixPath(source).name}\n\n{_strip(root)}")
+    return "\n\n".join(parts) + "\n"
+
+
+def _strip(source):
+    for pattern in (_LICENSE, _PRAGMA, _IMPORT):
+        source = pattern.sub("", source)
+    return source.strip()
+
+
+class BuildCache:
+    """The closure hashes each build step last ran for, persisted as JSON."""
+
+    def __init__(self, manifest_path=MANIFEST_PATH):
+        self.manifest_path = manifest_path
+        try:
+            with open(manifest_path) as fp:
+                self.manifest = json.load(fp)
+        except FileNotFoundError:
+            self.manifest = {}
+
+    def stale(self, step, hashes):
+        """The sources whose closure hash differs from the last run of `step`."""
+        done = self.manifest.get(step, {})
+        return sorted(path for path, digest in hashes.items() if done.get(path) != digest)
+
+    def update(self, step, hashes):
+        self.manifest[step] = dict(hashes)
+        os.makedirs(os.path.dirname(self.manifest_path) or ".", exist_ok=True)
+        with open(self.manifest_path, "w") as fp:
+            json.dump(self.manifest, fp, indent=2, sort_keys=True)
+
+
+def flatten_changed(contracts_dir=CONTRACTS_DIR, out_dir=FLATTENED_DIR, cache=None):
+    """Flatten the entry points whose closure changed, returning the files written."""
+    cache = cache or BuildCache()
+    graph = source_graph(contracts_dir)
+    hashes = closure_hashes(contracts_dir, graph)
+    roots = {path: hashes[path] for path in entry_points(graph)}
+    os.makedirs(out_dir, exist_ok=True)
+    outputs = {path: os.path.join(out_dir, PurePosixPath(path).name) for path in roots}
+
+    missing = {path for path, output in outputs.items() if not os.path.exists(output)}
+    written = []
+    for path in sorted(set(cache.stale("flatten", roots)) | missing):
+        with open(outputs[path], "w") as fp:
+            fp.write(flatten(path, contracts_dir, graph))
+        written.append(outputs[path])
+    # entry points that were removed or are now imported by another source
+    for path in set(cache.manifest.get("flatten", {})) - set(roots):
+        stale_output = os.path.join(out_dir, PurePosixPath(path).name)
+        if os.path.exists(stale_output) and stale_output not in outputs.values():
+            os.remove(stale_output)
+    cache.update("flatten", roots)
+    return written
+
+
+def compile_changed(contracts_dir=CONTRACTS_DIR, cache=None, command=("brownie", "compile")):
+    """Run `command` if any source's closure changed since it last succeeded."""
+    cache = cache or BuildCache()
+    hashes = closure_hashes(contracts_dir)
+    changed = cache.stale("compile", hashes)
+    removed = set(cache.manifest.get("compile", {})) - set(hashes)
+    if not changed and not removed:
+        return []
+    subprocess.run(list(command), check=True)
+    cache.update("compile", hashes)
+    return changed or sorted(removed)
+
+
+def main(*steps):
+    cache = BuildCache()
+    for step in steps or ("flatten",):
+        if step == "flatten":
+            written = flatten_changed(cache=cache)
+            print(f"flattened {len(written)} contract(s): {', '.join(written) or 'none changed'}")
+        elif step == "compile":
+            changed = compile_changed(cache=cache)
+            print(f"compiled for {len(changed)} changed source(s)" if changed else "nothing to compile")
+        else:
+            raise ValueError(f"unknown build step: {step}")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
@@ -0,0 +1,127 @@
+"""
+Batched reads of DeSchool course and learner state through a Multicall contract.
+
+Rather than one eth_call per `courses(i)`, `scholarshipAvailable(i)`,
+`getBlockRegistered(learner, i)`, `verify(learner, i)` and `getYieldRewards(creator)`,
+`BulkReader` packs them into `tryAggregate` calls of at most `chunk_size` calls
+each, so a page of hundreds of courses and learners is read in one or two
+round trips:
+
+    reader = BulkReader(deschool, multicall)
+    courses, learners = reader.read(range(20), [(learner, 0) for learner in learners])
+
+`multicall` is the Multicall2 deployment on mainnet, or `contracts/test/Multicall.sol`
+deployed locally. Calls are made without requiring success, so a call that
+reverts - `verify` for a learner who never registered, say - only leaves its
+own field as None and records the revert reason on the record.
+"""
+
+from collections import namedtuple
+
+from hexbytes import HexBytes
+
+try:
+    from eth_abi import decode as _decode_abi
+except ImportError:  # eth-abi < 4
+    from eth_abi import decode_abi as _decode_abi
+
+CHUNK_SIZE = 500
+
+_ERROR_SELECTOR = HexBytes("0x08c379a0")
+_PANIC_SELECTOR = HexBytes("0x4e487b71")
+
+# the fields of `DeSchool.courses`, then whether a scholarship is available
+Course = namedtuple(
+    "Course",
+    [
+        "course_id",
+        "stake",
+        "duration",
+        "url",
+        "creator",
+        "scholars",
+        "completed_scholars",
+        "scholarship_total",
+        "scholarship_vault",
+        "scholarship_y_tokens",
+        "scholarship_available",
+        "error",
+    ],
+)
+# block_registered is 0 for a learner who never registered, verified is None if verify reverted
+Learner = namedtuple(
+    "Learner", ["learner", "course_id", "block_registered", "verified", "error"]
+)
+
+
+class BulkReader:
+    def __init__(self, deschool, multicall, chunk_size=CHUNK_SIZE):
+        self.deschool = deschool
+        self.multicall = multicall
+        self.chunk_size = chunk_size
+
+    def courses(self, course_ids):
+        return self.read(course_ids, ())[0]
+
+    def learners(self, learner_courses):
+        """Registration and verification of each (learner, course id) pair."""
+        return self.read((), learner_courses)[1]
+
+    def yield_rewards(self, creators):
+        """`getYieldRewards` of each of `creators`, in order."""
+        calls = [(self.deschool.getYieldRewards, (str(creator),)) for creator in creators]
+        return [value for value, _ in self._aggregate(calls)]
+
+    def read(self, course_ids, learner_courses):
+        """
+        Read `course_ids` and `learner_courses` together, returning a list of
+        `Course` and a list of `Learner` in the order they were asked for.
+        """
+        course_ids = list(course_ids)
+        learner_courses = [(str(learner), course_id) for learner, course_id in learner_courses]
+        calls = []
+        for course_id in course_ids:
+            calls.append((self.deschool.courses, (course_id,)))
+            calls.append((self.deschool.scholarshipAvailable, (course_id,)))
+        for learner, course_id in learner_courses:
+            calls.append((self.deschool.getBlockRegistered, (learner, course_id)))
+            calls.append((self.deschool.verify, (learner, course_id)))
+        results = iter(self._aggregate(calls))
+
+        courses = []
+        for course_id in course_ids:
+            (fields, course_error), (available, available_error) = next(results), next(results)
+            if fields is None:
+                fields = (None,) * 9
+            courses.append(Course(course_id, *fields, available, course_error or available_error))
+        learners = []
+        for learner, course_id in learner_courses:
+            (block, block_error), (verified, verify_error) = next(results), next(results)
+            learners.append(Learner(learner, course_id, block, verified, block_error or verify_error))
+        return courses, learners
+
+    def _aggregate(self, calls):
+        """(decoded value, None) or (None, revert reason) for each (method, args) in `calls`."""
+        decoded = []
+        for start in range(0, len(calls), self.chunk_size):
+            chunk = calls[start:start + self.chunk_size]
+            results = self.multicall.tryAggregate.call(
+                False,
+                [(str(self.deschool), method.encode_input(*args)) for method, args in chunk],
+            )
+            for (method, args), (success, data) in zip(chunk, results):
+                if success:
+                    decoded.append((method.decode_output(data), None))
+                else:
+                    decoded.append((None, revert_reason(data)))
+        return decoded
+
+
+def revert_reason(data):
+    """Human readable reason for a call that reverted with `data`."""
+    data = HexBytes(data)
+    if data[:4] == _ERROR_SELECTOR:
+        return _decode_abi(["string"], data[4:])[0]
+    if data[:4] == _PANIC_SELECTOR:
+        return "Panic({:#04x})".format(_decode_abi(["uint256"], data[4:])[0])
+    return "reverted" if not data else "reverted: 0x" + bytes(data).hex()
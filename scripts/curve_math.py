@@ -0,0 +1,295 @@
+"""
+Bit-exact Python model of the LearningCurve mint/burn maths.
+
+Every function here reproduces the integer arithmetic of LearningCurve.sol and
+the PRBMath / PRBMathUD60x18 libraries it uses, including the truncation done
+by the UD60x18 `ln` and `exp` approximations, so quotes made with this module
+match `getMintableForReserveAmount` and `getPredictedBurn` to the wei.
+
+Situations in which the contract would revert raise `CurveRevert`, carrying the
+same message brownie reports for the on-chain revert.
+"""
+
+SCALE = 10**18
+HALF_SCALE = 5 * 10**17
+LOG2_E = 1442695040888963407
+MAX_UINT256 = 2**256 - 1
+
+# the constant product used in the curve
+K = 10000
+# DAI transferred in, and LEARN minted to the curve itself, by `initialise`
+INITIAL_RESERVE = 10**18
+INITIAL_SUPPLY = 10001 * 10**18
+
+# exp(x) reverts above this value, see PRBMathUD60x18.exp
+MAX_EXP_INPUT = 88722839111672999628
+# exp2(x) reverts at or above this value, see PRBMathUD60x18.exp2
+MAX_EXP2_INPUT = 128 * 10**18
+
+OVERFLOW = "Integer overflow"
+DIVISION_BY_ZERO = "Division or modulo by zero"
+
+# root(2, 2^-i) in 128.128-bit fixed point, applied when bit 127 - i of the
+# fractional part is set, copied from PRBMath.exp2
+_EXP2_FACTORS = (
+    0x16A09E667F3BCC908B2FB1366EA957D3E,
+    0x1306FE0A31B7152DE8D5A46305C85EDED,
+    0x1172B83C7D517ADCDF7C8C50EB14A7920,
+    0x10B5586CF9890F6298B92B71842A98364,
+    0x1059B0D31585743AE7C548EB68CA417FE,
+    0x102C9A3E778060EE6F7CACA4F7A29BDE9,
+    0x10163DA9FB33356D84A66AE336DCDFA40,
+    0x100B1AFA5ABCBED6129AB13EC11DC9544,
+    0x10058C86DA1C09EA1FF19D294CF2F679C,
+    0x1002C605E2E8CEC506D21BFC89A23A011,
+    0x100162F3904051FA128BCA9C55C31E5E0,
+    0x1000B175EFFDC76BA38E31671CA939726,
+    0x100058BA01FB9F96D6CACD4B180917C3E,
+    0x10002C5CC37DA9491D0985C348C68E7B4,
+    0x1000162E525EE054754457D5995292027,
+    0x10000B17255775C040618BF4A4ADE83FD,
+    0x1000058B91B5BC9AE2EED81E9B7D4CFAC,
+    0x100002C5C89D5EC6CA4D7C8ACC017B7CA,
+    0x10000162E43F4F831060E02D839A9D16D,
+    0x100000B1721BCFC99D9F890EA06911763,
+    0x10000058B90CF1E6D97F9CA14DBCC1629,
+    0x1000002C5C863B73F016468F6BAC5CA2C,
+    0x100000162E430E5A18F6119E3C02282A6,
+    0x1000000B1721835514B86E6D96EFD1BFF,
+    0x100000058B90C0B48C6BE5DF846C5B2F0,
+    0x10000002C5C8601CC6B9E94213C72737B,
+    0x1000000162E42FFF037DF38AA2B219F07,
+    0x10000000B17217FBA9C739AA5819F44FA,
+    0x1000000058B90BFCDEE5ACD3C1CEDC824,
+    0x100000002C5C85FE31F35A6A30DA1BE51,
+    0x10000000162E42FF0999CE3541B9FFFD0,
+    0x100000000B17217F80F4EF5AADDA45554,
+    0x10000000058B90BFBF8479BD5A81B51AE,
+    0x1000000002C5C85FDF84BD62AE30A74CD,
+    0x100000000162E42FEFB2FED257559BDAA,
+    0x1000000000B17217F7D5A7716BBA4A9AF,
+    0x100000000058B90BFBE9DDBAC5E109CCF,
+    0x10000000002C5C85FDF4B15DE6F17EB0E,
+    0x1000000000162E42FEFA494F1478FDE05,
+    0x10000000000B17217F7D20CF927C8E94D,
+    0x1000000000058B90BFBE8F71CB4E4B33E,
+    0x100000000002C5C85FDF477B662B26946,
+    0x10000000000162E42FEFA3AE53369388D,
+    0x100000000000B17217F7D1D351A389D41,
+    0x10000000000058B90BFBE8E8B2D3D4EDF,
+    0x1000000000002C5C85FDF4741BEA6E77F,
+    0x100000000000162E42FEFA39FE95583C3,
+    0x1000000000000B17217F7D1CFB72B45E3,
+    0x100000000000058B90BFBE8E7CC35C3F2,
+    0x10000000000002C5C85FDF473E242EA39,
+    0x1000000000000162E42FEFA39F02B772C,
+    0x10000000000000B17217F7D1CF7D83C1A,
+    0x1000000000000058B90BFBE8E7BDCBE2E,
+    0x100000000000002C5C85FDF473DEA871F,
+    0x10000000000000162E42FEFA39EF44D92,
+    0x100000000000000B17217F7D1CF79E949,
+    0x10000000000000058B90BFBE8E7BCE545,
+    0x1000000000000002C5C85FDF473DE6ECA,
+    0x100000000000000162E42FEFA39EF366F,
+    0x1000000000000000B17217F7D1CF79AFA,
+    0x100000000000000058B90BFBE8E7BCD6E,
+    0x10000000000000002C5C85FDF473DE6B3,
+    0x1000000000000000162E42FEFA39EF359,
+    0x10000000000000000B17217F7D1CF79AC,
+)
+
+class CurveRevert(Exception):
+    """Raised wherever the equivalent contract call would revert."""
+
+    def __init__(self, revert_msg=None):
+        super().__init__(revert_msg)
+        self.revert_msg = revert_msg
+
+
+def _uint(value):
+    # amounts are often written as floats such as 1e18, accept them when they are whole
+    if isinstance(value, float):
+        if not value.is_integer():
+            raise ValueError(f"{value} is not a whole number of wei")
+        value = int(value)
+    if value < 0 or value > MAX_UINT256:
+        raise ValueError(f"{value} is not a uint256")
+    return value
+
+
+def _checked(value):
+    # solidity >= 0.8 reverts on over and underflow outside of unchecked blocks
+    if value < 0 or value > MAX_UINT256:
+        raise CurveRevert(OVERFLOW)
+    return value
+
+
+def most_significant_bit(x):
+    """Zero-based index of the most significant bit of x, 0 for x == 0."""
+    return max(x.bit_length() - 1, 0)
+
+
+def exp2_128x128(x):
+    """
+    PRBMath.exp2: the binary exponent of a 128.128-bit fixed-point number,
+    returned as an unsigned 60.18-decimal fixed-point number.
+    """
+    result = 0x80000000000000000000000000000000
+    for bit, factor in zip(range(127, 63, -1), _EXP2_FACTORS):
+        if x >> bit & 1:
+            result = (result * factor) >> 128
+    result *= SCALE
+    return result >> (127 - (x >> 128))
+
+
+def exp2(x):
+    """PRBMathUD60x18.exp2 for an unsigned 60.18-decimal fixed-point x."""
+    if x >= MAX_EXP2_INPUT:
+        raise CurveRevert()
+    return exp2_128x128((x << 128) // SCALE)
+
+
+def exp(x):
+    """PRBMathUD60x18.exp for an unsigned 60.18-decimal fixed-point x."""
+    if x >= MAX_EXP_INPUT:
+        raise CurveRevert()
+    return exp2((x * LOG2_E + HALF_SCALE) // SCALE)
+
+
+def log2(x):
+    """PRBMathUD60x18.log2 for an unsigned 60.18-decimal fixed-point x."""
+    if x < SCALE:
+        raise CurveRevert()
+    n = most_significant_bit(x // SCALE)
+    result = n * SCALE
+    y = x >> n
+    if y == SCALE:
+        return result
+    delta = HALF_SCALE
+    while delta > 0:
+        y = (y * y) // SCALE
+        if y >= 2 * SCALE:
+            result += delta
+            y >>= 1
+        delta >>= 1
+    return result
+
+
+def ln(x):
+    """PRBMathUD60x18.ln for an unsigned 60.18-decimal fixed-point x."""
+    return (log2(x) * SCALE) // LOG2_E
+
+
+def do_ln(x):
+    """LearningCurve.doLn"""
+    return ln(x)
+
+
+def e_calc(x):
+    """LearningCurve.e_calc, note the input is divided by k before exponentiation."""
+    return exp(x // K)
+
+
+def mintable_for_reserve_amount(reserve_balance, reserve_amount):
+    """
+    LEARN minted for `reserve_amount` DAI when the curve holds `reserve_balance`,
+    identical to LearningCurve.getMintableForReserveAmount.
+    """
+    reserve_balance, reserve_amount = _uint(reserve_balance), _uint(reserve_amount)
+    if reserve_balance == 0:
+        raise CurveRevert(DIVISION_BY_ZERO)
+    numerator = _checked(_checked(reserve_balance + reserve_amount) * SCALE)
+    return K * do_ln(numerator // reserve_balance)
+
+
+def predicted_burn(reserve_balance, burn_amount):
+    """
+    DAI returned for burning `burn_amount` LEARN when the curve holds
+    `reserve_balance`, identical to LearningCurve.getPredictedBurn.
+    """
+    reserve_balance, burn_amount = _uint(reserve_balance), _uint(burn_amount)
+    e = e_calc(burn_amount)
+    return reserve_balance - _checked(reserve_balance * SCALE) // e
+
+
+class LearningCurveModel:
+    """
+    In-memory replica of a LearningCurve deployment.
+
+    Tracks `reserveBalance`, `totalSupply` and the LEARN balance of every
+    address the model has seen, and applies state changes exactly as the
+    contract does. A call that would revert raises `CurveRevert` and leaves
+    the model untouched.
+    """
+
+    def __init__(self, reserve_balance=0, total_supply=0, balances=None, initialised=None):
+        self.reserve_balance = _uint(reserve_balance)
+        self.total_supply = _uint(total_supply)
+        self.balances = {k: _uint(v) for k, v in (balances or {}).items()}
+        if initialised is None:
+            initialised = reserve_balance > 0
+        self.initialised = initialised
+
+    @classmethod
+    def from_contract(cls, learning_curve, holders=()):
+        """
+        Build a model from a deployed LearningCurve, loading the LEARN balance
+        of each address in `holders`.
+        """
+        return cls(
+            learning_curve.reserveBalance(),
+            learning_curve.totalSupply(),
+            {str(holder): learning_curve.balanceOf(holder) for holder in holders},
+        )
+
+    def copy(self):
+        return LearningCurveModel(
+            self.reserve_balance, self.total_supply, self.balances, self.initialised
+        )
+
+    def balance_of(self, account):
+        return self.balances.get(str(account), 0)
+
+    def initialise(self, curve_address):
+        if self.initialised:
+            raise CurveRevert("initialised")
+        self.initialised = True
+        self.reserve_balance += INITIAL_RESERVE
+        self._mint(curve_address, INITIAL_SUPPLY)
+
+    def mint(self, sender, wad):
+        """LearningCurve.mint, returns the amount of LEARN minted."""
+        return self.mint_for_address(sender, wad)
+
+    def mint_for_address(self, learner, wad):
+        """LearningCurve.mintForAddress, returns the amount of LEARN minted."""
+        if not self.initialised:
+            raise CurveRevert("!initialised")
+        wad = _uint(wad)
+        learn_magic = mintable_for_reserve_amount(self.reserve_balance, wad)
+        reserve_balance = _checked(self.reserve_balance + wad)
+        self._mint(learner, learn_magic)
+        self.reserve_balance = reserve_balance
+        return learn_magic
+
+    def burn(self, sender, burn_amount):
+        """LearningCurve.burn, returns the amount of DAI returned."""
+        if not self.initialised:
+            raise CurveRevert("!initialised")
+        burn_amount = _uint(burn_amount)
+        learn_magic = predicted_burn(self.reserve_balance, burn_amount)
+        balance = _checked(self.balance_of(sender) - burn_amount)
+        self.balances[str(sender)] = balance
+        self.total_supply -= burn_amount
+        self.reserve_balance -= learn_magic
+        return learn_magic
+
+    def get_mintable_for_reserve_amount(self, reserve_amount):
+        return mintable_for_reserve_amount(self.reserve_balance, reserve_amount)
+
+    def get_predicted_burn(self, burn_amount):
+        return predicted_burn(self.reserve_balance, burn_amount)
+
+    def _mint(self, to, amount):
+        self.total_supply = _checked(self.total_supply + amount)
+        self.balances[str(to)] = self.balance_of(to) + amount
@@ -0,0 +1,160 @@
+"""
+Quotes for sequences of LearningCurve mints and burns.
+
+A path is an ordered list of operations, each a mint of `wad` DAI or a burn
+of LEARN, applied to a curve holding `reserve_balance` and `total_supply`.
+Each step is the curve's closed form applied to the state the previous steps
+left,
+
+    mint:  minted   = k * ln((R + w) / R)       R += w        S += minted
+    burn:  returned = R * (1 - exp(-x / k))     R -= returned S -= x
+
+so a path is quoted without a node, and many candidate paths are quoted at
+once as numpy columns, one step at a time:
+
+    quote_path([("mint", 10**21), ("burn", 5 * 10**22), ("mint", 10**20)], reserve, supply)
+    quote_paths(kinds, amounts, reserve, supply)  # kinds, amounts: (paths, steps) arrays
+
+By default steps are evaluated in float64 (see `curve_sweep`), which is what
+ranking thousands of paths needs. With `exact=True` every step runs the
+bit-exact integer model of `curve_math`, so outputs and final state match what
+the contract would do to the wei.
+
+A step that would revert - a mint into an empty reserve, an overflow, a burn
+beyond `exp`'s domain or of more LEARN than exists - ends its path: it and
+every later step quote NaN (None when exact), as does the final state, and
+`reverted_at` gives its index. Burns are assumed to come from holders of the
+LEARN burnt; only the total supply is checked.
+"""
+
+import numpy as np
+
+from scripts import curve_math, curve_sweep
+
+MINT = "mint"
+BURN = "burn"
+
+_KSCALE = float(curve_math.K * curve_math.SCALE)
+
+
+class PathQuote:
+    """The quote of one path: each step's output and the state the path leaves."""
+
+    def __init__(self, outputs, reserve_balance, total_supply, reverted_at=None, revert_msg=None):
+        # LEARN minted or DAI returned by each step
+        self.outputs = outputs
+        self.reserve_balance = reserve_balance
+        self.total_supply = total_supply
+        # index of the step that reverts, None if the whole path goes through
+        self.reverted_at = reverted_at
+        self.revert_msg = revert_msg
+
+    def __repr__(self):
+        return (
+            f"PathQuote(outputs={self.outputs}, reserve_balance={self.reserve_balance}, "
+            f"total_supply={self.total_supply}, reverted_at={self.reverted_at})"
+        )
+
+
+def quote_path(operations, reserve_balance, total_supply, exact=False):
+    """Quote a path given as a list of (MINT or BURN, amount)."""
+    if exact:
+        return _exact_path(operations, curve_math._uint(reserve_balance), curve_math._uint(total_supply))
+    kinds = [[kind for kind, _ in operations]]
+    amounts = [[amount for _, amount in operations]]
+    outputs, reserve, supply, reverted_at = quote_paths(kinds, amounts, reserve_balance, total_supply)
+    return PathQuote(
+        list(outputs[0]),
+        reserve[0],
+        supply[0],
+        None if reverted_at[0] < 0 else int(reverted_at[0]),
+    )
+
+
+def quote_paths(kinds, amounts, reserve_balances, total_supplies, exact=False):
+    """
+    Quote many paths of the same length at once.
+
+    `kinds` and `amounts` are (paths, steps) arrays of MINT or BURN and of
+    amounts; `reserve_balances` and `total_supplies` are the starting state,
+    a scalar or one per path. Returns the (paths, steps) outputs, the final
+    reserve balances and total supplies, and the index of the step each path
+    reverted at, -1 for paths that go through. Results are float64 arrays, or
+    object arrays of python ints and None when `exact`.
+    """
+    kinds = np.atleast_2d(np.asarray(kinds))
+    if not np.isin(kinds, (MINT, BURN)).all():
+        raise ValueError(f"operations must be {MINT!r} or {BURN!r}")
+    is_mint = kinds == MINT
+    amounts = np.atleast_2d(np.asarray(amounts, dtype=object if exact else np.float64))
+    if is_mint.shape != amounts.shape:
+        raise ValueError(f"kinds {is_mint.shape} and amounts {amounts.shape} differ in shape")
+    paths = is_mint.shape[0]
+    if exact:
+        return _exact_paths(is_mint, amounts, reserve_balances, total_supplies)
+
+    reserve = np.broadcast_to(np.asarray(reserve_balances, dtype=np.float64), paths).copy()
+    supply = np.broadcast_to(np.asarray(total_supplies, dtype=np.float64), paths).copy()
+    outputs = np.full(amounts.shape, np.nan)
+    reverted_at = np.full(paths, -1)
+    for step in range(is_mint.shape[1]):
+        mint, amount = is_mint[:, step], amounts[:, step]
+        with np.errstate(invalid="ignore"):
+            out = np.where(
+                mint,
+                curve_sweep.mint_sweep(reserve, np.where(mint, amount, 0)),
+                curve_sweep.burn_sweep(reserve, np.where(mint, 0, amount)),
+            )
+        out[~mint & (amount > supply)] = np.nan
+        # NaN from here on for paths that reverted, now or before
+        out[np.isnan(reserve)] = np.nan
+        reverted_at[np.isnan(out) & (reverted_at < 0)] = step
+        outputs[:, step] = out
+        # R * exp(-x / k) rather than R - returned, which cancels to nothing when a burn empties the curve
+        reserve = np.where(mint, reserve + amount, reserve * np.exp(-np.where(mint, 0, amount) / _KSCALE))
+        supply = np.where(mint, supply + out, supply - amount)
+        reserve[np.isnan(out)] = supply[np.isnan(out)] = np.nan
+    return outputs, reserve, supply, reverted_at
+
+
+def _exact_paths(is_mint, amounts, reserve_balances, total_supplies):
+    paths = is_mint.shape[0]
+    reserves = np.broadcast_to(np.asarray(reserve_balances, dtype=object), paths)
+    supplies = np.broadcast_to(np.asarray(total_supplies, dtype=object), paths)
+    outputs = np.empty(amounts.shape, dtype=object)
+    final_reserve = np.empty(paths, dtype=object)
+    final_supply = np.empty(paths, dtype=object)
+    reverted_at = np.full(paths, -1)
+    for i in range(paths):
+        quote = _exact_path(
+            [(MINT if mint else BURN, amount) for mint, amount in zip(is_mint[i], amounts[i])],
+            curve_math._uint(reserves[i]),
+            curve_math._uint(supplies[i]),
+        )
+        outputs[i] = quote.outputs
+        final_reserve[i], final_supply[i] = quote.reserve_balance, quote.total_supply
+        if quote.reverted_at is not None:
+            reverted_at[i] = quote.reverted_at
+    return outputs, final_reserve, final_supply, reverted_at
+
+
+def _exact_path(operations, reserve, supply):
+    outputs = []
+    for step, (kind, amount) in enumerate(operations):
+        try:
+            amount = curve_math._uint(amount)
+            if kind == MINT:
+                out = curve_math.mintable_for_reserve_amount(reserve, amount)
+                reserve, supply = curve_math._checked(reserve + amount), curve_math._checked(supply + out)
+            elif kind == BURN:
+                out = curve_math.predicted_burn(reserve, amount)
+                # the burner's balance underflows first, but the supply bounds it
+                supply = curve_math._checked(supply - amount)
+                reserve -= out
+            else:
+                raise ValueError(f"not a curve operation: {kind}")
+        except curve_math.CurveRevert as exc:
+            outputs.extend([None] * (len(operations) - step))
+            return PathQuote(outputs, None, None, step, exc.revert_msg)
+        outputs.append(out)
+    return PathQuote(outputs, reserve, supply)
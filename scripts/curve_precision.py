@@ -0,0 +1,205 @@
+"""
+Error profile of the LearningCurve fixed-point maths against exact references.
+
+Each profiled function is evaluated with the bit-exact `curve_math` model and
+with 100 digit `decimal` arithmetic, over samples spread log-uniformly across
+every decade of its inputs:
+
+    ln    doLn(x)                      vs  ln(x / 1e18) * 1e18
+    exp   PRBMath exp(x)               vs  e ** (x / 1e18) * 1e18
+    mint  getMintableForReserveAmount  vs  k * ln((R + w) / R) * 1e18
+    burn  getPredictedBurn             vs  R * (1 - e ** (-x / (k * 1e18)))
+
+so mint and burn include the truncations LearningCurve itself adds, such as
+dividing the burn amount by k before exponentiating. The error map holds, for
+each decade (or pair of decades), the signed and absolute error in wei and the
+relative error. A positive mint or burn error means the user receives more
+than the exact curve would give them.
+
+Samples are computed in a process pool and cached in SQLite, keyed by function
+and inputs, so a rerun only computes points it has not seen:
+
+    python -m scripts.curve_precision 50        # or: brownie run curve_precision main 50
+"""
+
+import json
+import os
+import random
+import sqlite3
+import sys
+from decimal import Decimal, localcontext
+from multiprocessing import Pool
+
+from scripts import curve_math
+
+CACHE_PATH = "reports/curve_precision.sqlite"
+REPORT_PATH = "reports/curve_precision.json"
+SAMPLES_PER_CELL = 20
+PRECISION = 100
+
+# the decades of each input sampled, as range(first, last + 1)
+DOMAINS = {
+    "ln": (range(18, 60),),
+    "exp": (range(0, 20),),
+    # reserve balances from the initial 1 DAI up to a quadrillion DAI
+    "mint": (range(18, 34), range(0, 31)),
+    "burn": (range(18, 34), range(0, 24)),
+}
+
+
+def contract_value(fn, args):
+    """The on-chain result for `args`, None where the contract reverts."""
+    try:
+        if fn == "ln":
+            return curve_math.do_ln(*args)
+        if fn == "exp":
+            return curve_math.exp(*args)
+        if fn == "mint":
+            return curve_math.mintable_for_reserve_amount(*args)
+        return curve_math.predicted_burn(*args)
+    except curve_math.CurveRevert:
+        return None
+
+
+def reference_value(fn, args):
+    """The exact result for `args`, rounded to the nearest wei."""
+    with localcontext() as ctx:
+        ctx.prec = PRECISION
+        scale = Decimal(curve_math.SCALE)
+        if fn == "ln":
+            value = (Decimal(args[0]) / scale).ln() * scale
+        elif fn == "exp":
+            value = (Decimal(args[0]) / scale).exp() * scale
+        elif fn == "mint":
+            reserve, amount = map(Decimal, args)
+            value = curve_math.K * ((reserve + amount) / reserve).ln() * scale
+        else:
+            reserve, amount = map(Decimal, args)
+            value = reserve * (1 - (-amount / (curve_math.K * scale)).exp())
+        return int(value.to_integral_value())
+
+
+def _evaluate(item):
+    fn, args = item
+    return fn, args, contract_value(fn, args), reference_value(fn, args)
+
+
+def sample_points(fn, samples_per_cell, seed=0):
+    """{cell: [args, ...]} for every cell of `fn`'s domain, the same for a given seed."""
+    points = {}
+    for cell in _cells(DOMAINS[fn]):
+        rng = random.Random(f"{fn}:{cell}:{seed}")
+        points[cell] = [
+            tuple(int(10 ** (decade + rng.random())) for decade in cell)
+            for _ in range(samples_per_cell)
+        ]
+    return points
+
+
+def _cells(domain):
+    cells = [()]
+    for decades in domain:
+        cells = [cell + (decade,) for cell in cells for decade in decades]
+    return cells
+
+
+class ErrorProfiler:
+    def __init__(self, cache_path=CACHE_PATH, processes=None):
+        if cache_path != ":memory:":
+            os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+        self.db = sqlite3.connect(cache_path)
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS samples ("
+            " fn TEXT NOT NULL, args TEXT NOT NULL, value TEXT, reference TEXT NOT NULL,"
+            " PRIMARY KEY (fn, args))"
+        )
+        self.processes = processes
+        # number of samples computed, rather than read from the cache, by the last profile
+        self.computed = 0
+
+    def profile(self, functions=tuple(DOMAINS), samples_per_cell=SAMPLES_PER_CELL, seed=0):
+        """Return the error map of each of `functions`."""
+        points = {fn: sample_points(fn, samples_per_cell, seed) for fn in functions}
+        results = {}
+        missing = []
+        for fn, cells in points.items():
+            cached = {
+                key: (None if value is None else int(value), int(reference))
+                for key, value, reference in self.db.execute(
+                    "SELECT args, value, reference FROM samples WHERE fn = ?", (fn,)
+                )
+            }
+            for args in {args for cell_args in cells.values() for args in cell_args}:
+                if _key(args) in cached:
+                    results[fn, args] = cached[_key(args)]
+                else:
+                    missing.append((fn, args))
+
+        self.computed = len(missing)
+        if missing:
+            with Pool(self.processes) as pool:
+                computed = pool.map(_evaluate, missing, chunksize=max(len(missing) // 64, 1))
+            with self.db:
+                self.db.executemany(
+                    "INSERT OR REPLACE INTO samples VALUES (?, ?, ?, ?)",
+                    [
+                        (fn, _key(args), None if value is None else str(value), str(reference))
+                        for fn, args, value, reference in computed
+                    ],
+                )
+            for fn, args, value, reference in computed:
+                results[fn, args] = (value, reference)
+
+        return {
+            fn: [_cell_errors(cell, [results[fn, args] for args in cell_args])
+                 for cell, cell_args in cells.items()]
+            for fn, cells in points.items()
+        }
+
+    def close(self):
+        self.db.close()
+
+
+def _key(args):
+    return ",".join(map(str, args))
+
+
+def _cell_errors(cell, results):
+    errors = [
+        (value - reference, abs(value - reference) / reference if reference else 0.0)
+        for value, reference in results
+        if value is not None
+    ]
+    summary = {"decades": list(cell), "samples": len(results), "reverts": len(results) - len(errors)}
+    if errors:
+        signed = [error for error, _ in errors]
+        summary.update(
+            {
+                "min_error": min(signed),
+                "max_error": max(signed),
+                "max_abs_error": max(map(abs, signed)),
+                "mean_abs_error": sum(map(abs, signed)) / len(signed),
+                "max_rel_error": max(rel for _, rel in errors),
+            }
+        )
+    return summary
+
+
+def main(samples_per_cell=SAMPLES_PER_CELL, processes=None, cache=CACHE_PATH, output=REPORT_PATH):
+    profiler = ErrorProfiler(cache, int(processes) if processes else None)
+    report = profiler.profile(samples_per_cell=int(samples_per_cell))
+    print(f"{profiler.computed} new samples computed")
+    profiler.close()
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as fp:
+        json.dump(report, fp, indent=1)
+    for fn, cells in report.items():
+        worst = max(cells, key=lambda cell: cell.get("max_abs_error", 0))
+        print(
+            f"{fn}: worst cell {worst['decades']}, max abs error {worst.get('max_abs_error')} wei,"
+            f" max rel error {max(cell.get('max_rel_error', 0) for cell in cells):.3e}"
+        )
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
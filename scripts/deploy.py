@@ -1,10 +1,235 @@
-from brownie import *
-from brownie import Contract, accounts, BasicERC20
+"""
+Resumable deployment of LearningCurve, DeSchool and a course catalogue.
 
+    brownie run deploy main <account id> <state file> [manifest] [stable] [registry] --network <network>
 
-def main():
-    deployer = accounts.load('dep')
-    token = BasicERC20.at("0x5592EC0cfb4dbc12D3aB100b257153436a1f0FEa")
-    lc = Contract.from_explorer("0x26A1EcDeCBeeE657e9C21273544e555F74b11d54")
-    token.approve(lc, 1e18, {"from": deployer})
-    lc.initialise({"from": deployer})
\ No newline at end of file
+The pipeline
+
+1. deploys LearningCurve against `stable` (mainnet DAI by default)
+2. approves its 1 DAI seed and `initialise`s it
+3. deploys DeSchool against `stable`, the learning curve and the yearn `registry`
+4. creates every course of the manifest, a JSON list of
+   {"stake": "1000 ether", "duration": 10000, "url": "...", "creator": "0x..."}
+
+and records its progress in a JSON state file as it goes. Every step checks
+the chain before sending anything, so a rerun after a failure - or after the
+state file fell behind - sends only what is missing: a contract is looked up
+at the address its recorded deployment nonce gives, `initialise` is skipped
+once the curve holds its seed, and manifest entries are matched by their
+fields against the CourseCreated events of DeSchool, so each entry gets
+exactly one course. Reruns first wait for the deployer's pending transactions
+to be mined, so nothing sent by an interrupted run is sent twice.
+
+Transactions that don't depend on each other's receipts are sent back to back
+with nonces counted locally, then awaited together: the seed approval,
+`initialise` and the DeSchool deployment go out at once, and courses in
+chunks of `batch_size`.
+"""
+
+import json
+import os
+import time
+
+import rlp
+from brownie import DeSchool, LearningCurve, Wei, accounts, chain, interface, web3
+from eth_utils import keccak, to_checksum_address
+from hexbytes import HexBytes
+
+from scripts.indexer import EventIndexer
+from scripts.tx_sender import SendError, TxSender
+
+DAI = "0x6B175474E89094C44Da98b954EedeAC495271d0F"
+REGISTRY = "0x50c1a2eA0a861A967D9d0FFE2AE4012c2E053804"
+# transferred to the learning curve by `initialise`
+SEED = 10 ** 18
+# initialise is sent before its approval is mined, so it can't be estimated
+INITIALISE_GAS = 200_000
+BATCH_SIZE = 50
+
+
+class DeploymentError(Exception):
+    """Raised when a transaction fails or the state file doesn't match the chain or manifest."""
+
+
+class Deployment:
+    def __init__(self, account, state_path, stable=DAI, registry=REGISTRY, batch_size=BATCH_SIZE, log=print):
+        """
+        Deploy from `account`, recording progress in the JSON file at
+        `state_path`. A state file left by an earlier run must be for the
+        same chain, deployer, stable and registry.
+        """
+        self.account = account
+        self.state_path = state_path
+        self.batch_size = batch_size
+        self.log = log
+        self.state = {}
+        if os.path.exists(state_path):
+            with open(state_path) as fp:
+                self.state = json.load(fp)
+        for key, value in (
+            ("chain_id", chain.id),
+            ("deployer", account.address),
+            ("stable", to_checksum_address(str(stable))),
+            ("registry", to_checksum_address(str(registry))),
+        ):
+            if self.state.setdefault(key, value) != value:
+                raise DeploymentError(f"{state_path} is for {key} {self.state[key]}, not {value}")
+        # {manifest index: {"course_id": id, "course": [stake, duration, url, creator]}}
+        self.state.setdefault("courses", {})
+        self.learning_curve = None
+        self.deschool = None
+        self.sender = TxSender()
+
+    def run(self, manifest=()):
+        """Run every step still to do, returning the course id of each manifest entry."""
+        self._await_pending()
+        stable, registry = self.state["stable"], self.state["registry"]
+
+        self.learning_curve = self._contract("LearningCurve", LearningCurve)
+        if self.learning_curve is None:
+            self._await([self._deploy("LearningCurve", LearningCurve, stable)])
+            self.learning_curve = self._contract("LearningCurve", LearningCurve)
+
+        # the seed, initialise and DeSchool don't need each other's receipts
+        sent = []
+        if self.learning_curve.reserveBalance() == 0:
+            self.log("seeding and initialising LearningCurve")
+            sent.append(self._send(interface.IERC20Permit(stable).approve, self.learning_curve, SEED))
+            sent.append(self._send(self.learning_curve.initialise, gas_limit=INITIALISE_GAS))
+        self.deschool = self._contract("DeSchool", DeSchool)
+        if self.deschool is None:
+            sent.append(self._deploy("DeSchool", DeSchool, stable, self.learning_curve, registry))
+        self._await(sent)
+        if self.deschool is None:
+            self.deschool = self._contract("DeSchool", DeSchool)
+        return self.create_courses(manifest)
+
+    def create_courses(self, manifest):
+        """Create the courses of `manifest` that don't exist yet, returning the id of each."""
+        entries = [_course(entry) for entry in manifest]
+        created = self.state["courses"]
+        for key, record in created.items():
+            if int(key) < len(entries) and tuple(record["course"]) != entries[int(key)]:
+                raise DeploymentError(f"manifest entry {key} changed since course {record['course_id']} was created")
+        missing = self._match_created(entries)
+        if missing:
+            self.log(f"creating {len(missing)} of {len(entries)} courses")
+        for start in range(0, len(missing), self.batch_size):
+            chunk = missing[start:start + self.batch_size]
+            sent = []
+            try:
+                sent = self.sender.send(
+                    [(self.deschool.createCourse, *entries[i], {"from": self.account}) for i in chunk]
+                )
+            except SendError as exc:
+                sent = exc.receipts
+                raise DeploymentError(str(exc)) from None
+            finally:
+                for i, tx in zip(chunk, sent):
+                    if tx is not None and tx.status == 1:
+                        course_id = tx.events["CourseCreated"]["courseId"]
+                        created[str(i)] = {"course_id": course_id, "course": list(entries[i])}
+                self._save()
+        return [created[str(i)]["course_id"] for i in range(len(entries))]
+
+    def _match_created(self, entries):
+        """Record unrecorded entries that match an existing course, returning the indexes of the others."""
+        created = self.state["courses"]
+        unrecorded = [i for i in range(len(entries)) if str(i) not in created]
+        if not unrecorded:
+            return []
+        indexer = EventIndexer(":memory:", self.deschool, self.learning_curve, self.state["DeSchool"]["from_block"])
+        indexer.sync()
+        taken = {record["course_id"] for record in created.values()}
+        existing = {}
+        for course_id, stake, duration, url, creator in indexer.db.execute(
+            "SELECT course_id, stake, duration, url, creator FROM courses ORDER BY course_id"
+        ):
+            if course_id not in taken:
+                existing.setdefault((int(stake), duration, url, creator), []).append(course_id)
+        indexer.close()
+        missing = []
+        for i in unrecorded:
+            ids = existing.get(entries[i])
+            if ids:
+                created[str(i)] = {"course_id": ids.pop(0), "course": list(entries[i])}
+            else:
+                missing.append(i)
+        self._save()
+        return missing
+
+    def _contract(self, name, container):
+        """The contract deployed by step `name`, or None if it has no code."""
+        step = self.state.get(name)
+        if step is None:
+            return None
+        address = step.get("address") or _create_address(self.account.address, step["nonce"])
+        if not web3.eth.get_code(address):
+            return None
+        if "address" not in step:
+            step["address"] = address
+            self._save()
+        return container.at(address)
+
+    def _deploy(self, name, container, *args):
+        # anything built on an earlier deployment of this contract is gone with it
+        if name == "LearningCurve":
+            self.state.pop("DeSchool", None)
+        self.state["courses"] = {}
+        self.log(f"deploying {name}")
+        nonce = self.sender.nonces[self.account.address]
+        self.state[name] = {"nonce": nonce, "from_block": web3.eth.block_number}
+        self._save()
+        return self._send(container.deploy, *args)
+
+    def _send(self, fn, *args, gas_limit=None):
+        tx = {"from": self.account}
+        if gas_limit is not None:
+            tx["gas_limit"] = gas_limit
+        return self.sender.submit(fn, *args, tx)
+
+    def _await(self, sent):
+        failed = []
+        for tx in sent:
+            if tx.status == -1:
+                tx.wait(1)
+            if tx.status != 1:
+                failed.append(f"{tx.fn_name or 'transaction'} {tx.txid}")
+        if failed:
+            # the nonces of dropped transactions are free again
+            self._await_pending()
+            raise DeploymentError("failed: " + ", ".join(failed))
+
+    def _await_pending(self, poll_interval=1):
+        address = self.account.address
+        while web3.eth.get_transaction_count(address, "pending") > web3.eth.get_transaction_count(address):
+            time.sleep(poll_interval)
+        self.sender.nonces[address] = web3.eth.get_transaction_count(address)
+
+    def _save(self):
+        path = f"{self.state_path}.tmp"
+        with open(path, "w") as fp:
+            json.dump(self.state, fp, indent=2, sort_keys=True)
+        os.replace(path, self.state_path)
+
+
+def load_manifest(path):
+    with open(path) as fp:
+        return json.load(fp)
+
+
+def _course(entry):
+    """The createCourse arguments of a manifest entry."""
+    return (int(Wei(entry["stake"])), int(entry["duration"]), entry["url"], to_checksum_address(entry["creator"]))
+
+
+def _create_address(sender, nonce):
+    return to_checksum_address(keccak(rlp.encode([bytes(HexBytes(sender)), nonce]))[12:])
+
+
+def main(account_id, state_path, manifest=None, stable=DAI, registry=REGISTRY):
+    deployment = Deployment(accounts.load(account_id), state_path, stable, registry)
+    course_ids = deployment.run(load_manifest(manifest) if manifest else ())
+    print(f"LearningCurve {deployment.learning_curve.address}")
+    print(f"DeSchool {deployment.deschool.address}")
+    print(f"{len(course_ids)} courses")
@@ -0,0 +1,126 @@
+"""
+Scheduler of the blocks in which DeSchool learners become eligible.
+
+`verify(learner, courseId)` is true once `block.number - blockRegistered >
+duration`, so a learner registered in block `b` can `mint` or `redeem` in a
+transaction mined in block `b + duration + 1` or later. That block is known
+the moment the learner registers, so instead of calling `verify` for every
+learner every block, `EligibilityScheduler` keeps a heap of eligibility blocks
+and, as the head advances, pops only the learners who just became eligible:
+
+    def notify(course_id, learner, block):
+        ...
+
+    scheduler = EligibilityScheduler.from_index(indexer, notify)
+    scheduler.step()                      # sync the index, then fire for head + 1
+    asyncio.run(scheduler.run())          # or keep doing so every `poll_interval` seconds
+
+Registrations, course durations and the learners who have already minted or
+redeemed - who are never fired for - are read from an `EventIndexer`. Each
+learner fires once, with the block it became eligible in, and callbacks fire
+in order of that block.
+"""
+
+import asyncio
+import heapq
+
+from brownie import web3
+
+
+class EligibilityScheduler:
+    def __init__(self, on_eligible, indexer=None, poll_interval=15, log=print):
+        """
+        Call `on_eligible(course_id, learner, block)` for every learner as it
+        becomes eligible, following `indexer` if given.
+        """
+        self.on_eligible = on_eligible
+        self.indexer = indexer
+        self.poll_interval = poll_interval
+        self.log = log
+        # {course id: duration}
+        self.durations = {}
+        # (eligible block, course id, learner), and {(course id, learner): eligible block} of those not yet fired
+        self._heap = []
+        self.pending = {}
+        # {(course id, learner)} of learners who minted or redeemed before they were fired for
+        self._settled = set()
+        self._indexed_to = -1
+
+    @classmethod
+    def from_index(cls, indexer, on_eligible, **kwargs):
+        """A scheduler of every learner in the synced `indexer` who has neither minted nor redeemed."""
+        scheduler = cls(on_eligible, indexer, **kwargs)
+        scheduler.follow_index()
+        return scheduler
+
+    def add_course(self, course_id, duration):
+        self.durations[course_id] = duration
+
+    def register(self, course_id, learner, block):
+        """Schedule a learner registered in `block`; returns the block it becomes eligible in."""
+        key = (course_id, str(learner))
+        eligible = block + self.durations[course_id] + 1
+        if key in self._settled:
+            return eligible
+        self.pending[key] = eligible
+        heapq.heappush(self._heap, (eligible, course_id, key[1]))
+        return eligible
+
+    def settle(self, course_id, learner):
+        """Drop a learner who minted or redeemed, so it is never fired for."""
+        key = (course_id, str(learner))
+        self._settled.add(key)
+        # left in the heap, and skipped once popped
+        self.pending.pop(key, None)
+
+    def next_block(self):
+        """The block the next learner becomes eligible in, None if none is waiting."""
+        while self._heap and self.pending.get(self._heap[0][1:]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+        return self._heap[0][0] if self._heap else None
+
+    def advance(self, block):
+        """Fire for every learner eligible in `block`, returning (course id, learner, eligible block) of each."""
+        fired = []
+        while self._heap and self._heap[0][0] <= block:
+            eligible, course_id, learner = heapq.heappop(self._heap)
+            if self.pending.get((course_id, learner)) != eligible:
+                continue
+            del self.pending[(course_id, learner)]
+            fired.append((course_id, learner, eligible))
+            self.on_eligible(course_id, learner, eligible)
+        return fired
+
+    def follow_index(self):
+        """Fold in the courses, registrations and outcomes the indexer added since the last call."""
+        db, since = self.indexer.db, self._indexed_to
+        for course_id, duration in db.execute("SELECT course_id, duration FROM courses WHERE block > ?", (since,)):
+            self.add_course(course_id, duration)
+        for course_id, learner, block, outcome_block in db.execute(
+            "SELECT course_id, learner, block, outcome_block FROM learners"
+            " WHERE block > ? OR outcome_block > ? ORDER BY block",
+            (since, since),
+        ):
+            if outcome_block is not None:
+                self.settle(course_id, learner)
+            elif block > since:
+                self.register(course_id, learner, block)
+        self._indexed_to = self.indexer.last_block
+        return self._indexed_to
+
+    def step(self):
+        """Sync the index and fire for the learners eligible in the next block."""
+        self.indexer.sync()
+        self.follow_index()
+        return self.advance(web3.eth.block_number + 1)
+
+    async def run(self, stop=None):
+        """Step every `poll_interval` seconds until the `stop` event (an asyncio.Event) is set, or forever."""
+        loop = asyncio.get_running_loop()
+        while stop is None or not stop.is_set():
+            try:
+                await loop.run_in_executor(None, self.step)
+            except Exception as exc:
+                # a flaky node shouldn't take the scheduler down, the next step tries again
+                self.log(f"eligibility step failed: {exc!r}")
+            await asyncio.sleep(self.poll_interval)
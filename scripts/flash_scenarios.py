@@ -0,0 +1,170 @@
+"""
+Profit and loss of the flash-mint pattern over a grid of scenarios.
+
+`test_flash_behaviour` checks a single case: a whale mints a huge amount of
+LEARN, learners mint after it, then everyone burns, learners first and the
+whale last. `explore` runs the same pattern for every combination of whale
+size, number of learners, learner amount and burn order, each scenario in the
+bit-exact `LearningCurveModel` of a freshly initialised curve, fanned out over
+a process pool:
+
+    rows = explore(whales=[0, 10**24, 10**30], learner_counts=[1, 10], learner_amounts=[10**22], processes=8)
+
+or `python -m scripts.flash_scenarios [processes]` for the default grid,
+written as CSV to `reports/flash_scenarios.csv`.
+
+Each row gives, in wei of DAI, what the whale and the learners got back less
+what they paid in. Burn orders are
+
+    whale_last_reversed   learners burn in reverse order of minting, then the whale
+    whale_last            learners burn in order of minting, then the whale
+    whale_first           the whale burns first, then the learners in order
+    whale_middle          the whale burns once half of the learners have
+
+A scenario in which some mint or burn would revert on-chain is reported with
+the revert message and no profits. `replay_on_chain` runs one scenario against
+a deployed LearningCurve, returning the same row, to check the model against
+the contract.
+"""
+
+import csv
+import itertools
+import os
+import sys
+from multiprocessing import Pool
+
+from scripts import curve_math
+
+REPORT_PATH = "reports/flash_scenarios.csv"
+WHALES = (0, 10 ** 21, 10 ** 24, 10 ** 27, 10 ** 30, 10 ** 33)
+LEARNER_COUNTS = (1, 5, 20, 100)
+LEARNER_AMOUNTS = (10 ** 18, 10 ** 20, 10 ** 22, 10 ** 24)
+ORDERS = ("whale_last_reversed", "whale_last", "whale_first", "whale_middle")
+COLUMNS = (
+    "whale_amount",
+    "learners",
+    "learner_amount",
+    "order",
+    "whale_pnl",
+    "learner_pnl_total",
+    "learner_pnl_min",
+    "learner_pnl_max",
+    "final_reserve",
+    "reverted",
+)
+
+WHALE = "whale"
+CURVE = "curve"
+
+
+def burn_order(order, learners):
+    """The holders in the order they burn, as WHALE and learner indexes."""
+    learner_ids = list(range(learners))
+    if order == "whale_last_reversed":
+        return learner_ids[::-1] + [WHALE]
+    if order == "whale_last":
+        return learner_ids + [WHALE]
+    if order == "whale_first":
+        return [WHALE] + learner_ids
+    if order == "whale_middle":
+        return learner_ids[:learners // 2] + [WHALE] + learner_ids[learners // 2:]
+    raise ValueError(f"unknown burn order: {order}")
+
+
+def scenarios(whales=WHALES, learner_counts=LEARNER_COUNTS, learner_amounts=LEARNER_AMOUNTS, orders=ORDERS):
+    """Every (whale amount, learners, learner amount, order) of the grid."""
+    return list(itertools.product(whales, learner_counts, learner_amounts, orders))
+
+
+def run_scenario(scenario):
+    """The row of one scenario, run in the model of a freshly initialised curve."""
+    whale_amount, learners, learner_amount, order = scenario
+    model = curve_math.LearningCurveModel()
+    model.initialise(CURVE)
+    returned = {}
+    try:
+        model.mint(WHALE, whale_amount)
+        for learner in range(learners):
+            model.mint(learner, learner_amount)
+        for holder in burn_order(order, learners):
+            returned[holder] = model.burn(holder, model.balance_of(holder))
+    except curve_math.CurveRevert as exc:
+        return _row(scenario, None, None, exc.revert_msg or "reverted")
+    return _row(scenario, returned, model.reserve_balance)
+
+
+def replay_on_chain(scenario, learning_curve, token, funder, whale, learners):
+    """
+    Run `scenario` against `learning_curve`, with `whale` and the first
+    `scenario[1]` of `learners` funded by `funder`. The curve should be freshly
+    initialised for the row to match `run_scenario`'s.
+    """
+    whale_amount, count, learner_amount, order = scenario
+    accounts = {WHALE: whale, **dict(enumerate(learners[:count]))}
+    for holder, account in accounts.items():
+        amount = whale_amount if holder == WHALE else learner_amount
+        token.transfer(account, amount, {"from": funder})
+        token.approve(learning_curve, amount, {"from": account})
+        learning_curve.mint(amount, {"from": account})
+    returned = {}
+    for holder in burn_order(order, count):
+        account = accounts[holder]
+        tx = learning_curve.burn(learning_curve.balanceOf(account), {"from": account})
+        returned[holder] = tx.events["LearnBurned"]["daiReturned"]
+    return _row(scenario, returned, learning_curve.reserveBalance())
+
+
+def _row(scenario, returned, final_reserve, reverted=""):
+    whale_amount, learners, learner_amount, order = scenario
+    row = dict(zip(COLUMNS, (whale_amount, learners, learner_amount, order)))
+    row.update(reverted=reverted, final_reserve=final_reserve)
+    if returned is None:
+        row.update(whale_pnl=None, learner_pnl_total=None, learner_pnl_min=None, learner_pnl_max=None)
+        return row
+    learner_pnl = [returned[learner] - learner_amount for learner in range(learners)]
+    row.update(
+        whale_pnl=returned[WHALE] - whale_amount,
+        learner_pnl_total=sum(learner_pnl),
+        learner_pnl_min=min(learner_pnl, default=0),
+        learner_pnl_max=max(learner_pnl, default=0),
+    )
+    return row
+
+
+def explore(
+    whales=WHALES,
+    learner_counts=LEARNER_COUNTS,
+    learner_amounts=LEARNER_AMOUNTS,
+    orders=ORDERS,
+    processes=None,
+):
+    """The rows of every scenario of the grid, in grid order."""
+    grid = scenarios(whales, learner_counts, learner_amounts, orders)
+    if processes == 1:
+        return list(map(run_scenario, grid))
+    with Pool(processes) as pool:
+        return pool.map(run_scenario, grid, chunksize=max(len(grid) // 64, 1))
+
+
+def write_csv(rows, path=REPORT_PATH):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", newline="") as fp:
+        writer = csv.DictWriter(fp, COLUMNS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def main(processes=None, output=REPORT_PATH):
+    rows = explore(processes=int(processes) if processes else None)
+    write_csv(rows, output)
+    completed = [row for row in rows if not row["reverted"]]
+    print(f"{len(rows)} scenarios, {len(rows) - len(completed)} revert, written to {output}")
+    if completed:
+        worst = min(completed, key=lambda row: row["learner_pnl_min"])
+        best = max(completed, key=lambda row: row["whale_pnl"])
+        print(f"worst learner loss {worst['learner_pnl_min']} wei: {worst}")
+        print(f"best whale profit {best['whale_pnl']} wei: {best}")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
@@ -0,0 +1,304 @@
+"""
+Gas benchmark of every state-changing DeSchool and LearningCurve function.
+
+Deploys a local stack (see `local_stack`), drives each function through a set
+of named cases covering the parameters that change its cost, and writes a JSON
+report of min/avg/max gas per function. The report is then compared with the
+"Current gas report" block in README.md and the run fails if any function got
+more expensive than the README by more than `threshold` percent:
+
+    brownie run gas_benchmark                      # gate at 5%
+    brownie run gas_benchmark main 2               # gate at 2%
+    brownie run gas_benchmark main 5 true          # accept: rewrite the README block
+
+The gate only runs against a block this script wrote, which it marks with a
+first line naming itself; a block pasted from brownie's `--gas` profile is
+refused. After an intended gas change re-run with `update_readme` set and
+commit the new block with the change.
+"""
+
+import json
+import os
+import re
+import sys
+
+from brownie import DeSchool, LearningCurve, accounts
+from scripts.fast_forward import fast_forward
+from scripts.local_stack import deploy_yield_mocks
+from scripts.permit import sign_permit
+
+README_PATH = "README.md"
+REPORT_PATH = "reports/gas_report.json"
+THRESHOLD = 5
+
+STAKE = 10 ** 20
+DURATION = 10
+URL_LENGTHS = (0, 32, 256, 1024)
+CONTRACTS = ("DeSchool", "LearningCurve")
+
+_REPORT_HEADER = "## Current gas report\n```\n"
+_GENERATED_LINE = "Generated by scripts/gas_benchmark.py"
+_CONTRACT_LINE = re.compile(r"^(\w+) <Contract>$")
+_FUNCTION_LINE = re.compile(
+    r"^\s+[├└]─ (\w+)\s+-\s+avg:\s+(\d+)\s+avg \(confirmed\):\s+(\d+)"
+    r"\s+low:\s+(\d+)\s+high:\s+(\d+)$"
+)
+
+
+class GasStats:
+    """Gas used per contract and function, keyed by benchmark case."""
+
+    def __init__(self):
+        self.cases = {}
+
+    def record(self, tx, case=""):
+        cases = self.cases.setdefault(tx.contract_name, {}).setdefault(tx.fn_name, {})
+        key = case or str(len(cases))
+        while key in cases:
+            key += "'"
+        cases[key] = tx.gas_used
+        return tx
+
+    def report(self):
+        report = {}
+        for contract, functions in sorted(self.cases.items()):
+            report[contract] = {}
+            for fn_name, cases in sorted(functions.items()):
+                gas = list(cases.values())
+                report[contract][fn_name] = {
+                    "min": min(gas),
+                    "avg": sum(gas) // len(gas),
+                    "max": max(gas),
+                    "count": len(gas),
+                    "cases": cases,
+                }
+        return report
+
+
+def main(threshold=THRESHOLD, update_readme=False, output=REPORT_PATH):
+    threshold = float(threshold)
+    update_readme = str(update_readme).lower() in ("1", "true", "yes")
+
+    with open(README_PATH) as fp:
+        readme = fp.read()
+    if not update_readme and not is_generated(readme):
+        sys.exit(f"the gas report in {README_PATH} was not written by this script, rewrite it with update_readme")
+
+    report = run_benchmarks(accounts[0])
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as fp:
+        json.dump(report, fp, indent=2, sort_keys=True)
+    print(f"gas report written to {output}")
+
+    regressions = compare(report, parse_gas_report(readme), threshold)
+    if update_readme:
+        with open(README_PATH, "w") as fp:
+            fp.write(replace_gas_report(readme, format_gas_report(report)))
+        print(f"gas report in {README_PATH} updated")
+    elif regressions:
+        sys.exit("gas regressions beyond {}%:\n{}".format(threshold, "\n".join(regressions)))
+
+
+def run_benchmarks(deployer):
+    """Deploy a fresh stack and return the gas report of every benchmark case."""
+    stats = GasStats()
+    stack = deploy_yield_mocks(deployer)
+    token = stack.token
+
+    def funded(amount=0):
+        account = accounts.add()
+        deployer.transfer(account, "1 ether")
+        if amount:
+            token.transfer(account, amount, {"from": deployer})
+        return account
+
+    learning_curve = LearningCurve.deploy(token, {"from": deployer})
+    stats.record(learning_curve.tx)
+    token.approve(learning_curve, 1e18, {"from": deployer})
+    stats.record(learning_curve.initialise({"from": deployer}))
+    deschool = DeSchool.deploy(token, learning_curve, stack.registry, {"from": deployer})
+    stats.record(deschool.tx)
+
+    _bench_learning_curve(stats, learning_curve, token, deployer, funded)
+    _bench_deschool(stats, deschool, token, stack.vault, deployer, funded)
+    return stats.report()
+
+
+def _bench_learning_curve(stats, learning_curve, token, deployer, funded):
+    # mint at a growing reserve: small ratios against the initial 1 DAI reserve,
+    # then a huge deposit, then small mints against the huge reserve
+    minters = []
+    for wad in (10 ** 15, 10 ** 18, 10 ** 22, 10 ** 30, 10 ** 18):
+        minter = funded(wad)
+        minters.append(minter)
+        token.approve(learning_curve, wad, {"from": minter})
+        reserve = learning_curve.reserveBalance()
+        stats.record(
+            learning_curve.mint(wad, {"from": minter}),
+            f"reserve={reserve:.0e},wad={wad:.0e}",
+        )
+
+    sender, learner = funded(10 ** 18), funded()
+    token.approve(learning_curve, 10 ** 18, {"from": sender})
+    stats.record(learning_curve.mintForAddress(learner, 10 ** 18, {"from": sender}))
+
+    signer = funded(10 ** 18)
+    permit = sign_permit(token, signer, learning_curve)
+    stats.record(learning_curve.permitAndMint(10 ** 18, *permit, {"from": signer}))
+
+    # minted 10_000 DAI against a 1 DAI reserve, so holds plenty of LEARN
+    holder = minters[2]
+    stats.record(learning_curve.burn(10 ** 18, {"from": holder}), "small")
+    # the whale's deposit dwarfs every other, so it holds almost all of the supply
+    whale = minters[3]
+    balance = learning_curve.balanceOf(whale)
+    stats.record(
+        learning_curve.burn(balance, {"from": whale}),
+        "{:.2%} of supply".format(balance / learning_curve.totalSupply()),
+    )
+
+    spender, receiver = funded(), funded()
+    stats.record(learning_curve.approve(spender, 10 ** 18, {"from": holder}), "fresh")
+    stats.record(learning_curve.approve(spender, 2 * 10 ** 18, {"from": holder}), "update")
+    stats.record(learning_curve.transfer(receiver, 10 ** 18, {"from": holder}), "new holder")
+    stats.record(learning_curve.transfer(receiver, 10 ** 18, {"from": holder}), "existing holder")
+    stats.record(learning_curve.transferFrom(holder, spender, 10 ** 18, {"from": spender}))
+
+
+def _bench_deschool(stats, deschool, token, vault, deployer, funded):
+    creator = funded()
+    for length in URL_LENGTHS:
+        stats.record(
+            deschool.createCourse(STAKE, DURATION, "u" * length, creator, {"from": deployer}),
+            f"url={length}",
+        )
+    course, scholarship_course = 0, 1
+
+    def learner():
+        account = funded(STAKE)
+        token.approve(deschool, STAKE, {"from": account})
+        return account
+
+    # batch 0: deployed to the vault before redeeming / minting
+    deployed = [learner() for _ in range(4)]
+    stats.record(deschool.register(course, {"from": deployed[0]}), "cold batchTotal")
+    for account in deployed[1:]:
+        stats.record(deschool.register(course, {"from": account}), "warm batchTotal")
+    signer = funded(STAKE)
+    permit = sign_permit(token, signer, deschool)
+    stats.record(deschool.permitAndRegister(course, *permit, {"from": signer}))
+    deployed.append(signer)
+    stats.record(deschool.batchDeposit({"from": deployer}))
+
+    # batch 1: still held by DeSchool when redeeming / minting
+    undeployed = [learner() for _ in range(2)]
+    stats.record(deschool.register(course, {"from": undeployed[0]}), "cold batchTotal after deposit")
+    stats.record(deschool.register(course, {"from": undeployed[1]}), "warm batchTotal after deposit")
+
+    provider = funded(3 * STAKE)
+    token.approve(deschool, 2 * STAKE, {"from": provider})
+    stats.record(
+        deschool.createScholarships(scholarship_course, STAKE, {"from": provider}), "new vault"
+    )
+    stats.record(
+        deschool.createScholarships(scholarship_course, STAKE, {"from": provider}),
+        "existing vault",
+    )
+    permit = sign_permit(token, provider, deschool)
+    stats.record(
+        deschool.permitCreateScholarships(scholarship_course, STAKE, *permit, {"from": provider})
+    )
+    for _ in range(3):
+        stats.record(deschool.registerScholar(scholarship_course, {"from": funded()}), "fresh")
+
+    fast_forward(DURATION + 1)
+    vault.harvest({"from": deployer})
+    stats.record(deschool.registerScholar(scholarship_course, {"from": funded()}), "recycled")
+    stats.record(deschool.redeem(course, {"from": deployed[0]}), "deployed")
+    stats.record(deschool.mint(course, {"from": deployed[1]}), "deployed")
+    stats.record(deschool.redeem(course, {"from": undeployed[0]}), "undeployed")
+    stats.record(deschool.mint(course, {"from": undeployed[1]}), "undeployed")
+    stats.record(deschool.withdrawYieldRewards({"from": creator}))
+    stats.record(deschool.withdrawScholarship(scholarship_course, STAKE, {"from": provider}), "partial")
+    stats.record(
+        deschool.withdrawScholarship(scholarship_course, 2 * STAKE, {"from": provider}), "remaining"
+    )
+
+
+def compare(report, baseline, threshold):
+    """
+    Return a line for each function whose average or maximum gas in `report`
+    exceeds the baseline's confirmed average or high by more than `threshold`%.
+    Functions missing from the baseline are reported but never fail the run.
+    """
+    regressions = []
+    limit = 1 + threshold / 100
+    for contract, functions in report.items():
+        for fn_name, stats in functions.items():
+            base = baseline.get(contract, {}).get(fn_name)
+            if base is None:
+                print(f"{contract}.{fn_name}: not in baseline")
+                continue
+            for key, base_key in (("avg", "avg (confirmed)"), ("max", "high")):
+                if stats[key] > base[base_key] * limit:
+                    regressions.append(
+                        f"{contract}.{fn_name} {key}: {stats[key]} > {base[base_key]} "
+                        f"({stats[key] / base[base_key] - 1:+.2%})"
+                    )
+    return regressions
+
+
+def parse_gas_report(readme):
+    """Parse the README gas report block into {contract: {function: stats}}."""
+    baseline, contract = {}, None
+    for line in _gas_report_block(readme).splitlines():
+        match = _CONTRACT_LINE.match(line)
+        if match:
+            contract = baseline.setdefault(match.group(1), {})
+            continue
+        match = _FUNCTION_LINE.match(line)
+        if match and contract is not None:
+            avg, confirmed, low, high = map(int, match.groups()[1:])
+            contract[match.group(1)] = {
+                "avg": avg,
+                "avg (confirmed)": confirmed,
+                "low": low,
+                "high": high,
+            }
+    return baseline
+
+
+def format_gas_report(report):
+    """Render `report` in the layout of brownie's gas profile, most expensive first."""
+    lines = [_GENERATED_LINE]
+    # DeSchool and LearningCurve first, as brownie lists them, then any other contract benchmarked
+    contracts = [c for c in CONTRACTS if c in report] + sorted(set(report) - set(CONTRACTS))
+    for contract in contracts:
+        functions = sorted(report[contract].items(), key=lambda i: -i[1]["avg"])
+        name_width = max(len(name) for name, _ in functions)
+        width = max(len(str(stats["max"])) for _, stats in functions)
+        lines.append(f"{contract} <Contract>")
+        for i, (name, stats) in enumerate(functions):
+            branch = "└─" if i == len(functions) - 1 else "├─"
+            avg, low, high = (str(stats[k]).rjust(width) for k in ("avg", "min", "max"))
+            lines.append(
+                f"   {branch} {name.ljust(name_width)} -  avg: {avg}  "
+                f"avg (confirmed): {avg}  low: {low}  high: {high}"
+            )
+    return "\n".join(lines) + "\n"
+
+
+def is_generated(readme):
+    """Whether the README gas report block was written by `format_gas_report`."""
+    return _gas_report_block(readme).startswith(_GENERATED_LINE + "\n")
+
+
+def replace_gas_report(readme, block):
+    start = readme.index(_REPORT_HEADER) + len(_REPORT_HEADER)
+    end = readme.index("```", start)
+    return readme[:start] + block + readme[end:]
+
+
+def _gas_report_block(readme):
+    start = readme.index(_REPORT_HEADER) + len(_REPORT_HEADER)
+    return readme[start:readme.index("```", start)]
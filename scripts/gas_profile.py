@@ -0,0 +1,196 @@
+"""
+Gas profile of LearningCurve `mint` and `burn`, by internal function and source line.
+
+The gas report only gives the total of each call. `GasProfile` takes the
+node's trace of a transaction, as expanded by brownie, and charges the gas of
+every step to the stack of internal functions executing it - following the
+jumps into `PRBMathUD60x18.ln`, `exp` and `PRBMath.mostSignificantBit` - and
+to its source line. Profiles add up across transactions, and are written as
+collapsed stacks, the input of flamegraph.pl, speedscope and most other flame
+graph viewers, and as a JSON summary of self and inclusive gas per function
+and the costliest lines:
+
+    brownie run gas_profile                 # reports/gas_profile.folded and .json
+    flamegraph.pl reports/gas_profile.folded > gas_profile.svg
+
+`profile_curve` replays mints and burns over a grid of reserve balances and
+amounts, so the profile covers the range of inputs the maths sees rather than
+a single case. Any other transaction can be profiled with `GasProfile.add`.
+
+A step's gas is the drop in gas remaining to the next step at its depth, so a
+call is charged what it cost the caller without what the callee used, and the
+callee's steps are charged to the callee's frames. What the trace doesn't
+cover - the intrinsic 21000 and calldata gas, less refunds - is charged to an
+`<intrinsic>` frame, so every transaction's frames sum to its `gas_used`.
+"""
+
+import bisect
+import json
+import os
+from collections import Counter
+
+from brownie import accounts, chain
+
+from scripts.local_stack import deploy_local_stack
+
+REPORT_PATH = "reports/gas_profile"
+# reserve balances to profile at, from the initial 1 DAI
+RESERVES = (10 ** 18, 10 ** 21, 10 ** 24, 10 ** 27)
+# DAI minted at each reserve; half of the LEARN it mints is then burnt
+WADS = (10 ** 15, 10 ** 18, 10 ** 21, 10 ** 24)
+INTRINSIC = "<intrinsic>"
+TOP_LINES = 25
+
+
+class GasProfile:
+    def __init__(self):
+        # {(label, outermost function, ..., innermost function): gas spent in the innermost}
+        self.stacks = Counter()
+        # {(function, "path:line"): gas}
+        self.lines = Counter()
+        # {label: number of transactions}, {label: their total gas_used}
+        self.transactions = Counter()
+        self.gas_used = Counter()
+        self._sources = {}
+
+    def add(self, tx, label=None):
+        """Add a brownie transaction, grouped under `label` (its function name by default)."""
+        self.add_trace(tx.trace, tx.gas_used, label or tx.fn_name)
+        return tx
+
+    def add_trace(self, trace, gas_used, label):
+        """Add an expanded trace - steps with op, gas, gasCost, depth, fn, jumpDepth and source."""
+        costs = step_costs(trace)
+        for step, stack, cost in zip(trace, _stacks(trace), costs):
+            self.stacks[(label,) + stack] += cost
+            if step.get("source"):
+                self.lines[(stack[-1], self._line(step["source"]))] += cost
+        self.stacks[(label, INTRINSIC)] += gas_used - sum(costs)
+        self.transactions[label] += 1
+        self.gas_used[label] += gas_used
+
+    def folded(self):
+        """The profile as collapsed stacks, one `frame;frame;frame gas` line per stack."""
+        return "".join(
+            "{} {}\n".format(";".join(stack), gas) for stack, gas in sorted(self.stacks.items()) if gas > 0
+        )
+
+    def summary(self, top=TOP_LINES):
+        total = sum(self.gas_used.values())
+        functions = {}
+        for stack, gas in self.stacks.items():
+            functions.setdefault(stack[-1], {"self": 0, "inclusive": 0})["self"] += gas
+            # count recursion once
+            for fn in set(stack[1:]):
+                functions.setdefault(fn, {"self": 0, "inclusive": 0})["inclusive"] += gas
+        for gas in functions.values():
+            gas["share"] = gas["inclusive"] / total if total else 0
+        return {
+            "transactions": {
+                label: {"count": count, "avg_gas_used": self.gas_used[label] // count}
+                for label, count in sorted(self.transactions.items())
+            },
+            "functions": dict(sorted(functions.items(), key=lambda item: -item[1]["inclusive"])),
+            "lines": [
+                {"function": fn, "line": line, "gas": gas, "share": gas / total if total else 0}
+                for (fn, line), gas in self.lines.most_common(top)
+            ],
+        }
+
+    def write(self, path=REPORT_PATH):
+        """Write `<path>.folded` and `<path>.json`."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(f"{path}.folded", "w") as fp:
+            fp.write(self.folded())
+        with open(f"{path}.json", "w") as fp:
+            json.dump(self.summary(), fp, indent=2)
+
+    def _line(self, source):
+        filename, (start, _) = source["filename"], source["offset"]
+        if filename not in self._sources:
+            try:
+                with open(filename) as fp:
+                    text = fp.read()
+                self._sources[filename] = [i for i, char in enumerate(text) if char == "\n"]
+            except OSError:
+                self._sources[filename] = None
+        newlines = self._sources[filename]
+        if newlines is None:
+            return f"{filename}@{start}"
+        return f"{filename}:{bisect.bisect_right(newlines, start - 1) + 1}"
+
+
+def step_costs(trace):
+    """The gas each step of `trace` spent itself, excluding gas used by the contracts it called."""
+    costs = []
+    for i, step in enumerate(trace):
+        following = trace[i + 1] if i + 1 < len(trace) else None
+        if following is None or following["depth"] < step["depth"]:
+            # the last step of a call, with nothing after it at its depth to measure against
+            costs.append(step["gasCost"])
+        elif following["depth"] == step["depth"]:
+            costs.append(step["gas"] - following["gas"])
+        else:
+            back = next((j for j in range(i + 1, len(trace)) if trace[j]["depth"] <= step["depth"]), None)
+            if back is None:
+                costs.append(step["gasCost"])
+                continue
+            last = trace[back - 1]
+            used_by_callee = following["gas"] - last["gas"] + last["gasCost"]
+            costs.append(step["gas"] - trace[back]["gas"] - used_by_callee)
+    return costs
+
+
+def _stacks(trace):
+    # the internal calls brownie found at each depth, indexed by jumpDepth
+    frames = []
+    stack, last = (), None
+    for step in trace:
+        key = (step["depth"], step["jumpDepth"], step["fn"])
+        if key != last:
+            depth, jump_depth, fn = last = key
+            del frames[depth + 1:]
+            while len(frames) <= depth:
+                frames.append([])
+            calls = frames[depth]
+            del calls[jump_depth + 1:]
+            calls.extend([fn] * (jump_depth + 1 - len(calls)))
+            calls[jump_depth] = fn
+            stack = tuple(name for names in frames for name in names)
+        yield stack
+
+
+def profile_curve(learning_curve, token, account, reserves=RESERVES, wads=WADS, profile=None):
+    """
+    Profile a mint of every amount in `wads`, and a burn of half the LEARN it
+    minted, at every reserve balance in `reserves`. `account` must hold the
+    DAI to bring the reserve up to the largest balance and mint the largest
+    amount. Each mint and burn is reverted before the next.
+    """
+    profile = profile or GasProfile()
+    for reserve in sorted(reserves):
+        current = learning_curve.reserveBalance()
+        if reserve > current:
+            token.approve(learning_curve, reserve - current, {"from": account})
+            learning_curve.mint(reserve - current, {"from": account})
+        chain.snapshot()
+        for wad in wads:
+            token.approve(learning_curve, wad, {"from": account})
+            tx = profile.add(learning_curve.mint(wad, {"from": account}), "mint")
+            minted = tx.events["LearnMinted"]["amountMinted"]
+            profile.add(learning_curve.burn(minted // 2, {"from": account}), "burn")
+            chain.revert()
+    return profile
+
+
+def main(output=REPORT_PATH):
+    deployer = accounts[0]
+    stack = deploy_local_stack(deployer)
+    profile = profile_curve(stack.learning_curve, stack.token, deployer)
+    profile.write(output)
+    summary = profile.summary()
+    for label, stats in summary["transactions"].items():
+        print(f"{label}: {stats['count']} transactions, {stats['avg_gas_used']} gas on average")
+    for fn, gas in list(summary["functions"].items())[:10]:
+        print(f"  {fn:<40} {gas['share']:>7.1%} inclusive  {gas['self']:>10} self")
+    print(f"profile written to {output}.folded and {output}.json")
@@ -0,0 +1,234 @@
+"""
+Point-in-time DeSchool and LearningCurve state, rebuilt from the event index.
+
+Disputes need `reserveBalance`, `totalSupply`, LEARN balances and the
+`batchTotal` and `batchYieldTotal` of past batches as they were at some past
+block, which only an archive node can read. `StateHistory` folds the events of
+an `EventIndexer` database, in block order, into that state:
+
+    LearnMinted, LearnBurned   reserveBalance += daiDeposited, -= daiReturned
+    Transfer                   balances, and totalSupply for mints and burns
+    LearnerRegistered          batchTotal[batch] += the course's stake
+    BatchDeposited             batchYieldTotal[batch] = batchYieldAmount
+
+`initialise` puts 1 DAI in the reserve without an event of its own, so it is
+read from the first LEARN minted, which only `initialise` can mint. Every
+`interval` events, at the end of a block, the whole state is checkpointed, so
+a query at any block binary searches for the checkpoint before it and replays
+at most the events since:
+
+    history = StateHistory(indexer)
+    history.reserve_balance(block), history.total_supply(block)
+    history.balance_of(account, block)
+    history.batch_total(batch_id, block), history.batch_yield_total(batch_id, block)
+    history.state_at(block)        # all of it, balances of every account included
+
+State is as of the end of `block`. `update` folds in whatever the indexer
+synced since. The index must hold the LEARN Transfer events from the curve's
+deployment on, which databases indexed before transfers were indexed don't.
+"""
+
+import bisect
+
+from scripts import curve_math
+
+# events between checkpoints: the most a query replays, bar the rest of a block
+CHECKPOINT_INTERVAL = 1000
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+
+TRANSFER, MINT, BURN, REGISTER, DEPOSIT = range(5)
+
+
+class HistoricalState:
+    """DeSchool and LearningCurve state at the end of `block`."""
+
+    def __init__(self, block, reserve_balance=0, total_supply=0, balances=None, batch_totals=None,
+                 batch_yield_totals=None, initialised=False):
+        self.block = block
+        self.reserve_balance = reserve_balance
+        self.total_supply = total_supply
+        # {address: LEARN balance}, {batch id: DAI staked}, {batch id: vault shares}
+        self.balances = balances if balances is not None else {}
+        self.batch_totals = batch_totals if batch_totals is not None else {}
+        self.batch_yield_totals = batch_yield_totals if batch_yield_totals is not None else {}
+        self.initialised = initialised
+
+    def copy(self, block=None):
+        return HistoricalState(
+            self.block if block is None else block,
+            self.reserve_balance,
+            self.total_supply,
+            dict(self.balances),
+            dict(self.batch_totals),
+            dict(self.batch_yield_totals),
+            self.initialised,
+        )
+
+    def apply(self, event):
+        """Fold one event, as (block, kind, *fields), into the state."""
+        kind = event[1]
+        if kind == TRANSFER:
+            _, _, sender, receiver, amount = event
+            if sender == ZERO_ADDRESS:
+                self.total_supply += amount
+                if not self.initialised:
+                    self.reserve_balance += curve_math.INITIAL_RESERVE
+                    self.initialised = True
+            else:
+                self.balances[sender] = self.balances.get(sender, 0) - amount
+            if receiver == ZERO_ADDRESS:
+                self.total_supply -= amount
+            else:
+                self.balances[receiver] = self.balances.get(receiver, 0) + amount
+        elif kind == MINT:
+            self.reserve_balance += event[2]
+        elif kind == BURN:
+            self.reserve_balance -= event[2]
+        elif kind == REGISTER:
+            _, _, batch_id, stake = event
+            self.batch_totals[batch_id] = self.batch_totals.get(batch_id, 0) + stake
+        elif kind == DEPOSIT:
+            _, _, batch_id, yield_tokens = event
+            self.batch_yield_totals[batch_id] = yield_tokens
+
+    def __repr__(self):
+        return (
+            f"HistoricalState(block={self.block}, reserve_balance={self.reserve_balance}, "
+            f"total_supply={self.total_supply}, accounts={len(self.balances)}, batches={len(self.batch_totals)})"
+        )
+
+
+class StateHistory:
+    def __init__(self, indexer, interval=CHECKPOINT_INTERVAL):
+        """The history of the contracts indexed by `indexer`, checkpointed every `interval` events."""
+        self.indexer = indexer
+        self.interval = interval
+        # (block, kind, *fields) in block order, and the block of each
+        self.events = []
+        self._event_blocks = []
+        # the state as of the end of a block, the number of events folded into it, and the block of each
+        self.checkpoints = [(HistoricalState(-1), 0)]
+        self._checkpoint_blocks = [-1]
+        self._head = HistoricalState(-1)
+        self.last_block = -1
+        self.update()
+
+    def update(self):
+        """Fold in every event the indexer holds past `last_block`; returns the new `last_block`."""
+        last_block = self.indexer.last_block
+        if last_block <= self.last_block:
+            return self.last_block
+        new_events = _load_events(self.indexer.db, self.last_block, last_block)
+        kinds = {event[1] for event in new_events}
+        if not self.events and kinds & {MINT, BURN} and TRANSFER not in kinds:
+            raise ValueError("the index holds no LEARN transfers: it predates their indexing, sync it again")
+        since_checkpoint = len(self.events) - self.checkpoints[-1][1]
+        for i, event in enumerate(new_events):
+            self._head.apply(event)
+            self.events.append(event)
+            self._event_blocks.append(event[0])
+            since_checkpoint += 1
+            block_ends = i + 1 == len(new_events) or new_events[i + 1][0] != event[0]
+            if since_checkpoint >= self.interval and block_ends:
+                self._checkpoint(event[0])
+                since_checkpoint = 0
+        self.last_block = self._head.block = last_block
+        return last_block
+
+    def state_at(self, block):
+        """The whole `HistoricalState` as of the end of `block`."""
+        checkpoint, start, end = self._span(block)
+        state = checkpoint.copy(block)
+        for event in self.events[start:end]:
+            state.apply(event)
+        return state
+
+    def reserve_balance(self, block):
+        return self._scalar(block, "reserve_balance")
+
+    def total_supply(self, block):
+        return self._scalar(block, "total_supply")
+
+    def balance_of(self, account, block):
+        """LEARN held by `account` at the end of `block`."""
+        account = str(account)
+        checkpoint, start, end = self._span(block)
+        balance = checkpoint.balances.get(account, 0)
+        for event in self.events[start:end]:
+            if event[1] == TRANSFER:
+                if event[2] == account:
+                    balance -= event[4]
+                if event[3] == account:
+                    balance += event[4]
+        return balance
+
+    def batch_total(self, batch_id, block):
+        """`batchTotal[batch_id]` at the end of `block`: the stakes registered in the batch so far."""
+        checkpoint, start, end = self._span(block)
+        total = checkpoint.batch_totals.get(batch_id, 0)
+        for event in self.events[start:end]:
+            if event[1] == REGISTER and event[2] == batch_id:
+                total += event[3]
+        return total
+
+    def batch_yield_total(self, batch_id, block):
+        """`batchYieldTotal[batch_id]` at the end of `block`: 0 until the batch is deposited."""
+        checkpoint, start, end = self._span(block)
+        total = checkpoint.batch_yield_totals.get(batch_id, 0)
+        for event in self.events[start:end]:
+            if event[1] == DEPOSIT and event[2] == batch_id:
+                total = event[3]
+        return total
+
+    def _checkpoint(self, block):
+        self.checkpoints.append((self._head.copy(block), len(self.events)))
+        self._checkpoint_blocks.append(block)
+
+    def _span(self, block):
+        # the last checkpoint at or before `block`, and the events to replay on top of it
+        if block > self.last_block:
+            raise ValueError(f"block {block} is past the last indexed block {self.last_block}")
+        checkpoint, start = self.checkpoints[bisect.bisect_right(self._checkpoint_blocks, block) - 1]
+        return checkpoint, start, bisect.bisect_right(self._event_blocks, block, lo=start)
+
+    def _scalar(self, block, name):
+        checkpoint, start, end = self._span(block)
+        state = HistoricalState(block, checkpoint.reserve_balance, checkpoint.total_supply,
+                                initialised=checkpoint.initialised)
+        for event in self.events[start:end]:
+            if event[1] in (MINT, BURN) or (event[1] == TRANSFER and ZERO_ADDRESS in event[2:4]):
+                state.apply(event)
+        return getattr(state, name)
+
+
+def _load_events(db, after_block, last_block):
+    # events in (after_block, last_block], sorted by block; the order within a block doesn't change its end state
+    span = (after_block, last_block)
+    events = [
+        (block, TRANSFER, sender, receiver, int(amount))
+        for block, sender, receiver, amount in db.execute(
+            "SELECT block, sender, receiver, amount FROM learn_transfers WHERE block > ? AND block <= ?", span
+        )
+    ]
+    events += [
+        (block, MINT if kind == "mint" else BURN, int(dai_amount))
+        for block, kind, dai_amount in db.execute(
+            "SELECT block, kind, dai_amount FROM curve_events WHERE block > ? AND block <= ?", span
+        )
+    ]
+    events += [
+        (block, REGISTER, batch_id, int(stake))
+        for block, batch_id, stake in db.execute(
+            "SELECT learners.block, learners.batch_id, courses.stake FROM learners"
+            " JOIN courses USING (course_id) WHERE learners.block > ? AND learners.block <= ?",
+            span,
+        )
+    ]
+    events += [
+        (block, DEPOSIT, batch_id, int(yield_tokens))
+        for block, batch_id, yield_tokens in db.execute(
+            "SELECT block, batch_id, yield_tokens FROM batches WHERE block > ? AND block <= ?", span
+        )
+    ]
+    events.sort(key=lambda event: event[0])
+    return events
@@ -0,0 +1,397 @@
+"""
+Incremental SQLite index of DeSchool and LearningCurve events.
+
+`EventIndexer.sync` pulls the logs of both contracts from the node in pages of
+at most `page_size` blocks, decodes them against the contract ABIs and writes
+each page with bulk inserts in a single transaction, together with the last
+block indexed. A later `sync` - in the same process or after a restart -
+resumes from that checkpoint, so history is only ever fetched once:
+
+    indexer = EventIndexer("reports/events.sqlite", deschool, learning_curve, start_block)
+    indexer.sync()
+    indexer.learners_in_course(0)
+    indexer.unredeemed_learners_in_batch(3)
+
+LearnerRegistered does not carry the learner's batch, which is the number of
+BatchDeposited events before it, so indexing must start at or before the
+block DeSchool was deployed in. Token amounts are uint256 and stored as
+decimal text, and returned as python ints.
+"""
+
+import sqlite3
+
+from brownie import DeSchool, LearningCurve, web3
+from eth_utils import encode_hex, keccak, to_checksum_address
+from hexbytes import HexBytes
+
+try:
+    from eth_abi import decode as _decode_abi
+except ImportError:  # eth-abi < 4
+    from eth_abi import decode_abi as _decode_abi
+
+DESCHOOL_EVENTS = (
+    "CourseCreated",
+    "LearnerRegistered",
+    "ScholarshipCreated",
+    "ScholarRegistered",
+    "ScholarshipWithdrawn",
+    "BatchDeposited",
+    "StakeRedeemed",
+    "LearnMintedFromCourse",
+    "YieldRewardRedeemed",
+)
+LEARNING_CURVE_EVENTS = ("LearnMinted", "LearnBurned", "Transfer")
+PAGE_SIZE = 2000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoint (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    block INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS courses (
+    course_id INTEGER PRIMARY KEY,
+    stake TEXT NOT NULL,
+    duration INTEGER NOT NULL,
+    url TEXT NOT NULL,
+    creator TEXT NOT NULL,
+    block INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS learners (
+    course_id INTEGER NOT NULL,
+    learner TEXT NOT NULL,
+    batch_id INTEGER NOT NULL,
+    block INTEGER NOT NULL,
+    -- 'redeemed' or 'minted' once the learner has left the course
+    outcome TEXT,
+    stable_amount TEXT,
+    learn_minted TEXT,
+    outcome_block INTEGER,
+    outcome_log_index INTEGER,
+    PRIMARY KEY (course_id, learner)
+);
+CREATE INDEX IF NOT EXISTS learners_by_batch ON learners (batch_id, outcome);
+CREATE INDEX IF NOT EXISTS learners_by_address ON learners (learner);
+CREATE TABLE IF NOT EXISTS scholarships (
+    course_id INTEGER NOT NULL,
+    provider TEXT NOT NULL,
+    amount TEXT NOT NULL,
+    new_scholars TEXT NOT NULL,
+    scholarship_total TEXT NOT NULL,
+    vault TEXT NOT NULL,
+    yield_tokens TEXT NOT NULL,
+    block INTEGER NOT NULL,
+    log_index INTEGER NOT NULL,
+    PRIMARY KEY (block, log_index)
+);
+CREATE INDEX IF NOT EXISTS scholarships_by_course ON scholarships (course_id);
+CREATE TABLE IF NOT EXISTS scholars (
+    course_id INTEGER NOT NULL,
+    scholar TEXT NOT NULL,
+    block INTEGER NOT NULL,
+    log_index INTEGER NOT NULL,
+    PRIMARY KEY (course_id, scholar)
+);
+CREATE TABLE IF NOT EXISTS scholarship_withdrawals (
+    course_id INTEGER NOT NULL,
+    amount TEXT NOT NULL,
+    block INTEGER NOT NULL,
+    log_index INTEGER NOT NULL,
+    PRIMARY KEY (block, log_index)
+);
+CREATE TABLE IF NOT EXISTS yield_withdrawals (
+    creator TEXT NOT NULL,
+    amount TEXT NOT NULL,
+    block INTEGER NOT NULL,
+    log_index INTEGER NOT NULL,
+    PRIMARY KEY (block, log_index)
+);
+CREATE TABLE IF NOT EXISTS batches (
+    batch_id INTEGER PRIMARY KEY,
+    amount TEXT NOT NULL,
+    yield_tokens TEXT NOT NULL,
+    block INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS curve_events (
+    block INTEGER NOT NULL,
+    log_index INTEGER NOT NULL,
+    -- 'mint' or 'burn'
+    kind TEXT NOT NULL,
+    account TEXT NOT NULL,
+    learn_amount TEXT NOT NULL,
+    dai_amount TEXT NOT NULL,
+    PRIMARY KEY (block, log_index)
+);
+CREATE INDEX IF NOT EXISTS curve_events_by_account ON curve_events (account);
+-- LEARN transfers, mints from and burns to the zero address included
+CREATE TABLE IF NOT EXISTS learn_transfers (
+    block INTEGER NOT NULL,
+    log_index INTEGER NOT NULL,
+    sender TEXT NOT NULL,
+    receiver TEXT NOT NULL,
+    amount TEXT NOT NULL,
+    PRIMARY KEY (block, log_index)
+);
+"""
+
+
+class _EventDecoder:
+    """Decodes raw logs of the named events of one contract."""
+
+    def __init__(self, address, abi, names):
+        self.address = to_checksum_address(address)
+        self.events = {}
+        for item in abi:
+            if item["type"] != "event" or item["name"] not in names:
+                continue
+            types = [i["type"] for i in item["inputs"]]
+            topic = HexBytes(keccak(text="{}({})".format(item["name"], ",".join(types))))
+            self.events[topic] = (item["name"], item["inputs"])
+
+    def decode(self, log):
+        name, inputs = self.events[HexBytes(log["topics"][0])]
+        topics = iter(log["topics"][1:])
+        data_inputs = [i for i in inputs if not i["indexed"]]
+        data = iter(_decode_abi([i["type"] for i in data_inputs], HexBytes(log["data"])))
+        args = {}
+        for i in inputs:
+            if i["indexed"]:
+                args[i["name"]] = _decode_abi([i["type"]], HexBytes(next(topics)))[0]
+            else:
+                args[i["name"]] = next(data)
+            if i["type"] == "address":
+                args[i["name"]] = to_checksum_address(args[i["name"]])
+        return name, args
+
+
+class EventIndexer:
+    def __init__(
+        self,
+        db_path,
+        deschool,
+        learning_curve,
+        start_block=0,
+        page_size=PAGE_SIZE,
+        confirmations=0,
+    ):
+        """
+        Index the events of `deschool` and `learning_curve` (brownie contracts,
+        or anything with `address` and `abi`) into the SQLite database at
+        `db_path`, starting at `start_block` unless the database already holds
+        a checkpoint. Blocks within `confirmations` of the head are left for a
+        later sync, to stay clear of reorgs.
+        """
+        self.db = sqlite3.connect(db_path)
+        self.db.executescript(_SCHEMA)
+        self.page_size = page_size
+        self.confirmations = confirmations
+        self._decoders = {
+            decoder.address: decoder
+            for decoder in (
+                _EventDecoder(deschool.address, deschool.abi, DESCHOOL_EVENTS),
+                _EventDecoder(learning_curve.address, learning_curve.abi, LEARNING_CURVE_EVENTS),
+            )
+        }
+        row = self.db.execute("SELECT block FROM checkpoint").fetchone()
+        self.last_block = row[0] if row else start_block - 1
+        (self._batch_id,) = self.db.execute(
+            "SELECT COALESCE(MAX(batch_id) + 1, 0) FROM batches"
+        ).fetchone()
+
+    def sync(self, to_block=None):
+        """Index every block up to `to_block` (the confirmed head by default)."""
+        if to_block is None:
+            to_block = web3.eth.block_number - self.confirmations
+        page_size = self.page_size
+        while self.last_block < to_block:
+            from_block = self.last_block + 1
+            end = min(from_block + page_size - 1, to_block)
+            try:
+                logs = self._get_logs(from_block, end)
+            except ValueError:
+                # nodes cap the number of logs per request: retry with a smaller page
+                if page_size == 1:
+                    raise
+                page_size = max(page_size // 2, 1)
+                continue
+            self._write_page(logs, end)
+        return self.last_block
+
+    def _get_logs(self, from_block, to_block):
+        topics = [t for decoder in self._decoders.values() for t in decoder.events]
+        return web3.eth.get_logs(
+            {
+                "address": list(self._decoders),
+                "fromBlock": from_block,
+                "toBlock": to_block,
+                "topics": [[encode_hex(t) for t in topics]],
+            }
+        )
+
+    def _write_page(self, logs, last_block):
+        rows = {table: [] for table in _INSERTS}
+        outcomes = []
+        # the batch registrations join, kept apart until the page is committed
+        batch_id = self._batch_id
+        for log in sorted(logs, key=lambda log: (log["blockNumber"], log["logIndex"])):
+            decoder = self._decoders.get(to_checksum_address(log["address"]))
+            if decoder is None or HexBytes(log["topics"][0]) not in decoder.events:
+                continue
+            name, args = decoder.decode(log)
+            block, log_index = log["blockNumber"], log["logIndex"]
+            if name == "CourseCreated":
+                rows["courses"].append(
+                    (args["courseId"], str(args["stake"]), args["duration"], args["url"], args["creator"], block)
+                )
+            elif name == "LearnerRegistered":
+                rows["learners"].append((args["courseId"], args["learner"], batch_id, block))
+            elif name == "BatchDeposited":
+                rows["batches"].append(
+                    (args["batchId"], str(args["batchAmount"]), str(args["batchYieldAmount"]), block)
+                )
+                batch_id = args["batchId"] + 1
+            elif name == "ScholarshipCreated":
+                rows["scholarships"].append(
+                    (
+                        args["courseId"],
+                        args["scholarshipProvider"],
+                        str(args["scholarshipAmount"]),
+                        str(args["newScholars"]),
+                        str(args["scholarshipTotal"]),
+                        args["scholarshipVault"],
+                        str(args["scholarshipYield"]),
+                        block,
+                        log_index,
+                    )
+                )
+            elif name == "ScholarRegistered":
+                rows["scholars"].append((args["courseId"], args["scholar"], block, log_index))
+            elif name == "ScholarshipWithdrawn":
+                rows["scholarship_withdrawals"].append(
+                    (args["courseId"], str(args["amountWithdrawn"]), block, log_index)
+                )
+            elif name == "StakeRedeemed":
+                outcomes.append(
+                    ("redeemed", str(args["amount"]), None, block, log_index, args["courseId"], args["learner"])
+                )
+            elif name == "LearnMintedFromCourse":
+                outcomes.append(
+                    (
+                        "minted",
+                        str(args["stableConverted"]),
+                        str(args["learnMinted"]),
+                        block,
+                        log_index,
+                        args["courseId"],
+                        args["learner"],
+                    )
+                )
+            elif name == "YieldRewardRedeemed":
+                rows["yield_withdrawals"].append(
+                    (args["redeemer"], str(args["yieldRewarded"]), block, log_index)
+                )
+            elif name == "LearnMinted":
+                rows["curve_events"].append(
+                    (block, log_index, "mint", args["learner"], str(args["amountMinted"]), str(args["daiDeposited"]))
+                )
+            elif name == "LearnBurned":
+                rows["curve_events"].append(
+                    (block, log_index, "burn", args["learner"], str(args["amountBurned"]), str(args["daiReturned"]))
+                )
+            elif name == "Transfer":
+                rows["learn_transfers"].append((block, log_index, args["from"], args["to"], str(args["amount"])))
+
+        with self.db:
+            for table, insert in _INSERTS.items():
+                if rows[table]:
+                    self.db.executemany(insert, rows[table])
+            # outcomes always follow the registration, which is inserted above
+            self.db.executemany(
+                "UPDATE learners SET outcome = ?, stable_amount = ?, learn_minted = ?, outcome_block = ?,"
+                " outcome_log_index = ? WHERE course_id = ? AND learner = ?",
+                outcomes,
+            )
+            self.db.execute(
+                "INSERT OR REPLACE INTO checkpoint (id, block) VALUES (0, ?)", (last_block,)
+            )
+        self.last_block = last_block
+        self._batch_id = batch_id
+
+    def learners_in_course(self, course_id):
+        """Addresses of every learner who registered for `course_id`, in order."""
+        return [
+            row[0]
+            for row in self.db.execute(
+                "SELECT learner FROM learners WHERE course_id = ? ORDER BY block, rowid",
+                (course_id,),
+            )
+        ]
+
+    def unredeemed_learners_in_batch(self, batch_id):
+        """(course id, learner) of every learner in `batch_id` who has neither redeemed nor minted."""
+        return self.db.execute(
+            "SELECT course_id, learner FROM learners"
+            " WHERE batch_id = ? AND outcome IS NULL ORDER BY block, rowid",
+            (batch_id,),
+        ).fetchall()
+
+    def course(self, course_id):
+        """The CourseCreated fields of `course_id`, or None if it isn't indexed."""
+        row = self.db.execute(
+            "SELECT stake, duration, url, creator, block FROM courses WHERE course_id = ?",
+            (course_id,),
+        ).fetchone()
+        if row is None:
+            return None
+        stake, duration, url, creator, block = row
+        return {"stake": int(stake), "duration": duration, "url": url, "creator": creator, "block": block}
+
+    def batch(self, batch_id):
+        """The DAI deposited and vault shares received by `batch_id`, or None if not yet deposited."""
+        row = self.db.execute(
+            "SELECT amount, yield_tokens, block FROM batches WHERE batch_id = ?", (batch_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {"amount": int(row[0]), "yield_tokens": int(row[1]), "block": row[2]}
+
+    def scholarship_history(self):
+        """
+        (course id, event name, amount, block) of every ScholarshipCreated,
+        ScholarshipWithdrawn and ScholarRegistered event, in order. The amount is
+        the new scholarshipTotal, the amount withdrawn and None respectively.
+        """
+        return [
+            (course_id, name, None if amount is None else int(amount), block)
+            for course_id, name, amount, block, _ in self.db.execute(
+                "SELECT course_id, 'ScholarshipCreated', scholarship_total, block, log_index FROM scholarships"
+                " UNION ALL SELECT course_id, 'ScholarshipWithdrawn', amount, block, log_index"
+                " FROM scholarship_withdrawals"
+                " UNION ALL SELECT course_id, 'ScholarRegistered', NULL, block, log_index FROM scholars"
+                " ORDER BY block, log_index"
+            ).fetchall()
+        ]
+
+    def close(self):
+        self.db.close()
+
+
+_INSERTS = {
+    "courses": "INSERT OR REPLACE INTO courses VALUES (?, ?, ?, ?, ?, ?)",
+    "learners": "INSERT OR REPLACE INTO learners (course_id, learner, batch_id, block) VALUES (?, ?, ?, ?)",
+    "batches": "INSERT OR REPLACE INTO batches VALUES (?, ?, ?, ?)",
+    "scholarships": "INSERT OR REPLACE INTO scholarships VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+    "scholars": "INSERT OR REPLACE INTO scholars VALUES (?, ?, ?, ?)",
+    "scholarship_withdrawals": "INSERT OR REPLACE INTO scholarship_withdrawals VALUES (?, ?, ?, ?)",
+    "yield_withdrawals": "INSERT OR REPLACE INTO yield_withdrawals VALUES (?, ?, ?, ?)",
+    "curve_events": "INSERT OR REPLACE INTO curve_events VALUES (?, ?, ?, ?, ?, ?)",
+    "learn_transfers": "INSERT OR REPLACE INTO learn_transfers VALUES (?, ?, ?, ?, ?)",
+}
+
+
+def main(db_path, deschool, learning_curve, start_block=0):
+    """brownie run indexer main <db> <deschool address> <learning curve address> [start block]"""
+    indexer = EventIndexer(
+        db_path, DeSchool.at(deschool), LearningCurve.at(learning_curve), int(start_block)
+    )
+    print(f"indexed up to block {indexer.sync()}")
+    indexer.close()
@@ -0,0 +1,247 @@
+"""
+Keeper that calls `DeSchool.batchDeposit` when depositing is worth the gas.
+
+Every `poll_interval` seconds the keeper reads the head block, then
+`getCurrentBatchId` and `getCurrentBatchTotal` at that block and the gas
+price, and follows the LearnerRegistered and BatchDeposited events to know
+how long the current batch has been waiting. A `DepositPolicy` then weighs the
+vault yield the batch would earn against the gas the deposit costs:
+
+    policy = DepositPolicy(apr=0.05, eth_price=2000)
+    keeper = BatchKeeper(deschool, account, policy)
+    asyncio.run(keeper.run())
+
+or `brownie run keeper main <deschool address> <account id>`.
+
+Node calls are blocking, so they are run in the default executor and never
+stall the event loop the keeper shares with other services.
+"""
+
+import asyncio
+
+from brownie import DeSchool, accounts, web3
+from brownie.exceptions import VirtualMachineError
+from eth_utils import encode_hex, keccak
+from web3.exceptions import TimeExhausted
+
+BLOCKS_PER_YEAR = 2_336_000
+# ganache and mainnet both require a replacement to pay at least 10% more, 12.5% clears it with margin
+GAS_PRICE_BUMP = 1.125
+
+_LEARNER_REGISTERED = encode_hex(keccak(text="LearnerRegistered(uint256,address)"))
+_BATCH_DEPOSITED = encode_hex(keccak(text="BatchDeposited(uint256,uint256,uint256)"))
+
+
+class BatchState:
+    """What the keeper knows about the current batch when it consults the policy."""
+
+    def __init__(self, batch_id, batch_total, first_registered, block, gas_price, gas_estimate):
+        self.batch_id = batch_id
+        self.batch_total = batch_total
+        # block of the batch's first registration, None if it has none
+        self.first_registered = first_registered
+        self.block = block
+        self.gas_price = gas_price
+        self.gas_estimate = gas_estimate
+
+    @property
+    def waited(self):
+        if self.first_registered is None:
+            return 0
+        return self.block - self.first_registered
+
+
+class DepositPolicy:
+    def __init__(
+        self,
+        min_batch_total=0,
+        max_wait_blocks=6500,
+        apr=0.05,
+        horizon_blocks=10000,
+        eth_price=2000,
+        min_yield_to_gas=1.0,
+    ):
+        """
+        Decide when a batch should be deposited.
+
+        A non-empty batch is deposited once its first learner has waited
+        `max_wait_blocks`, whatever the cost. Before that it is deposited when it
+        holds at least `min_batch_total` DAI (wei) and the yield it is expected to
+        earn in the vault over `horizon_blocks` at `apr` is at least
+        `min_yield_to_gas` times the gas cost, priced at `eth_price` DAI per ETH.
+        """
+        self.min_batch_total = min_batch_total
+        self.max_wait_blocks = max_wait_blocks
+        self.apr = apr
+        self.horizon_blocks = horizon_blocks
+        self.eth_price = eth_price
+        self.min_yield_to_gas = min_yield_to_gas
+
+    def expected_yield(self, state):
+        return state.batch_total * self.apr * self.horizon_blocks / BLOCKS_PER_YEAR
+
+    def gas_cost(self, state):
+        return state.gas_estimate * state.gas_price * self.eth_price
+
+    def reason_to_deposit(self, state):
+        """Why `state`'s batch should be deposited now, or None if it should wait."""
+        if state.batch_total == 0:
+            return None
+        if state.waited >= self.max_wait_blocks:
+            return f"first learner has waited {state.waited} blocks"
+        if state.batch_total < self.min_batch_total:
+            return None
+        expected, cost = self.expected_yield(state), self.gas_cost(state)
+        if expected >= cost * self.min_yield_to_gas:
+            return f"expected yield {expected:.0f} covers gas cost {cost:.0f}"
+        return None
+
+
+class BatchKeeper:
+    def __init__(
+        self,
+        deschool,
+        account,
+        policy,
+        poll_interval=15,
+        max_retries=3,
+        retry_delay=5,
+        confirm_timeout=120,
+        log=print,
+    ):
+        """
+        Watch `deschool` and submit `batchDeposit` from `account` whenever
+        `policy` says so. Submissions the node rejects, or that aren't mined
+        within `confirm_timeout` seconds, are retried up to `max_retries` times
+        with the same nonce and a bumped gas price, so a retry replaces a stuck
+        transaction rather than queueing behind it.
+        """
+        self.deschool = deschool
+        self.account = account
+        self.policy = policy
+        self.poll_interval = poll_interval
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.confirm_timeout = confirm_timeout
+        self.log = log
+        self._batch_id = None
+        self._first_registered = None
+        self._scanned_to = None
+
+    async def run(self, stop=None):
+        """Poll until the `stop` event (an asyncio.Event) is set, or forever."""
+        while stop is None or not stop.is_set():
+            try:
+                await self.step()
+            except Exception as exc:
+                # a flaky node shouldn't take the keeper down, the next poll tries again
+                self.log(f"keeper step failed: {exc!r}")
+            await asyncio.sleep(self.poll_interval)
+
+    async def step(self):
+        """Check the current batch once, returning the deposit receipt if one was made."""
+        state = await self.batch_state()
+        reason = self.policy.reason_to_deposit(state)
+        if reason is None:
+            return None
+        self.log(f"depositing batch {state.batch_id} ({state.batch_total} wei): {reason}")
+        return await self.deposit(state)
+
+    async def batch_state(self):
+        block = await _call(lambda: web3.eth.block_number)
+        # read at `block`, so the events scanned up to it account for every registration in the total
+        batch_id = await _call(lambda: self.deschool.getCurrentBatchId(block_identifier=block))
+        batch_total = await _call(lambda: self.deschool.getCurrentBatchTotal(block_identifier=block))
+        gas_price = await _call(lambda: web3.eth.gas_price)
+        gas_estimate = 0
+        if batch_total:
+            gas_estimate = await _call(
+                self.deschool.batchDeposit.estimate_gas, {"from": self.account}
+            )
+        await self._follow_events(batch_id, batch_total, block)
+        return BatchState(
+            batch_id, batch_total, self._first_registered, block, gas_price, gas_estimate
+        )
+
+    async def _follow_events(self, batch_id, batch_total, block):
+        if self._batch_id != batch_id:
+            self._batch_id = batch_id
+            self._first_registered = None
+            if self._scanned_to is None:
+                # on start, anything older than max_wait_blocks would trigger a deposit anyway
+                self._scanned_to = max(block - self.policy.max_wait_blocks, 0) - 1
+        if batch_total and self._first_registered is None and self._scanned_to < block:
+            logs = await _call(
+                web3.eth.get_logs,
+                {
+                    "address": self.deschool.address,
+                    "fromBlock": self._scanned_to + 1,
+                    "toBlock": block,
+                    "topics": [[_LEARNER_REGISTERED, _BATCH_DEPOSITED]],
+                },
+            )
+            for log in sorted(logs, key=lambda log: (log["blockNumber"], log["logIndex"])):
+                if encode_hex(log["topics"][0]) == _BATCH_DEPOSITED:
+                    self._first_registered = None
+                elif self._first_registered is None:
+                    self._first_registered = log["blockNumber"]
+            if self._first_registered is None:
+                # only on start: registrations are older than the window scanned back
+                self._first_registered = self._scanned_to + 1
+        self._scanned_to = block
+
+    async def deposit(self, state):
+        nonce = await _call(web3.eth.get_transaction_count, self.account.address, "pending")
+        gas_price = state.gas_price
+        for attempt in range(self.max_retries + 1):
+            try:
+                tx = await _call(
+                    self.deschool.batchDeposit,
+                    {"from": self.account, "nonce": nonce, "gas_price": gas_price, "required_confs": 0},
+                )
+                # brownie waits for confirmation without a timeout, so wait on the node instead
+                await _call(web3.eth.wait_for_transaction_receipt, tx.txid, self.confirm_timeout)
+                await _call(tx.wait, 1)
+            except (VirtualMachineError, ValueError, TimeoutError, TimeExhausted) as exc:
+                if _reverted(exc):
+                    return await self._deposit_reverted(state, exc)
+                if attempt == self.max_retries:
+                    raise
+                self.log(f"deposit attempt {attempt + 1} failed: {exc!r}, retrying")
+                gas_price = int(gas_price * GAS_PRICE_BUMP) + 1
+                await asyncio.sleep(self.retry_delay)
+                continue
+            if tx.status != 1:
+                return await self._deposit_reverted(state, tx)
+            return tx
+
+    async def _deposit_reverted(self, state, failure):
+        # someone else deposited first, or the batch changed under us
+        if await _call(self.deschool.getCurrentBatchId) != state.batch_id:
+            self.log(f"batch {state.batch_id} was already deposited")
+            return None
+        if isinstance(failure, Exception):
+            raise failure
+        raise ValueError(f"batchDeposit {failure.txid} reverted: {failure.revert_msg}")
+
+
+def _reverted(exc):
+    # brownie also wraps the node's own errors (underpriced, nonce too low...) as VirtualMachineError,
+    # only those carrying a transaction or revert data come from the EVM
+    return isinstance(exc, VirtualMachineError) and bool(
+        getattr(exc, "txid", None) or getattr(exc, "revert_type", None)
+    )
+
+
+async def _call(fn, *args):
+    return await asyncio.get_running_loop().run_in_executor(None, fn, *args)
+
+
+def main(deschool, account_id, apr=0.05, eth_price=2000, poll_interval=15):
+    keeper = BatchKeeper(
+        DeSchool.at(deschool),
+        accounts.load(account_id),
+        DepositPolicy(apr=float(apr), eth_price=float(eth_price)),
+        poll_interval=float(poll_interval),
+    )
+    asyncio.run(keeper.run())
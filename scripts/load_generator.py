@@ -0,0 +1,182 @@
+"""
+Load generator for DeSchool: many courses, many learners, concurrent transactions.
+
+Deploys a local stack, creates `courses` courses and `learners` funded accounts,
+then drives the learner lifecycle through a pool of `workers` threads:
+
+1. every learner registers for a course, alternating `register` and
+   `permitAndRegister`, with a `batchDeposit` after each of `batches` groups
+   so that later redemptions hit both deployed and undeployed stakes
+2. once the courses have run, learners alternately `mint` and `redeem`
+
+For each operation the report gives throughput, latency percentiles and gas
+totals, plus the average gas of the first and last tenth of its transactions
+to expose gas that grows with the number of courses, learners or batches:
+
+    brownie run load_generator main 20 1000 16
+
+The report is printed and written as JSON to `reports/load_report.json`.
+"""
+
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from brownie import accounts
+from brownie.exceptions import TransactionError, VirtualMachineError
+
+from scripts.fast_forward import fast_forward
+from scripts.local_stack import deploy_local_stack
+from scripts.permit import PermitSigner
+
+REPORT_PATH = "reports/load_report.json"
+STAKE = 10 ** 20
+DURATION = 20
+PERCENTILES = (50, 90, 99)
+
+
+class OperationStats:
+    """Latency and gas of every transaction of one operation, in submission order."""
+
+    def __init__(self):
+        self.latencies = []
+        self.gas = []
+        self.errors = 0
+        self.elapsed = 0.0
+
+    def add(self, latency, gas_used):
+        self.latencies.append(latency)
+        self.gas.append(gas_used)
+
+    def summary(self):
+        count = len(self.gas)
+        summary = {"count": count, "errors": self.errors}
+        if not count:
+            return summary
+        latencies = sorted(self.latencies)
+        tenth = max(count // 10, 1)
+        summary.update(
+            {
+                "tx_per_s": count / self.elapsed if self.elapsed else None,
+                "latency_s": {
+                    f"p{p}": latencies[min(count * p // 100, count - 1)] for p in PERCENTILES
+                },
+                "gas_total": sum(self.gas),
+                "gas_avg": sum(self.gas) // count,
+                "gas_first_tenth_avg": sum(self.gas[:tenth]) // tenth,
+                "gas_last_tenth_avg": sum(self.gas[-tenth:]) // tenth,
+            }
+        )
+        return summary
+
+
+class LoadGenerator:
+    def __init__(self, deployer, courses=10, learners=100, workers=8, batches=4, duration=DURATION):
+        self.deployer = deployer
+        self.num_courses = courses
+        self.num_learners = learners
+        self.workers = workers
+        self.batches = batches
+        self.duration = duration
+        self.stats = {}
+        self.stack = None
+        self.learners = []
+        self.permits = {}
+
+    def run(self):
+        """Set up, run every phase and return the report."""
+        self.setup()
+        registrations = list(enumerate(self.learners))
+        group = -(-len(registrations) // self.batches)
+        for start in range(0, len(registrations), group):
+            self._run_phase(self._register, registrations[start:start + group])
+            self._run_phase(self._batch_deposit, [None])
+        fast_forward(self.duration + 1)
+        self._run_phase(self._complete, registrations)
+        return self.report()
+
+    def setup(self):
+        deployer = self.deployer
+        self.stack = deploy_local_stack(deployer)
+        for n in range(self.num_courses):
+            self.stack.deschool.createCourse(
+                STAKE, self.duration, f"https://course/{n}", deployer, {"from": deployer}
+            )
+        for _ in range(self.num_learners):
+            learner = accounts.add()
+            deployer.transfer(learner, "0.05 ether")
+            self.stack.token.transfer(learner, STAKE, {"from": deployer})
+            self.learners.append(learner)
+        # every other learner registers with a permit; sign them all up front, none has used its nonce yet
+        signer = PermitSigner(self.stack.token)
+        permit_learners = self.learners[1::2]
+        signer.nonces.update(dict.fromkeys(map(str, permit_learners), 0))
+        self.permits = dict(zip(map(str, permit_learners), signer.sign_many(permit_learners, self.stack.deschool)))
+
+    def report(self):
+        return {
+            "courses": self.num_courses,
+            "learners": self.num_learners,
+            "workers": self.workers,
+            "operations": {name: stats.summary() for name, stats in sorted(self.stats.items())},
+        }
+
+    def _run_phase(self, fn, items):
+        start = time.perf_counter()
+        names = set()
+        with ThreadPoolExecutor(self.workers) as pool:
+            for name, result in pool.map(fn, items):
+                names.add(name)
+                stats = self.stats.setdefault(name, OperationStats())
+                if result is None:
+                    stats.errors += 1
+                else:
+                    stats.add(*result)
+        # operations sent in the same phase share its wall time
+        elapsed = time.perf_counter() - start
+        for name in names:
+            self.stats[name].elapsed += elapsed
+
+    def _register(self, item):
+        n, learner = item
+        deschool, course = self.stack.deschool, n % self.num_courses
+        if n % 2:
+            return "permitAndRegister", _timed(
+                deschool.permitAndRegister, course, *self.permits[str(learner)], {"from": learner}
+            )
+        self.stack.token.approve(deschool, STAKE, {"from": learner})
+        return "register", _timed(deschool.register, course, {"from": learner})
+
+    def _batch_deposit(self, _):
+        return "batchDeposit", _timed(self.stack.deschool.batchDeposit, {"from": self.deployer})
+
+    def _complete(self, item):
+        n, learner = item
+        deschool, course = self.stack.deschool, n % self.num_courses
+        if n % 2:
+            return "mint", _timed(deschool.mint, course, {"from": learner})
+        return "redeem", _timed(deschool.redeem, course, {"from": learner})
+
+
+def _timed(fn, *args):
+    """(latency, gas used) of the transaction, or None if it reverted or the node rejected it."""
+    start = time.perf_counter()
+    try:
+        tx = fn(*args)
+    # web3 raises the node's JSON-RPC errors, e.g. a nonce clash between workers, as ValueError
+    except (VirtualMachineError, TransactionError, ValueError):
+        return None
+    return time.perf_counter() - start, tx.gas_used
+
+
+def main(courses=10, learners=100, workers=8, batches=4, output=REPORT_PATH):
+    generator = LoadGenerator(
+        accounts[0], int(courses), int(learners), int(workers), int(batches)
+    )
+    report = generator.run()
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as fp:
+        json.dump(report, fp, indent=2)
+    for name, summary in report["operations"].items():
+        print(name, json.dumps(summary))
@@ -0,0 +1,52 @@
+from brownie import (
+    Dai,
+    DeSchool,
+    LearningCurve,
+    MockRegistry,
+    MockVault,
+)
+
+DAI_SUPPLY = 1_000_000_000_000_000_000e18
+# yield added to the mock vault on each harvest, in basis points
+YIELD_PER_HARVEST = 100
+
+
+class LocalStack:
+    """The contracts of a local deployment, as returned by `deploy_local_stack`."""
+
+    def __init__(self, token, registry, vault, learning_curve=None, deschool=None):
+        self.token = token
+        self.registry = registry
+        self.vault = vault
+        self.learning_curve = learning_curve
+        self.deschool = deschool
+
+
+def deploy_yield_mocks(deployer, yield_per_harvest=YIELD_PER_HARVEST):
+    """
+    Deploy DAI and the mock yearn registry and vault to the active (development)
+    network, minting `DAI_SUPPLY` to the deployer.
+    """
+    token = Dai.deploy(1, {"from": deployer})
+    token.mint(deployer, DAI_SUPPLY, {"from": deployer})
+    vault = MockVault.deploy(token, yield_per_harvest, {"from": deployer})
+    # the mock vault mints DAI into itself to simulate yield
+    token.rely(vault, {"from": deployer})
+    registry = MockRegistry.deploy({"from": deployer})
+    registry.setLatestVault(token, vault, {"from": deployer})
+    return LocalStack(token, registry, vault)
+
+
+def deploy_local_stack(deployer, yield_per_harvest=YIELD_PER_HARVEST):
+    """
+    Deploy the yield mocks, an initialised LearningCurve and DeSchool to the
+    active (development) network.
+    """
+    stack = deploy_yield_mocks(deployer, yield_per_harvest)
+    stack.learning_curve = LearningCurve.deploy(stack.token, {"from": deployer})
+    stack.token.approve(stack.learning_curve, 1e18, {"from": deployer})
+    stack.learning_curve.initialise({"from": deployer})
+    stack.deschool = DeSchool.deploy(
+        stack.token, stack.learning_curve, stack.registry, {"from": deployer}
+    )
+    return stack
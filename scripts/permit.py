@@ -0,0 +1,143 @@
+"""
+EIP-712 signatures for DAI's `permit`, as used by `permitAndRegister`,
+`permitCreateScholarships` and `permitAndMint`.
+
+The domain separator of each token and chain id is computed once, checked
+against the token's `DOMAIN_SEPARATOR()` and cached, and permits are hashed
+and signed locally, so a permit with a known nonce costs no RPC calls.
+`PermitSigner` also tracks the nonce of every holder locally and signs many
+permits at once across a process pool:
+
+    permits = PermitSigner(token)
+    permits.nonces.update(dict.fromkeys(map(str, new_learners), 0))  # skip the nonce lookups
+    for learner, permit in zip(new_learners, permits.sign_many(new_learners, deschool)):
+        deschool.permitAndRegister(course_id, *permit, {"from": learner})
+
+Every signature is returned as the (nonce, expiry, v, r, s) arguments the
+permit functions take after their own.
+"""
+
+from multiprocessing import Pool
+
+from eth_keys import keys
+from eth_utils import keccak, to_checksum_address
+from hexbytes import HexBytes
+
+try:
+    from eth_abi import encode as _encode_abi
+except ImportError:  # eth-abi < 4
+    from eth_abi import encode_abi as _encode_abi
+
+DOMAIN_TYPEHASH = keccak(
+    text="EIP712Domain(string name,string version,uint256 chainId,address verifyingContract)"
+)
+PERMIT_TYPEHASH = keccak(
+    text="Permit(address holder,address spender,uint256 nonce,uint256 expiry,bool allowed)"
+)
+# below this many permits, signing in the calling process is faster than starting a pool
+POOL_THRESHOLD = 256
+
+# {(token address, chain id): (EIP712Domain fields, domain separator)}
+_DOMAINS = {}
+
+
+def permit_domain(token, chain_id=1):
+    """The EIP712Domain of `token` and its separator, read from the token once."""
+    key = (str(token), chain_id)
+    if key not in _DOMAINS:
+        domain = {
+            "name": token.name(),
+            "version": token.version(),
+            "chainId": chain_id,
+            "verifyingContract": str(token),
+        }
+        separator = keccak(
+            _encode_abi(
+                ["bytes32", "bytes32", "bytes32", "uint256", "address"],
+                [DOMAIN_TYPEHASH, keccak(text=domain["name"]), keccak(text=domain["version"]), chain_id,
+                 to_checksum_address(str(token))],
+            )
+        )
+        if separator != bytes(HexBytes(token.DOMAIN_SEPARATOR())):
+            raise ValueError(f"DOMAIN_SEPARATOR of {token} does not match its name, version and chain id {chain_id}")
+        _DOMAINS[key] = (domain, separator)
+    return _DOMAINS[key]
+
+
+def permit_digest(domain_separator, holder, spender, nonce, expiry=0):
+    """The EIP-712 hash signed for an unlimited permit."""
+    struct_hash = keccak(
+        _encode_abi(
+            ["bytes32", "address", "address", "uint256", "uint256", "bool"],
+            [PERMIT_TYPEHASH, to_checksum_address(str(holder)), to_checksum_address(str(spender)),
+             nonce, expiry, True],
+        )
+    )
+    return keccak(b"\x19\x01" + domain_separator + struct_hash)
+
+
+def sign_permit(token, signer, spender, nonce=None, expiry=0):
+    """
+    Sign a permit from `signer` (a brownie or eth-account local account) to
+    `spender`, returning the (nonce, expiry, v, r, s) arguments of the permit
+    functions. The nonce is read from the token unless given.
+    """
+    _, separator = permit_domain(token)
+    if nonce is None:
+        nonce = token.nonces(signer.address)
+    v, r, s = _sign((_private_key(signer), permit_digest(separator, signer.address, spender, nonce, expiry)))
+    return nonce, expiry, v, r, s
+
+
+class PermitSigner:
+    """Signs permits of one token, tracking the nonce of every holder locally."""
+
+    def __init__(self, token, chain_id=1, processes=None):
+        self.token = token
+        _, self.domain_separator = permit_domain(token, chain_id)
+        self.processes = processes
+        # {holder: the nonce of their next permit}, read from the token the first time a holder signs
+        self.nonces = {}
+
+    def next_nonce(self, holder):
+        holder = str(holder)
+        if holder not in self.nonces:
+            self.nonces[holder] = self.token.nonces(holder)
+        nonce = self.nonces[holder]
+        self.nonces[holder] += 1
+        return nonce
+
+    def forget(self, holder):
+        """Read `holder`'s nonce from the token again, e.g. after a permit was never used."""
+        self.nonces.pop(str(holder), None)
+
+    def sign(self, signer, spender, expiry=0):
+        return self.sign_many([signer], spender, expiry)[0]
+
+    def sign_many(self, signers, spender, expiry=0):
+        """
+        Sign a permit to `spender` from each of `signers`, in order. A signer
+        listed more than once signs with consecutive nonces.
+        """
+        nonces = [self.next_nonce(signer.address) for signer in signers]
+        work = [
+            (_private_key(signer), permit_digest(self.domain_separator, signer.address, spender, nonce, expiry))
+            for signer, nonce in zip(signers, nonces)
+        ]
+        if len(work) < POOL_THRESHOLD or self.processes == 1:
+            signatures = list(map(_sign, work))
+        else:
+            with Pool(self.processes) as pool:
+                signatures = pool.map(_sign, work, chunksize=max(len(work) // 64, 1))
+        return [(nonce, expiry, v, r, s) for nonce, (v, r, s) in zip(nonces, signatures)]
+
+
+def _private_key(signer):
+    # brownie's LocalAccount holds it as hex in `private_key`, eth-account's as bytes in `key`
+    return bytes(HexBytes(getattr(signer, "private_key", None) or signer.key))
+
+
+def _sign(item):
+    private_key, digest = item
+    v, r, s = keys.PrivateKey(private_key).sign_msg_hash(digest).vrs
+    return v + 27, r, s
@@ -0,0 +1,129 @@
+"""
+Offline model of the DeSchool scholarship queue.
+
+`registerScholar` gives out the `scholarshipTotal / stake` seats of a course
+first come first served, then recycles them in registration order: once every
+seat is taken, a new scholar can only register when the scholar at
+`scholarData[courseId][completedScholars]` registered at least `duration`
+blocks before. `CourseQueue` keeps the block every scholar registered in, in
+order, so when the next seat opens and how many scholars could register in a
+future block - assuming nothing else happens until then - are answered in
+O(log n) without calling `scholarshipAvailable`:
+
+    queue = ScholarshipQueue.from_index(indexer)
+    queue[0].next_seat(chain.height + 1)
+    queue[0].free_seats(chain.height + 1000)
+    queue.next_seats(chain.height + 1)  # {course id: block} for the whole catalogue
+
+The history is replayed from the CourseCreated, ScholarshipCreated,
+ScholarshipWithdrawn and ScholarRegistered events indexed by
+`scripts/indexer.py`, and `ScholarshipQueue.apply` keeps the model current
+as new events arrive.
+
+Like the contract, a course in which no scholar ever took a funded seat -
+one nobody has funded, in particular - recycles the unset slot at
+`completedScholars` forever, so from block `duration` on anyone can register
+as a scholar; `free_seats` is `math.inf` then.
+"""
+
+import math
+from bisect import bisect_right
+
+NO_SCHOLARSHIPS = "registerScholar: no scholarships available for this course"
+
+
+class QueueRevert(Exception):
+    """Raised wherever the equivalent registerScholar call would revert."""
+
+    def __init__(self, revert_msg=None):
+        super().__init__(revert_msg)
+        self.revert_msg = revert_msg
+
+
+class CourseQueue:
+    def __init__(self, stake, duration, scholarship_total=0):
+        self.stake = stake
+        self.duration = duration
+        self.scholarship_total = scholarship_total
+        # scholarData[courseId][i].blockRegistered for every scholar i, in registration order
+        self.registered = []
+        self.completed_scholars = 0
+
+    @property
+    def scholars(self):
+        return len(self.registered)
+
+    @property
+    def seats(self):
+        return self.scholarship_total // self.stake
+
+    def _oldest(self):
+        # scholarData[courseId][completedScholars], unset once every scholar has been recycled
+        if self.completed_scholars < len(self.registered):
+            return self.registered[self.completed_scholars]
+        return 0
+
+    def available(self, block):
+        """`scholarshipAvailable` as evaluated in `block`."""
+        return self.seats > self.scholars or self._oldest() + self.duration <= block
+
+    def register(self, block):
+        """Apply a `registerScholar` mined in `block`."""
+        if self.seats <= self.scholars:
+            if self._oldest() + self.duration > block:
+                raise QueueRevert(NO_SCHOLARSHIPS)
+            self.completed_scholars += 1
+        self.registered.append(block)
+
+    def next_seat(self, block):
+        """The first block, from `block` on, in which a scholar can register."""
+        if self.seats > self.scholars:
+            return block
+        return max(block, self._oldest() + self.duration)
+
+    def free_seats(self, block):
+        """How many scholars could register, one after the other, in `block`."""
+        unused = max(self.seats - self.scholars, 0)
+        if not unused and self.completed_scholars == len(self.registered):
+            return math.inf if self.duration <= block else 0
+        # seats taken in `block` itself are never recycled in it, as duration > 0
+        expired = bisect_right(self.registered, block - self.duration, self.completed_scholars)
+        return unused + expired - self.completed_scholars
+
+
+class ScholarshipQueue:
+    """The `CourseQueue` of every course, by course id."""
+
+    def __init__(self):
+        self.courses = {}
+
+    @classmethod
+    def from_index(cls, indexer):
+        """Replay the scholarship history of an `EventIndexer`."""
+        queue = cls()
+        for course_id, stake, duration in indexer.db.execute(
+            "SELECT course_id, stake, duration FROM courses ORDER BY course_id"
+        ):
+            queue.courses[course_id] = CourseQueue(int(stake), duration)
+        for course_id, name, amount, block in indexer.scholarship_history():
+            queue.apply(course_id, name, amount, block)
+        return queue
+
+    def __getitem__(self, course_id):
+        return self.courses[course_id]
+
+    def apply(self, course_id, name, amount, block):
+        """Apply one event, with the arguments of `EventIndexer.scholarship_history`."""
+        course = self.courses[course_id]
+        if name == "ScholarshipCreated":
+            course.scholarship_total = amount
+        elif name == "ScholarshipWithdrawn":
+            course.scholarship_total -= amount
+        elif name == "ScholarRegistered":
+            course.register(block)
+        else:
+            raise ValueError(f"not a scholarship event: {name}")
+
+    def next_seats(self, block):
+        """{course id: first block, from `block` on, in which a scholar can register}."""
+        return {course_id: course.next_seat(block) for course_id, course in self.courses.items()}
@@ -0,0 +1,114 @@
+"""
+Concurrent transaction submission from many accounts.
+
+A brownie call blocks until its transaction is mined, so setting up a large
+scenario costs a full round trip per transaction. `TxSender` counts the nonce
+of every account locally, submits the calls of each account in order - and
+the calls of different accounts in parallel - without waiting for receipts,
+then collects the receipts together:
+
+    sender = TxSender()
+    sender.send(
+        [(token.transfer, learner, STAKE, {"from": deployer}) for learner in learners]
+        + [(token.approve, deschool, STAKE, {"from": learner}) for learner in learners]
+    )
+    receipts = sender.send([(deschool.register, 0, {"from": learner}) for learner in learners])
+
+A call is written as it would be made - a brownie contract function, or a
+contract's `deploy`, followed by its arguments and transaction dict - and
+`send` returns the receipts in the order of the calls, raising `SendError`
+once every call is settled if any failed. Gas is estimated as each call is
+submitted, which a node that doesn't mine on submission (anything but a
+development chain) does against a state without the calls still pending: calls
+that depend on each other belong in separate `send`s, or need a `gas_limit`.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from brownie import web3
+
+WORKERS = 16
+
+
+class SendError(Exception):
+    """Raised by `TxSender.send` when calls failed. `receipts` holds a receipt or None for every call."""
+
+    def __init__(self, failures, receipts):
+        super().__init__(f"{len(failures)} of {len(receipts)} calls failed: " + "; ".join(failures))
+        self.failures = failures
+        self.receipts = receipts
+
+
+class TxSender:
+    def __init__(self, workers=WORKERS):
+        """Submit the calls of up to `workers` accounts at once."""
+        self.workers = workers
+        # {address: the nonce of its next transaction}, read from the node the first time an account sends
+        self.nonces = {}
+        self._lock = threading.Lock()
+
+    def next_nonce(self, address):
+        address = str(address)
+        with self._lock:
+            if address not in self.nonces:
+                self.nonces[address] = web3.eth.get_transaction_count(address, "pending")
+            nonce = self.nonces[address]
+            self.nonces[address] += 1
+            return nonce
+
+    def forget(self, address):
+        """Read `address`'s nonce from the node again, e.g. after a transaction was dropped."""
+        with self._lock:
+            self.nonces.pop(str(address), None)
+
+    def submit(self, fn, *args):
+        """Submit one call without waiting for it to be mined, returning its pending receipt."""
+        *args, tx = args
+        address = tx["from"]
+        tx = dict(tx, nonce=self.next_nonce(address), required_confs=0)
+        try:
+            result = fn(*args, tx)
+        except Exception:
+            # the nonce was never used, and every later one of this account would wait on it
+            self.forget(address)
+            raise
+        # `deploy` returns the contract instead when its receipt is already confirmed
+        return getattr(result, "tx", result)
+
+    def send(self, calls):
+        """Submit `calls`, each as (function, *args, tx dict), and return their receipts once mined."""
+        calls = list(calls)
+        by_account = {}
+        for i, call in enumerate(calls):
+            by_account.setdefault(str(call[-1]["from"]), []).append(i)
+        receipts = [None] * len(calls)
+        errors = {}
+
+        def submit_in_order(indexes):
+            for i in indexes:
+                try:
+                    receipts[i] = self.submit(*calls[i])
+                except Exception as exc:
+                    # later calls of the account may depend on this one
+                    errors[i] = repr(exc)
+                    return
+
+        if by_account:
+            with ThreadPoolExecutor(min(self.workers, len(by_account))) as pool:
+                list(pool.map(submit_in_order, by_account.values()))
+
+        failures = []
+        for i, receipt in enumerate(receipts):
+            if receipt is None:
+                failures.append(f"call {i} {errors.get(i, 'not sent')}")
+                continue
+            if receipt.status == -1:
+                receipt.wait(1)
+            if receipt.status != 1:
+                failures.append(f"call {i} {receipt.txid} {receipt.revert_msg or receipt.status.name}")
+                if receipt.status == -2:
+                    self.forget(receipt.sender)
+        if failures:
+            raise SendError(failures, receipts)
+        return receipts
@@ -0,0 +1,136 @@
+"""
+Per-block read-through cache of contract view calls.
+
+Tools and services read the same views - `balanceOf`, `totalSupply`,
+`reserveBalance`, `getCurrentBatchId`, `courses` - many times within a block,
+each read a round trip to the node. `CachedContract` wraps a brownie contract
+and memoizes every view call by (block, function, arguments); anything else,
+transactions included, goes straight to the contract:
+
+    learning_curve = CachedContract(learning_curve)
+    learning_curve.reserveBalance()         # read from the node
+    learning_curve.reserveBalance()         # cached until the next block
+    learning_curve.mint(wad, {"from": learner})
+    learning_curve.reserveBalance()         # read again
+
+The head block is read from the node at most once every `max_age` seconds,
+shared by every contract wrapped with the same `BlockClock`, and read again
+as soon as a transaction of this process lands or the chain is reverted or
+reset. Calls at the head are cached until the clock moves to another block;
+a call at an explicit `block_identifier` is cached apart from them, until
+the chain is reverted or reset, so a head result is never served for a block
+it may not have been read at.
+
+Mining empty blocks (`chain.mine`, `fast_forward`) or a transaction sent by
+another process is only noticed once `max_age` has passed: with `max_age=0`
+every call checks the head, which still spares the view call itself, or call
+`invalidate` after moving the chain.
+"""
+
+import time
+from collections import OrderedDict
+
+from brownie import history, web3
+from brownie.network.state import _revert_register
+
+MAX_AGE = 1.0
+MAX_ENTRIES = 100_000
+
+
+class BlockClock:
+    def __init__(self, max_age=MAX_AGE):
+        """The head block, read from the node at most once every `max_age` seconds."""
+        self.max_age = max_age
+        self.caches = []
+        self._block = None
+        self._read_at = None
+        self._transactions = None
+        # brownie calls _revert and _reset when the chain is reverted or reset
+        _revert_register(self)
+
+    def block(self):
+        now = time.monotonic()
+        transactions = len(history)
+        if transactions != self._transactions:
+            # one of our own transactions landed, or reverting dropped some
+            self._transactions = transactions
+            self.invalidate()
+        if self._block is None or now - self._read_at >= self.max_age:
+            self._block, self._read_at = web3.eth.block_number, now
+        return self._block
+
+    def invalidate(self):
+        """Read the head again on the next call, and forget what was read at the current one."""
+        self._block = None
+        for cache in self.caches:
+            cache._head.clear()
+
+    def _revert(self, height):
+        # blocks above `height` may be mined again with other contents
+        self.invalidate()
+        for cache in self.caches:
+            cache._blocks.clear()
+
+    def _reset(self):
+        self._revert(0)
+
+
+class CachedContract:
+    def __init__(self, contract, clock=None, max_entries=MAX_ENTRIES):
+        """Cache the view calls of `contract` per block of `clock`, keeping the last `max_entries` results of each kind."""
+        self.contract = contract
+        self.clock = clock or BlockClock()
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        # {(name, args): result} at `_head_block`, and {(block, name, args): result} at explicit blocks
+        self._head = OrderedDict()
+        self._head_block = None
+        self._blocks = OrderedDict()
+        self.clock.caches.append(self)
+
+    def __getattr__(self, name):
+        attr = getattr(self.contract, name)
+        abi = getattr(attr, "abi", None)
+        if not isinstance(abi, dict) or not (abi.get("stateMutability") in ("view", "pure") or abi.get("constant")):
+            return attr
+
+        def call(*args, block_identifier=None):
+            if isinstance(block_identifier, int):
+                results, key = self._blocks, (block_identifier, name, _key(args))
+            else:
+                block = self.clock.block()
+                if block != self._head_block:
+                    self._head.clear()
+                    self._head_block = block
+                results, key = self._head, (name, _key(args))
+            if key in results:
+                self.hits += 1
+                results.move_to_end(key)
+                return results[key]
+            self.misses += 1
+            # at the head, called as it would be uncached, so views of block.number see the same block
+            result = attr(*args, block_identifier=block_identifier)
+            results[key] = result
+            if len(results) > self.max_entries:
+                results.popitem(last=False)
+            return result
+
+        return call
+
+    def __repr__(self):
+        return f"<CachedContract {self.contract!r} hits={self.hits} misses={self.misses}>"
+
+    def invalidate(self):
+        self.clock.invalidate()
+
+
+def _key(value):
+    # contracts and accounts by address, tx dicts and lists as hashable tuples
+    if isinstance(value, dict):
+        return tuple(sorted((k, _key(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_key(v) for v in value)
+    if hasattr(value, "address"):
+        return str(value.address)
+    return value
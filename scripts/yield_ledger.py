@@ -0,0 +1,267 @@
+"""
+Offline attribution of DeSchool yield rewards to course creators.
+
+`yieldRewards[creator]` moves in three ways:
+
+    redeem, mint           += collateral - stake, for a learner whose batch was deposited
+    withdrawScholarship     = collateral - amount, overwriting the balance, if the vault gained
+    withdrawYieldRewards    = 0
+
+where `collateral` is what `vault.withdraw` returned, which no event carries.
+`attribute_yield` rebuilds it from the indexed history and the vault share
+price in the block before each withdrawal, as numpy columns over every event
+at once, and replays the balance of every creator in the same pass:
+
+    ledger = attribute_yield(indexer, ChainPrices(deschool))
+    ledger.by_batch[creator, batch_id]
+    ledger.creators[creator]["overwritten"]
+    ledger.reconcile(BulkReader(deschool, multicall).yield_rewards(ledger.creators))
+
+Collateral is priced as `shares * pricePerShare / 1e18`, which falls short of
+the vault's own `shares * totalAssets / totalSupply` by at most
+`shares / 1e18 + 1` wei. Each balance carries the sum of those bounds as its
+`tolerance`, and `reconcile` flags every creator whose `getYieldRewards`
+differs from the rebuilt balance by more. Amounts are uint256, so columns
+hold python ints in object arrays.
+"""
+
+import numpy as np
+from brownie import interface
+
+SCALE = 10 ** 18
+
+ACCRUED, OVERWRITTEN, PAID_OUT = 0, 1, 2
+
+
+class ChainPrices:
+    """Batch vaults and historical share prices, read from the node once each."""
+
+    def __init__(self, deschool):
+        self.registry = interface.I_Registry(deschool.registry())
+        self.stable = deschool.stable()
+        self._vaults = {}
+        self._prices = {}
+
+    def batch_vault(self, batch_id, block):
+        # batchYieldAddress is private, but it is the registry's latest vault as the batch was deposited
+        if batch_id not in self._vaults:
+            self._vaults[batch_id] = self.registry.latestVault(self.stable, block_identifier=block)
+        return self._vaults[batch_id]
+
+    def price_per_share(self, vault, block):
+        """`pricePerShare` of `vault` before the transactions of `block`."""
+        key = (str(vault), block)
+        if key not in self._prices:
+            self._prices[key] = interface.I_Vault(vault).pricePerShare(block_identifier=block - 1)
+        return self._prices[key]
+
+
+class YieldLedger:
+    """
+    The rebuilt yield history.
+
+    `by_batch` maps (creator, batch id) to the yield accrued from learners of
+    that batch. `creators` maps each creator to its learner and scholarship
+    yield, the amount paid out to it, the amount lost to withdrawScholarship
+    overwriting its balance, and its `expected` balance with its `tolerance`.
+    `payout_mismatches` lists the withdrawYieldRewards payouts that differ
+    from the balance rebuilt up to them.
+    """
+
+    def __init__(self, by_batch, creators, payout_mismatches):
+        self.by_batch = by_batch
+        self.creators = creators
+        self.payout_mismatches = payout_mismatches
+
+    def reconcile(self, on_chain):
+        """
+        Compare with `getYieldRewards`, given as {creator: balance} or in the
+        order of `creators`, returning the creators outside tolerance.
+        """
+        if not isinstance(on_chain, dict):
+            on_chain = dict(zip(self.creators, on_chain))
+        mismatches = []
+        for creator, summary in self.creators.items():
+            balance = on_chain.get(creator)
+            if balance is None or abs(balance - summary["expected"]) > summary["tolerance"]:
+                mismatches.append(
+                    {
+                        "creator": creator,
+                        "expected": summary["expected"],
+                        "on_chain": balance,
+                        "tolerance": summary["tolerance"],
+                    }
+                )
+        return mismatches
+
+
+def attribute_yield(indexer, prices):
+    """Rebuild the yield rewards of every creator from an `EventIndexer`'s history."""
+    exits = _learner_exits(indexer, prices)
+    scholarships = _scholarship_withdrawals(indexer, prices)
+    payouts = indexer.db.execute(
+        "SELECT creator, amount, block, log_index FROM yield_withdrawals"
+    ).fetchall()
+
+    columns = [
+        (exits["creator"], exits["block"], exits["log_index"], np.full(len(exits["block"]), ACCRUED),
+         exits["yield"], exits["error"]),
+        _columns(scholarships, OVERWRITTEN),
+        _columns([(creator, block, log_index, int(amount), 0) for creator, amount, block, log_index in payouts],
+                 PAID_OUT),
+    ]
+    creator, block, log_index, kind, value, error = (
+        np.concatenate([column[i] for column in columns]) for i in range(6)
+    )
+    names = sorted({row[0] for row in indexer.db.execute("SELECT creator FROM courses")} | set(creator))
+    codes = np.searchsorted(names, creator) if len(creator) else np.zeros(0, dtype=int)
+
+    # group by creator, in event order within each group
+    order = np.lexsort((log_index, block, codes))
+    codes, kind, value, error = codes[order], kind[order], value[order], error[order]
+    before, after, tolerance_before, tolerance = _replay(codes, kind, value, error)
+
+    creators = {}
+    totals = {}
+    for name, mask in (
+        ("learner_yield", kind == ACCRUED),
+        ("scholarship_yield", kind == OVERWRITTEN),
+        ("paid_out", kind == PAID_OUT),
+    ):
+        totals[name] = _sum_by(codes[mask], value[mask], len(names))
+    totals["overwritten"] = _sum_by(codes[kind == OVERWRITTEN], before[kind == OVERWRITTEN], len(names))
+    last = np.flatnonzero(np.r_[codes[1:] != codes[:-1], True]) if len(codes) else []
+    final = {codes[i]: (after[i], tolerance[i]) for i in last}
+    for n, address in enumerate(names):
+        expected, bound = final.get(n, (0, 0))
+        creators[address] = {name: column[n] for name, column in totals.items()}
+        creators[address].update({"expected": expected, "tolerance": bound})
+
+    payout_mismatches = [
+        {"creator": names[codes[i]], "paid": value[i], "expected": before[i], "tolerance": tolerance_before[i]}
+        for i in np.flatnonzero(kind == PAID_OUT)
+        if abs(value[i] - before[i]) > tolerance_before[i]
+    ]
+
+    by_batch = {}
+    if len(exits["batch_id"]):
+        keys, inverse = np.unique(
+            np.stack([np.searchsorted(names, exits["creator"]), exits["batch_id"]]), axis=1, return_inverse=True
+        )
+        sums = _sum_by(inverse.ravel(), exits["yield"], keys.shape[1])
+        by_batch = {(names[c], int(b)): sums[i] for i, (c, b) in enumerate(keys.T)}
+    return YieldLedger(by_batch, creators, payout_mismatches)
+
+
+def _learner_exits(indexer, prices):
+    """Columns of every redeem and mint from a deposited batch, with the yield it accrued."""
+    rows = indexer.db.execute(
+        "SELECT c.creator, c.stake, l.batch_id, b.amount, b.yield_tokens, b.block,"
+        " l.outcome_block, l.outcome_log_index"
+        " FROM learners l JOIN courses c ON c.course_id = l.course_id"
+        " JOIN batches b ON b.batch_id = l.batch_id AND b.block <= l.outcome_block"
+        " WHERE l.outcome IS NOT NULL"
+    ).fetchall()
+    creator, stake, batch_id, batch_amount, batch_shares, batch_block, block, log_index = (
+        list(column) for column in zip(*rows)
+    ) if rows else ([] for _ in range(8))
+    stake, batch_amount, batch_shares = (
+        np.array([int(v) for v in column], dtype=object) for column in (stake, batch_amount, batch_shares)
+    )
+    price = np.array(
+        [
+            prices.price_per_share(prices.batch_vault(batch, deposited), exited)
+            for batch, deposited, exited in zip(batch_id, batch_block, block)
+        ],
+        dtype=object,
+    )
+    # the learner's share of the batch, as computed by redeem and mint
+    shares = (stake * SCALE // batch_amount) * batch_shares // SCALE
+    collateral = shares * price // SCALE
+    return {
+        "creator": np.array(creator, dtype=object),
+        "batch_id": np.array(batch_id, dtype=np.int64),
+        "block": np.array(block, dtype=np.int64),
+        "log_index": np.array(log_index, dtype=np.int64),
+        "yield": np.where(collateral > stake, collateral - stake, 0).astype(object),
+        "error": shares // SCALE + 1,
+    }
+
+
+def _scholarship_withdrawals(indexer, prices):
+    """(creator, block, log index, new balance, error) of every withdrawScholarship that overwrote a balance."""
+    creators = dict(indexer.db.execute("SELECT course_id, creator FROM courses"))
+    events = indexer.db.execute(
+        "SELECT course_id, 'created', scholarship_total, yield_tokens, vault, block, log_index FROM scholarships"
+        " UNION ALL SELECT course_id, 'withdrawn', amount, NULL, NULL, block, log_index"
+        " FROM scholarship_withdrawals ORDER BY block, log_index"
+    ).fetchall()
+    # the course's scholarshipTotal, scholarshipYTokens and scholarshipVault, replayed in order
+    state = {}
+    overwrites = []
+    for course_id, name, amount, shares, vault, block, log_index in events:
+        amount = int(amount)
+        if name == "created":
+            state[course_id] = [amount, int(shares), vault]
+            continue
+        total, total_shares, vault = state[course_id]
+        provider_shares = min((amount * SCALE // total) * total_shares // SCALE, total_shares)
+        state[course_id] = [total - amount, total_shares - provider_shares, vault]
+        collateral = provider_shares * prices.price_per_share(vault, block) // SCALE
+        if collateral > amount:
+            overwrites.append(
+                (creators[course_id], block, log_index, collateral - amount, provider_shares // SCALE + 1)
+            )
+    return overwrites
+
+
+def _columns(rows, kind):
+    creator, block, log_index, value, error = (list(column) for column in zip(*rows)) if rows else ([],) * 5
+    return (
+        np.array(creator, dtype=object),
+        np.array(block, dtype=np.int64),
+        np.array(log_index, dtype=np.int64),
+        np.full(len(rows), kind),
+        np.array(value, dtype=object),
+        np.array(error, dtype=object),
+    )
+
+
+def _replay(codes, kind, value, error):
+    """
+    The balance before and after each event, and the error bounds of both,
+    for events grouped by creator in order.
+
+    Every overwrite and payout sets the balance, so the balance after an event
+    is the value set by the last of them in its group - or 0 - plus the yield
+    accrued since, found with running sums rather than a loop.
+    """
+    n = len(codes)
+    index = np.arange(n)
+    starts = np.r_[True, codes[1:] != codes[:-1]] if n else np.zeros(0, dtype=bool)
+    sets = kind != ACCRUED
+    accrued = np.where(sets, 0, value).astype(object)
+    accrued_error = np.where(sets, 0, error).astype(object)
+    # the last event that set the balance, or the one before the group if none has
+    anchor = np.maximum.accumulate(np.where(sets, index, np.where(starts, index - 1, -1))) if n else index
+    group_start = np.maximum.accumulate(np.where(starts, index, 0)) if n else index
+    set_by_event = anchor >= group_start
+
+    def since_anchor(column, base):
+        running = np.concatenate([[0], np.cumsum(column)]).astype(object)
+        anchored = np.where(set_by_event, base[np.maximum(anchor, 0)], 0)
+        return anchored + running[index + 1] - running[anchor + 1]
+
+    def preceding(after, accrued):
+        previous = np.concatenate([[0], after[:-1]]).astype(object)
+        return np.where(sets, np.where(starts, 0, previous), after - accrued).astype(object)
+
+    after = since_anchor(accrued, np.where(kind == OVERWRITTEN, value, 0).astype(object))
+    tolerance = since_anchor(accrued_error, np.where(kind == OVERWRITTEN, error, 0).astype(object))
+    return preceding(after, accrued), after, preceding(tolerance, accrued_error), tolerance
+
+
+def _sum_by(codes, values, size):
+    totals = np.zeros(size, dtype=object)
+    np.add.at(totals, codes, values)
+    return totals
@@ -2,5 +2,5 @@ FLAT_DIR="./flattened"
 
 if  [ ! -d $FLAT_DIR ]; then mkdir $FLAT_DIR; fi
 
-rm -f ./flattened/*
-brownie run flatten_contracts.py $1
\ No newline at end of file
+# outputs are kept between runs, build_cache only rewrites those whose sources changed
+python3 -m scripts.build_cache flatten
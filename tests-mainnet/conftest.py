@@ -4,13 +4,26 @@ import constants_mainnet
 from brownie import (
     DeSchool,
     LearningCurve,
+    Dai,
+    MockRegistry,
+    MockVault,
     accounts,
+    network,
     web3,
     Wei,
     chain,
     Contract,
 )
 
+from scripts.tx_sender import TxSender
+
+
+# without a mainnet fork the suite runs against locally deployed stand-ins for DAI
+# and the yearn registry, vault and strategy, see contracts/test
+@pytest.fixture(scope="session")
+def offline():
+    yield "fork" not in network.show_active()
+
 
 @pytest.fixture(scope="function", autouse=True)
 def isolate_func(fn_isolation):
@@ -20,12 +33,15 @@ def isolate_func(fn_isolation):
 
 
 @pytest.fixture
-def deployer():
-    yield accounts.at("0x075e72a5eDf65F0A5f44699c7654C1a76941Ddc8", force=True)
+def deployer(offline):
+    if offline:
+        yield accounts[0]
+    else:
+        yield accounts.at("0x075e72a5eDf65F0A5f44699c7654C1a76941Ddc8", force=True)
 
 
 @pytest.fixture(scope="function", autouse=True)
-def contracts(deployer, token):
+def contracts(deployer, token, registry):
     learning_curve = LearningCurve.deploy(token.address, {"from": deployer})
     token.transfer(deployer, 1e18, {"from": deployer})
     token.approve(learning_curve, 1e18, {"from": deployer})
@@ -33,7 +49,7 @@ def contracts(deployer, token):
     yield DeSchool.deploy(
         token.address,
         learning_curve.address,
-        constants_mainnet.REGISTRY,
+        registry,
         {"from": deployer}), \
         learning_curve
 
@@ -41,37 +57,47 @@ def contracts(deployer, token):
 @pytest.fixture(scope="function")
 def contracts_with_courses(contracts, steward):
     deschool, learning_curve = contracts
-    for n in range(5):
-        tx = deschool.createCourse(
-        constants_mainnet.STAKE,
-        constants_mainnet.DURATION,
-        constants_mainnet.URL,
-        steward,
-        {"from": steward}
+    TxSender().send(
+        (
+            deschool.createCourse,
+            constants_mainnet.STAKE,
+            constants_mainnet.DURATION,
+            constants_mainnet.URL,
+            steward,
+            {"from": steward},
         )
+        for n in range(5)
+    )
     yield deschool, learning_curve
 
 
 @pytest.fixture(scope="function")
 def contracts_with_scholarships(contracts_with_courses, token, deployer, provider):
     deschool, learning_curve = contracts_with_courses
-    token.transfer(provider, (constants_mainnet.SCHOLARSHIP_AMOUNT * 5), {"from": deployer})
+    sender = TxSender()
+    sender.send(
+        [
+            (token.transfer, provider, (constants_mainnet.SCHOLARSHIP_AMOUNT * 5), {"from": deployer}),
+            (token.approve, deschool, (constants_mainnet.SCHOLARSHIP_AMOUNT * 5), {"from": provider}),
+        ]
+    )
     assert token.balanceOf(provider) == (constants_mainnet.SCHOLARSHIP_AMOUNT * 5)
-    token.approve(deschool, (constants_mainnet.SCHOLARSHIP_AMOUNT * 5), {"from": provider})
-    for n in range(5):
-        tx = deschool.createScholarships(
-            n,
-            constants_mainnet.SCHOLARSHIP_AMOUNT,
-            {"from": provider}
-        )
+    sender.send(
+        (deschool.createScholarships, n, constants_mainnet.SCHOLARSHIP_AMOUNT, {"from": provider})
+        for n in range(5)
+    )
     yield deschool, learning_curve
 
 @pytest.fixture(scope="function")
 def contracts_with_learners(contracts_with_courses, learners, token, deployer):
     deschool, learning_curve = contracts_with_courses
-    for n, learner in enumerate(learners):
-        token.transfer(learner, constants_mainnet.STAKE, {"from": deployer})
-        token.approve(deschool, constants_mainnet.STAKE, {"from": learner})
+    sender = TxSender()
+    sender.send(
+        [(token.transfer, learner, constants_mainnet.STAKE, {"from": deployer}) for learner in learners]
+        + [(token.approve, deschool, constants_mainnet.STAKE, {"from": learner}) for learner in learners]
+    )
+    # one at a time, so learners register in the order tests and the indexer expect
+    for learner in learners:
         deschool.register(0, {"from": learner})
     yield deschool, learning_curve
 
@@ -97,23 +123,51 @@ def hackerman(accounts):
   
 
 @pytest.fixture
-def token():
-    yield Contract.from_explorer(constants_mainnet.DAI)
+def token(offline, deployer):
+    if offline:
+        token = Dai.deploy(1, {"from": deployer})
+        token.mint(deployer, constants_mainnet.MOCK_DAI_SUPPLY, {"from": deployer})
+        yield token
+    else:
+        yield Contract.from_explorer(constants_mainnet.DAI)
+
+
+@pytest.fixture
+def ytoken(offline, token, deployer):
+    if offline:
+        vault = MockVault.deploy(token, constants_mainnet.MOCK_YIELD_PER_HARVEST, {"from": deployer})
+        # the mock vault mints DAI into itself to simulate yield
+        token.rely(vault, {"from": deployer})
+        yield vault
+    else:
+        yield Contract.from_explorer(constants_mainnet.VAULT)
 
 
 @pytest.fixture
-def ytoken():
-    yield Contract.from_explorer(constants_mainnet.VAULT)
+def registry(offline, token, ytoken, deployer):
+    if offline:
+        registry = MockRegistry.deploy({"from": deployer})
+        registry.setLatestVault(token, ytoken, {"from": deployer})
+        yield registry
+    else:
+        yield constants_mainnet.REGISTRY
 
 
 @pytest.fixture
-def gen_lev_strat():
-    yield Contract.from_explorer(constants_mainnet.GEN_LEV)
+def gen_lev_strat(offline, ytoken):
+    # harvesting the mock vault accrues yield directly, in place of a strategy harvest
+    if offline:
+        yield ytoken
+    else:
+        yield Contract.from_explorer(constants_mainnet.GEN_LEV)
 
 
 @pytest.fixture
-def keeper():
-    yield accounts.at(constants_mainnet.KEEPER, force=True)
+def keeper(offline):
+    if offline:
+        yield accounts[9]
+    else:
+        yield accounts.at(constants_mainnet.KEEPER, force=True)
 
 
 @pytest.fixture
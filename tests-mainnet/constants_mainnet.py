@@ -15,3 +15,7 @@ MINT_AMOUNT = 1_000e18
 K = 10_000
 ACCURACY = 1e8
 ACCURACY_Y = 1e9
+
+# offline mode only, see conftest.offline
+MOCK_DAI_SUPPLY = 1_000_000_000e18
+MOCK_YIELD_PER_HARVEST = 100
@@ -0,0 +1,64 @@
+import json
+
+import brownie
+import constants_mainnet
+import pytest
+from brownie import web3
+
+from scripts.deploy import Deployment, DeploymentError
+
+
+def manifest(steward, n):
+    return [
+        {"stake": "1000 ether", "duration": constants_mainnet.DURATION, "url": f"{constants_mainnet.URL}/{i}",
+         "creator": str(steward)}
+        for i in range(n)
+    ]
+
+
+def test_deploy_and_resume(deployer, token, registry, steward, tmp_path):
+    state_path = str(tmp_path / "deployment.json")
+    catalogue = manifest(steward, 5)
+    deployment = Deployment(deployer, state_path, token, registry, batch_size=2, log=lambda _: None)
+    course_ids = deployment.run(catalogue[:3])
+    deschool, learning_curve = deployment.deschool, deployment.learning_curve
+
+    assert learning_curve.reserveBalance() == 1e18
+    assert deschool.learningCurve() == learning_curve
+    assert sorted(course_ids) == [0, 1, 2]
+    for course_id, entry in zip(course_ids, catalogue):
+        stake, duration, url, creator = deschool.courses(course_id)[:4]
+        assert (stake, duration, url, creator) == (constants_mainnet.STAKE, entry["duration"], entry["url"], steward)
+
+    # a rerun with nothing new sends nothing
+    nonce = web3.eth.get_transaction_count(deployer.address)
+    rerun = Deployment(deployer, state_path, token, registry, log=lambda _: None)
+    assert rerun.run(catalogue[:3]) == course_ids
+    assert rerun.deschool == deschool
+    assert web3.eth.get_transaction_count(deployer.address) == nonce
+
+    # a run that stopped before recording anything but its deployment nonces
+    with open(state_path) as fp:
+        state = json.load(fp)
+    for step in ("LearningCurve", "DeSchool"):
+        del state[step]["address"]
+    state["courses"] = {"0": state["courses"]["0"]}
+    with open(state_path, "w") as fp:
+        json.dump(state, fp)
+    rerun = Deployment(deployer, state_path, token, registry, batch_size=2, log=lambda _: None)
+    assert rerun.run(catalogue) == course_ids + [3, 4]
+    assert rerun.deschool == deschool
+    assert deschool.getNextCourseId() == 5
+    assert web3.eth.get_transaction_count(deployer.address) == nonce + 2
+
+
+def test_manifest_changes_are_refused(deployer, token, registry, steward, tmp_path):
+    state_path = str(tmp_path / "deployment.json")
+    catalogue = manifest(steward, 2)
+    Deployment(deployer, state_path, token, registry, log=lambda _: None).run(catalogue)
+
+    catalogue[1]["url"] = "https://example.com"
+    with pytest.raises(DeploymentError):
+        Deployment(deployer, state_path, token, registry, log=lambda _: None).run(catalogue)
+    with pytest.raises(DeploymentError):
+        Deployment(brownie.accounts[1], state_path, token, registry, log=lambda _: None)
@@ -0,0 +1,103 @@
+import asyncio
+
+import brownie
+import constants_mainnet
+
+from scripts.keeper import GAS_PRICE_BUMP, BatchKeeper, BatchState, DepositPolicy
+
+
+def keeper_for(deschool, keeper, policy):
+    return BatchKeeper(deschool, keeper, policy, retry_delay=0, log=lambda msg: None)
+
+
+class RejectFirstDeposit:
+    """DeSchool whose first batchDeposit the node turns away, as it would an underpriced replacement."""
+
+    def __init__(self, deschool):
+        self.deschool = deschool
+        self.sent = []
+
+    def __getattr__(self, name):
+        return getattr(self.deschool, name)
+
+    def batchDeposit(self, tx):
+        self.sent.append(tx)
+        if len(self.sent) == 1:
+            raise ValueError("replacement transaction underpriced")
+        return self.deschool.batchDeposit(tx)
+
+
+def test_policy():
+    policy = DepositPolicy(min_batch_total=10e18, max_wait_blocks=100, apr=0.05, eth_price=2000)
+    state = BatchState(0, 0, None, 1000, 50e9, 100_000)
+    assert policy.reason_to_deposit(state) is None
+
+    # 1_000 DAI earns ~0.2 DAI over 10_000 blocks, far less than 100k gas at 50 gwei
+    state = BatchState(0, 1_000e18, 990, 1000, 50e9, 100_000)
+    assert policy.reason_to_deposit(state) is None
+    state.block = 1090
+    assert policy.reason_to_deposit(state) == "first learner has waited 100 blocks"
+
+    # 1_000_000 DAI earns ~214 DAI, more than the 10 DAI of gas
+    state = BatchState(0, 1_000_000e18, 990, 1000, 50e9, 100_000)
+    assert policy.reason_to_deposit(state).startswith("expected yield")
+    state.batch_total = 5e18
+    assert policy.reason_to_deposit(state) is None
+
+
+def test_keeper_waits_then_deposits(contracts_with_learners, keeper, ytoken):
+    deschool, learning_curve = contracts_with_learners
+    policy = DepositPolicy(min_batch_total=1e30, max_wait_blocks=20)
+    batch_keeper = keeper_for(deschool, keeper, policy)
+
+    assert asyncio.run(batch_keeper.step()) is None
+    assert deschool.getCurrentBatchId() == 0
+
+    brownie.chain.mine(20)
+    tx = asyncio.run(batch_keeper.step())
+    assert "BatchDeposited" in tx.events
+    assert deschool.getCurrentBatchId() == 1
+    assert ytoken.balanceOf(deschool) > 0
+    # nothing left to deposit
+    assert asyncio.run(batch_keeper.step()) is None
+
+
+def test_keeper_deposits_when_worth_the_gas(contracts_with_learners, keeper):
+    deschool, learning_curve = contracts_with_learners
+    policy = DepositPolicy(apr=0.05, eth_price=2000, min_yield_to_gas=0)
+    tx = asyncio.run(keeper_for(deschool, keeper, policy).step())
+    assert tx.events["BatchDeposited"]["batchAmount"] == 4 * constants_mainnet.STAKE
+
+
+def test_keeper_tracks_new_batch(contracts_with_learners, keeper, token, deployer, hackerman):
+    deschool, learning_curve = contracts_with_learners
+    policy = DepositPolicy(min_batch_total=1e30, max_wait_blocks=20)
+    batch_keeper = keeper_for(deschool, keeper, policy)
+    asyncio.run(batch_keeper.step())
+
+    # somebody else deposits, then a learner registers in the next batch
+    deschool.batchDeposit({"from": deployer})
+    brownie.chain.mine(30)
+    token.transfer(hackerman, constants_mainnet.STAKE, {"from": deployer})
+    token.approve(deschool, constants_mainnet.STAKE, {"from": hackerman})
+    tx = deschool.register(1, {"from": hackerman})
+
+    state = asyncio.run(batch_keeper.batch_state())
+    assert state.batch_id == 1
+    assert state.first_registered == tx.block_number
+    assert asyncio.run(batch_keeper.step()) is None
+
+
+def test_keeper_retries_with_same_nonce(contracts_with_learners, keeper):
+    deschool, learning_curve = contracts_with_learners
+    flaky = RejectFirstDeposit(deschool)
+    batch_keeper = keeper_for(flaky, keeper, DepositPolicy())
+    nonce, gas_price = keeper.nonce, brownie.web3.eth.gas_price
+    state = BatchState(0, deschool.getCurrentBatchTotal(), None, brownie.chain.height, gas_price, 0)
+
+    tx = asyncio.run(batch_keeper.deposit(state))
+    assert "BatchDeposited" in tx.events
+    first, retry = flaky.sent
+    assert first["nonce"] == retry["nonce"] == tx.nonce == nonce
+    assert first["gas_price"] == gas_price
+    assert retry["gas_price"] == int(gas_price * GAS_PRICE_BUMP) + 1
@@ -1,15 +1,15 @@
 import brownie
 import constants_mainnet
 from eth_account import Account
-from eth_account._utils.structured_data.hashing import hash_domain
-from eth_account.messages import encode_structured_data
-from eth_utils import encode_hex
+
+from scripts.fast_forward import fast_forward
+from scripts.permit import sign_permit
 
 def test_redeem(contracts_with_learners, learners, token, steward, keeper, gen_lev_strat, ytoken):
     deschool, learning_curve = contracts_with_learners
-    brownie.chain.mine(constants_mainnet.COURSE_RUNNING)
+    fast_forward(constants_mainnet.COURSE_RUNNING)
     tx = deschool.batchDeposit({"from": keeper})
-    brownie.chain.mine(constants_mainnet.DURATION)
+    fast_forward(constants_mainnet.DURATION)
     brownie.chain.sleep(1000)
     gen_lev_strat.harvest({"from": keeper})
     for n, learner in enumerate(learners):
@@ -35,9 +35,9 @@ def test_redeem(contracts_with_learners, learners, token, steward, keeper, gen_l
     
 def test_mint(contracts_with_learners, learners, token, keeper, gen_lev_strat, ytoken, steward):
     deschool, learning_curve = contracts_with_learners
-    brownie.chain.mine(constants_mainnet.COURSE_RUNNING)
+    fast_forward(constants_mainnet.COURSE_RUNNING)
     tx = deschool.batchDeposit({"from": keeper})
-    brownie.chain.mine(constants_mainnet.DURATION)
+    fast_forward(constants_mainnet.DURATION)
     brownie.chain.sleep(1000)
     gen_lev_strat.harvest({"from": keeper})
     for n, learner in enumerate(learners):
@@ -119,46 +119,10 @@ def test_verify(contracts_with_learners, learners, keeper):
     learner = learners[0]
     tx = deschool.batchDeposit({"from": keeper})
     assert not(deschool.verify(learner, 0, {"from": learner}))
-    brownie.chain.mine(constants_mainnet.DURATION)
+    fast_forward(constants_mainnet.DURATION)
     assert deschool.verify(learner, 0, {"from": learner})
 
 
-def build_permit(holder, spender, token, expiry):
-    data = {
-        "types": {
-            "EIP712Domain": [
-                {"name": "name", "type": "string"},
-                {"name": "version", "type": "string"},
-                {"name": "chainId", "type": "uint256"},
-                {"name": "verifyingContract", "type": "address"},
-            ],
-            "Permit": [
-                {"name": "holder", "type": "address"},
-                {"name": "spender", "type": "address"},
-                {"name": "nonce", "type": "uint256"},
-                {"name": "expiry", "type": "uint256"},
-                {"name": "allowed", "type": "bool"},
-            ],
-        },
-        "domain": {
-            "name": token.name(),
-            "version": token.version(),
-            "chainId": 1,
-            "verifyingContract": str(token),
-        },
-        "primaryType": "Permit",
-        "message": {
-            "holder": holder,
-            "spender": spender,
-            "nonce": token.nonces(holder),
-            "expiry": 0,
-            "allowed": True,
-        },
-    }
-    assert encode_hex(hash_domain(data)) == token.DOMAIN_SEPARATOR()
-    return encode_structured_data(data)
-
-
 def test_create_scholarships(contracts_with_scholarships, token, deployer):
     deschool, learning_curve = contracts_with_scholarships
     # provide another scholarship, from a separate account, to the first course
@@ -200,10 +164,9 @@ def test_permit_create_scholarships(contracts_with_courses, learners, token, dep
     holder = signer.address
     token.transfer(holder, constants_mainnet.SCHOLARSHIP_AMOUNT, {"from": deployer})
     assert token.balanceOf(holder) == constants_mainnet.SCHOLARSHIP_AMOUNT
-    permit = build_permit(holder, str(deschool), token, 3600)
-    signed = signer.sign_message(permit)
+    permit = sign_permit(token, signer, deschool)
     print(token.balanceOf(deschool.address))
-    tx = deschool.permitCreateScholarships(0, constants_mainnet.SCHOLARSHIP_AMOUNT, 0, 0, signed.v, signed.r, signed.s, {"from": holder})
+    tx = deschool.permitCreateScholarships(0, constants_mainnet.SCHOLARSHIP_AMOUNT, *permit, {"from": holder})
     print(token.balanceOf(deschool.address))
     assert "ScholarshipCreated" in tx.events
     assert tx.events["ScholarshipCreated"]["courseId"] == 0
@@ -230,7 +193,7 @@ def test_register_scholar(contracts_with_scholarships, learners):
             0,
             {"from": learners[2]}
         )
-    brownie.chain.mine(constants_mainnet.DURATION)
+    fast_forward(constants_mainnet.DURATION)
     # this should now succeed
     assert deschool.scholarshipAvailable(0)
     tx = deschool.registerScholar(
@@ -263,8 +226,10 @@ def test_register_scholar_reverts(contracts_with_scholarships, learners):
         )
 
 
-def test_withdraw_scholarships(contracts_with_scholarships, token, provider):
+def test_withdraw_scholarships(contracts_with_scholarships, token, provider, offline):
     deschool, learning_curve = contracts_with_scholarships
+    # the live yearn vault loses a wei to rounding on each withdrawal; MockVault's price is exactly 1
+    first_loss, total_loss = (0, 0) if offline else (1, 2)
     prov_bal_before = token.balanceOf(provider)
     tx = deschool.withdrawScholarship(
         0,
@@ -275,7 +240,7 @@ def test_withdraw_scholarships(contracts_with_scholarships, token, provider):
     assert tx.events["ScholarshipWithdrawn"]["courseId"] == 0
     assert tx.events["ScholarshipWithdrawn"]["amountWithdrawn"] == constants_mainnet.SCHOLARSHIP_AMOUNT
     # the -1 is because of a rounding error in the mul div operation we do to ensure we cater for the case that the vault makes a loss
-    assert token.balanceOf(provider) == prov_bal_before + constants_mainnet.SCHOLARSHIP_AMOUNT - 1
+    assert token.balanceOf(provider) == prov_bal_before + constants_mainnet.SCHOLARSHIP_AMOUNT - first_loss
     # we can check the scholarshipTotal slot in the course struct to be sure
     assert deschool.courses(0)[5] == 0
     # Now try and withdraw only half the amount initially provided for another course
@@ -289,7 +254,7 @@ def test_withdraw_scholarships(contracts_with_scholarships, token, provider):
     assert tx.events["ScholarshipWithdrawn"]["amountWithdrawn"] == constants_mainnet.SCHOLARSHIP_AMOUNT / 2
     assert deschool.courses(1)[6] == tx.events["ScholarshipWithdrawn"]["amountWithdrawn"]
     # this rounding error depends on the amount and it's relation to the total, it seems
-    assert token.balanceOf(provider) == prov_bal_before + constants_mainnet.SCHOLARSHIP_AMOUNT + constants_mainnet.SCHOLARSHIP_AMOUNT / 2 - 2
+    assert token.balanceOf(provider) == prov_bal_before + constants_mainnet.SCHOLARSHIP_AMOUNT + constants_mainnet.SCHOLARSHIP_AMOUNT / 2 - total_loss
 
 
 def test_withdraw_scholarships_reverts(contracts_with_scholarships, provider, hackerman):
@@ -314,10 +279,9 @@ def test_register_permit(contracts_with_courses, learners, token, deployer):
     holder = signer.address
     token.transfer(holder, constants_mainnet.STAKE, {"from": deployer})
     assert token.balanceOf(holder) == constants_mainnet.STAKE
-    permit = build_permit(holder, str(deschool), token, 3600)
-    signed = signer.sign_message(permit)
+    permit = sign_permit(token, signer, deschool)
     print(token.balanceOf(deschool.address))
-    tx = deschool.permitAndRegister(0, 0, 0, signed.v, signed.r, signed.s, {"from": holder})
+    tx = deschool.permitAndRegister(0, *permit, {"from": holder})
     print(token.balanceOf(deschool.address))
     assert "LearnerRegistered" in tx.events
     assert tx.events["LearnerRegistered"]["courseId"] == 0
@@ -1,6 +1,8 @@
 import brownie
 import constants_mainnet
 
+from scripts.fast_forward import fast_forward
+
 def test_full_redeem(
         deployer,
         learners,
@@ -50,9 +52,9 @@ def test_full_redeem(
     assert token.balanceOf(deschool) == 0
     assert deschool.getCurrentBatchId() == 1
     assert ytoken.balanceOf(deschool) > 0
-    brownie.chain.mine(constants_mainnet.COURSE_RUNNING)
+    fast_forward(constants_mainnet.COURSE_RUNNING)
     gen_lev_strat.harvest({"from": keeper})
-    brownie.chain.mine(constants_mainnet.DURATION)
+    fast_forward(constants_mainnet.DURATION)
 
     assert deschool.verify(learners[0], 0, {"from": steward})
     print("----- REDEEM -----")
@@ -115,7 +117,7 @@ def test_full_mint(
     assert deschool.getCurrentBatchTotal() == constants_mainnet.STAKE * len(learners)
     assert token.balanceOf(deschool) == constants_mainnet.STAKE * len(learners)
     tx = deschool.batchDeposit({"from": kernelTreasury})
-    brownie.chain.mine(constants_mainnet.DURATION)
+    fast_forward(constants_mainnet.DURATION)
     gen_lev_strat.harvest({"from": keeper})
     assert token.balanceOf(deschool) == 0
     assert deschool.getCurrentBatchId() == 1
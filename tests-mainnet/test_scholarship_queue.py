@@ -0,0 +1,82 @@
+import copy
+import math
+
+import brownie
+import constants_mainnet
+import pytest
+from brownie import accounts
+
+from scripts.indexer import EventIndexer
+from scripts.scholarship_queue import NO_SCHOLARSHIPS, CourseQueue, QueueRevert, ScholarshipQueue
+
+DURATION = 20
+
+
+def test_free_seats_are_registrable():
+    course = CourseQueue(constants_mainnet.STAKE, DURATION, constants_mainnet.STAKE * 3)
+    for block in (5, 8, 8):
+        course.register(block)
+    # a withdrawal leaves fewer seats than scholars
+    course.scholarship_total -= constants_mainnet.STAKE * 2
+    for block in range(10, 50):
+        free = course.free_seats(block)
+        assert (course.next_seat(block) == block) == (free > 0)
+        trial = copy.deepcopy(course)
+        for _ in range(free):
+            trial.register(block)
+        with pytest.raises(QueueRevert):
+            trial.register(block)
+    assert [course.free_seats(block) for block in (24, 25, 27, 28)] == [0, 1, 1, 3]
+
+    unfunded = CourseQueue(constants_mainnet.STAKE, DURATION)
+    assert unfunded.free_seats(DURATION - 1) == 0
+    assert unfunded.free_seats(DURATION) == math.inf
+
+
+def test_queue_matches_contract(contracts, token, deployer, steward, provider, tmp_path):
+    deschool, learning_curve = contracts
+    for _ in range(2):
+        deschool.createCourse(
+            constants_mainnet.STAKE, DURATION, constants_mainnet.URL, steward, {"from": steward}
+        )
+    scholars = [accounts.add() for _ in range(7)]
+    for scholar in scholars:
+        deployer.transfer(scholar, "0.1 ether")
+    token.transfer(provider, constants_mainnet.STAKE * 3, {"from": deployer})
+    token.approve(deschool, constants_mainnet.STAKE * 3, {"from": provider})
+
+    deschool.createScholarships(0, constants_mainnet.STAKE * 2, {"from": provider})
+    deschool.registerScholar(0, {"from": scholars[0]})
+    brownie.chain.mine(3)
+    deschool.registerScholar(0, {"from": scholars[1]})
+    deschool.createScholarships(0, constants_mainnet.STAKE, {"from": provider})
+    deschool.registerScholar(0, {"from": scholars[2]})
+    deschool.withdrawScholarship(0, constants_mainnet.STAKE * 2, {"from": provider})
+
+    indexer = EventIndexer(str(tmp_path / "events.sqlite"), deschool, learning_curve)
+    indexer.sync()
+    queue = ScholarshipQueue.from_index(indexer)
+    course = queue[0]
+    assert course.scholars == deschool.courses(0)[4] == 3
+    assert course.completed_scholars == deschool.courses(0)[5] == 0
+    assert course.scholarship_total == deschool.courses(0)[6]
+
+    # every seat is taken, so scholars can only register as the earliest ones complete
+    for scholar in scholars[3:6]:
+        opens = course.next_seat(brownie.chain.height + 1)
+        if opens > brownie.chain.height + 1:
+            # the next transaction goes in the block before the seat opens
+            brownie.chain.mine(opens - 2 - brownie.chain.height)
+            with brownie.reverts(NO_SCHOLARSHIPS):
+                deschool.registerScholar(0, {"from": scholar})
+            brownie.chain.mine(opens - 1 - brownie.chain.height)
+        tx = deschool.registerScholar(0, {"from": scholar})
+        assert tx.block_number == opens
+        queue.apply(0, "ScholarRegistered", None, tx.block_number)
+    assert course.completed_scholars == deschool.courses(0)[5] == 3
+
+    # like the contract, a course nobody funded takes scholars once `duration` blocks have passed
+    opens = queue[1].next_seat(brownie.chain.height + 1)
+    brownie.chain.mine(opens - 1 - brownie.chain.height)
+    assert deschool.registerScholar(1, {"from": scholars[6]}).block_number == opens
+    assert queue[1].free_seats(opens) == math.inf
@@ -0,0 +1,42 @@
+import brownie
+import constants_mainnet
+from brownie import Multicall
+
+from scripts.bulk_reader import BulkReader
+from scripts.fast_forward import fast_forward
+from scripts.indexer import EventIndexer
+from scripts.yield_ledger import ChainPrices, attribute_yield
+
+
+def test_ledger_reconciles(
+    contracts_with_learners, contracts_with_scholarships, learners, steward, provider, deployer, keeper,
+    gen_lev_strat, tmp_path
+):
+    deschool, learning_curve = contracts_with_learners
+    fast_forward(constants_mainnet.COURSE_RUNNING)
+    deschool.batchDeposit({"from": keeper})
+    fast_forward(constants_mainnet.DURATION)
+    brownie.chain.sleep(1000)
+    gen_lev_strat.harvest({"from": keeper})
+    deschool.redeem(0, {"from": learners[0]})
+    deschool.mint(0, {"from": learners[1]})
+    payout = deschool.withdrawYieldRewards({"from": steward}).events["YieldRewardRedeemed"]["yieldRewarded"]
+    deschool.redeem(0, {"from": learners[2]})
+    # the scholarship vault gained too, so this overwrites the yield left by learners[2]
+    deschool.withdrawScholarship(0, constants_mainnet.SCHOLARSHIP_AMOUNT, {"from": provider})
+    deschool.mint(0, {"from": learners[3]})
+
+    indexer = EventIndexer(str(tmp_path / "events.sqlite"), deschool, learning_curve)
+    indexer.sync()
+    ledger = attribute_yield(indexer, ChainPrices(deschool))
+
+    creator = ledger.creators[steward.address]
+    assert ledger.payout_mismatches == []
+    assert creator["paid_out"] == payout
+    assert creator["overwritten"] > 0
+    assert creator["scholarship_yield"] > 0
+    assert ledger.by_batch[steward.address, 0] == creator["learner_yield"]
+
+    reader = BulkReader(deschool, Multicall.deploy({"from": deployer}))
+    assert ledger.reconcile(reader.yield_rewards(ledger.creators)) == []
+    assert abs(deschool.getYieldRewards(steward) - creator["expected"]) <= creator["tolerance"]
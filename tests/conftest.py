@@ -4,76 +4,170 @@ from brownie import (
     DeSchool,
     LearningCurve,
     Dai,
+    chain,
 )
+from brownie.network import rpc
+
+from scripts.tx_sender import TxSender
+
+
+# fixture tiers, each built on top of the one before it
+TIERS = (
+    "token",
+    "contracts",
+    "contracts_with_courses",
+    "contracts_with_learners",
+)
+
+
+class Checkpoints:
+    """
+    Chain snapshots of the fixture tiers.
+
+    Each tier is set up once by its builder and snapshotted, and tests revert to
+    the snapshot of the deepest tier they use rather than redeploying. Reverting
+    to a snapshot discards every snapshot taken after it, so deeper tiers are
+    rebuilt if a test moves back up the list - pytest_collection_modifyitems
+    orders the tests so that this doesn't happen.
+
+    With pytest-xdist every worker has its own chain and its own Checkpoints,
+    and is sent whole modules, so the tiers are built once per module at most.
+    """
+
+    def __init__(self, builders):
+        self._builders = builders
+        self._base = rpc.Rpc().snapshot()
+        self._snapshots = []
+        self.values = []
+
+    def revert(self, tier):
+        depth = TIERS.index(tier)
+        if depth < len(self._snapshots):
+            self._snapshots[depth] = chain._revert(self._snapshots[depth])
+            del self._snapshots[depth + 1:]
+            del self.values[depth + 1:]
+            return
+        if depth > 0:
+            self.revert(TIERS[depth - 1])
+        else:
+            self._base = chain._revert(self._base)
+        self.values.append(self._builders[depth](self))
+        self._snapshots.append(rpc.Rpc().snapshot())
+
+    def __getitem__(self, tier):
+        return self.values[TIERS.index(tier)]
+
+
+def _tier_depth(fixturenames):
+    return max((TIERS.index(name) for name in fixturenames if name in TIERS), default=0)
+
+
+def pytest_collection_modifyitems(items):
+    # run the tests tier by tier, so each tier is only built once per session
+    items.sort(key=lambda item: _tier_depth(item.fixturenames))
+
+
+@pytest.fixture(scope="session")
+def checkpoints(deployer, steward, learners):
+    def build_token(checkpoints):
+        token = Dai.deploy(1, {"from": deployer})
+        token.mint(deployer, 1_000_000_000_000_000_000e18)
+        return token
+
+    def build_contracts(checkpoints):
+        token = checkpoints["token"]
+        learning_curve = LearningCurve.deploy(token.address, {"from": deployer})
+        token.approve(learning_curve, 1e18, {"from": deployer})
+        learning_curve.initialise({"from": deployer})
+        return DeSchool.deploy(
+            token.address,
+            learning_curve.address,
+            constants_unit.REGISTRY,
+            {"from": deployer}), \
+            learning_curve
+
+    def build_courses(checkpoints):
+        deschool, learning_curve = checkpoints["contracts"]
+        TxSender().send(
+            (
+                deschool.createCourse,
+                constants_unit.STAKE,
+                constants_unit.DURATION,
+                constants_unit.URL,
+                constants_unit.CREATOR,
+                {"from": steward},
+            )
+            for n in range(5)
+        )
+        return deschool, learning_curve
+
+    def build_learners(checkpoints):
+        deschool, learning_curve = checkpoints["contracts_with_courses"]
+        token = checkpoints["token"]
+        sender = TxSender()
+        sender.send(
+            [(token.transfer, learner, constants_unit.STAKE, {"from": deployer}) for learner in learners]
+            + [(token.approve, deschool, constants_unit.STAKE, {"from": learner}) for learner in learners]
+        )
+        # one at a time, so learners register in the order tests and the indexer expect
+        for learner in learners:
+            deschool.register(0, {"from": learner})
+        return deschool, learning_curve
+
+    yield Checkpoints((build_token, build_contracts, build_courses, build_learners))
+
+
+@pytest.fixture(scope="module")
+def module_isolation():
+    # overrides brownie's module_isolation, which resets the chain around every module and
+    # would discard the session's checkpoints; isolation is provided by isolate_func
+    yield
 
 
 @pytest.fixture(scope="function", autouse=True)
-def isolate_func(fn_isolation):
-    # perform a chain rewind after completing each test, to ensure proper isolation
-    # https://eth-brownie.readthedocs.io/en/v1.10.3/tests-pytest-intro.html#isolation-fixtures
-    pass
+def isolate_func(request, module_isolation, checkpoints):
+    # revert to the snapshot of the deepest tier the test uses, so every test starts from
+    # exactly the state its fixtures describe and nothing it does carries over
+    checkpoints.revert(TIERS[_tier_depth(request.fixturenames)])
+    yield
 
 
 @pytest.fixture(scope="function", autouse=True)
-def token(deployer):
-    token = Dai.deploy(1, {"from": deployer})
-    token.mint(deployer, 1_000_000_000_000_000_000e18)
-    yield token
+def token(isolate_func, checkpoints):
+    yield checkpoints["token"]
 
 
 @pytest.fixture(scope="function")
-def contracts(deployer, token):
-    learning_curve = LearningCurve.deploy(token.address, {"from": deployer})
-    token.approve(learning_curve, 1e18, {"from": deployer})
-    learning_curve.initialise({"from": deployer})
-    yield DeSchool.deploy(
-        token.address,
-        learning_curve.address,
-        constants_unit.REGISTRY,
-        {"from": deployer}), \
-        learning_curve
+def contracts(token, checkpoints):
+    yield checkpoints["contracts"]
 
 
 @pytest.fixture(scope="function")
-def contracts_with_courses(contracts, steward):
-    deschool, learning_curve = contracts
-    for n in range(5):
-        tx = deschool.createCourse(
-        constants_unit.STAKE,
-        constants_unit.DURATION,
-        constants_unit.URL,
-        constants_unit.CREATOR,
-        {"from": steward}
-        )
-    yield deschool, learning_curve
+def contracts_with_courses(contracts, checkpoints):
+    yield checkpoints["contracts_with_courses"]
 
 
 @pytest.fixture(scope="function")
-def contracts_with_learners(contracts_with_courses, learners, token, deployer):
-    deschool, learning_curve = contracts_with_courses
-    for n, learner in enumerate(learners):
-        token.transfer(learner, constants_unit.STAKE, {"from": deployer})
-        token.approve(deschool, constants_unit.STAKE, {"from": learner})
-        deschool.register(0, {"from": learner})
-    yield deschool, learning_curve
+def contracts_with_learners(contracts_with_courses, checkpoints):
+    yield checkpoints["contracts_with_learners"]
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def deployer(accounts):
     yield accounts[0]
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def steward(accounts):
     yield accounts[1]
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def hackerman(accounts):
     yield accounts[9]
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def learners(accounts):
     yield accounts[2:8]
 
@@ -81,4 +175,3 @@ def learners(accounts):
 @pytest.fixture
 def kernelTreasury(accounts):
     yield accounts.at("0x297a3C4B8bB87E671d31C475C5DbE434E24dFC1F", force=True)
-
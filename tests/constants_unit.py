@@ -11,3 +11,7 @@ MALICIOUS_AMOUNT = 1_000_000_000_000_000e18
 MINT_AMOUNT = 10_000e18
 K = 10_000
 ACCURACY = 1e8
+
+# stateful fuzzing of the curve, see test_curve_stateful
+FUZZ_EXAMPLES = 20
+FUZZ_STEPS = 50
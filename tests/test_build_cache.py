@@ -0,0 +1,86 @@
+import os
+
+from scripts import build_cache
+
+
+def write(root, path, source):
+    path = os.path.join(root, path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as fp:
+        fp.write(source)
+
+
+def contracts_tree(root):
+    write(root, "Lib.sol", "// SPDX-License-Identifier: WTFPL\npragma solidity >=0.8.0;\n\nlibrary Lib {}\n")
+    write(
+        root,
+        "Token.sol",
+        '// SPDX-License-Identifier: MPL-2.0\npragma solidity 0.8.13;\n\nimport {Lib} from "./Lib.sol";\n\n'
+        "contract Token {}\n",
+    )
+    write(
+        root,
+        "App.sol",
+        '//SPDX-License-Identifier: MPL-2.0\npragma solidity 0.8.13;\n\nimport "./Token.sol";\n'
+        'import "./interfaces/I_App.sol";\n\ncontract App {}\n',
+    )
+    write(root, "interfaces/I_App.sol", "pragma solidity 0.8.13;\n\ninterface I_App {}\n")
+    write(root, "test/Mock.sol", 'pragma solidity 0.8.13;\n\nimport "../Lib.sol";\n\ncontract Mock {}\n')
+
+
+def test_graph_and_hashes(tmp_path):
+    root = str(tmp_path / "contracts")
+    contracts_tree(root)
+    write(root, "Dai.sol", "pragma solidity =0.5.12;\n\ncontract Dai {}\n")
+    graph = build_cache.source_graph(root)
+    assert graph["App.sol"] == {"Token.sol", "interfaces/I_App.sol"}
+    assert graph["test/Mock.sol"] == {"Lib.sol"}
+    assert build_cache.entry_points(graph) == ["App.sol"]
+    assert build_cache.import_order(graph, "App.sol") == \
+        ["Lib.sol", "Token.sol", "interfaces/I_App.sol", "App.sol"]
+
+    before = build_cache.closure_hashes(root)
+    write(root, "Lib.sol", "pragma solidity >=0.8.0;\n\nlibrary Lib { }\n")
+    after = build_cache.closure_hashes(root)
+    # everything importing Lib, directly or not, changes
+    assert {path for path in before if before[path] != after[path]} == \
+        {"Lib.sol", "Token.sol", "App.sol", "test/Mock.sol"}
+
+
+def test_flatten(tmp_path):
+    root = str(tmp_path / "contracts")
+    contracts_tree(root)
+    flattened = build_cache.flatten("App.sol", root)
+    assert flattened.startswith("// SPDX-License-Identifier: MPL-2.0\n\npragma solidity 0.8.13;")
+    assert flattened.count("pragma") == flattened.count("SPDX") == 1
+    assert "import" not in flattened
+    assert flattened.index("library Lib") < flattened.index("contract Token") < \
+        flattened.index("interface I_App") < flattened.index("contract App")
+
+
+def test_flatten_only_changed(tmp_path):
+    root, out = str(tmp_path / "contracts"), str(tmp_path / "flattened")
+    contracts_tree(root)
+    write(root, "Other.sol", "pragma solidity 0.8.13;\n\ncontract Other {}\n")
+    cache = build_cache.BuildCache(str(tmp_path / "build" / "cache.json"))
+
+    assert build_cache.flatten_changed(root, out, cache) == \
+        [os.path.join(out, "App.sol"), os.path.join(out, "Other.sol")]
+    assert build_cache.flatten_changed(root, out, cache) == []
+
+    write(root, "interfaces/I_App.sol", "pragma solidity 0.8.13;\n\ninterface I_App { }\n")
+    os.remove(os.path.join(root, "Other.sol"))
+    cache = build_cache.BuildCache(cache.manifest_path)
+    assert build_cache.flatten_changed(root, out, cache) == [os.path.join(out, "App.sol")]
+    assert os.listdir(out) == ["App.sol"]
+
+
+def test_compile_only_changed(tmp_path):
+    root = str(tmp_path / "contracts")
+    contracts_tree(root)
+    cache = build_cache.BuildCache(str(tmp_path / "cache.json"))
+    command = ("python", "-c", "")
+    assert len(build_cache.compile_changed(root, cache, command)) == 5
+    assert build_cache.compile_changed(root, cache, command) == []
+    write(root, "Token.sol", "pragma solidity 0.8.13;\n\ncontract Token { }\n")
+    assert build_cache.compile_changed(root, cache, command) == ["App.sol", "Token.sol"]
@@ -0,0 +1,39 @@
+import constants_unit
+from brownie import Multicall
+
+from scripts.bulk_reader import BulkReader, revert_reason
+from scripts.fast_forward import fast_forward
+
+
+def test_read_courses_and_learners(contracts_with_learners, learners, hackerman, deployer):
+    deschool, learning_curve = contracts_with_learners
+    reader = BulkReader(deschool, Multicall.deploy({"from": deployer}), chunk_size=7)
+    fast_forward(constants_unit.DURATION)
+
+    pairs = [(learner, 0) for learner in learners] + [(learners[0], 1), (hackerman, 0), (hackerman, 99)]
+    courses, records = reader.read(range(6), pairs)
+
+    for course_id, course in enumerate(courses[:5]):
+        assert course.course_id == course_id
+        assert (course.stake, course.duration, course.url, course.creator) == \
+            deschool.courses(course_id)[:4]
+        assert course.scholarship_available == deschool.scholarshipAvailable(course_id)
+    # courses(5) is empty, and scholarshipAvailable divides by its zero stake
+    assert courses[5].stake == 0
+    assert courses[5].scholarship_available is None
+    assert courses[5].error == "Panic(0x12)"
+
+    for record, learner in zip(records, learners):
+        assert record.block_registered == deschool.getBlockRegistered(learner, 0) > 0
+        assert record.verified is True
+        assert record.error is None
+    unregistered, hacker, missing_course = records[-3:]
+    assert (unregistered.block_registered, unregistered.verified) == (0, None)
+    assert unregistered.error == "verify: not registered to this course"
+    assert hacker.error == "verify: not registered to this course"
+    assert missing_course.error == "verify: courseId does not exist"
+
+
+def test_revert_reason():
+    assert revert_reason(b"") == "reverted"
+    assert revert_reason("0x12345678") == "reverted: 0x12345678"
@@ -0,0 +1,81 @@
+import brownie
+import pytest
+import constants_unit
+from math import log as ln
+
+from scripts import curve_math
+
+
+def test_fixed_point_identities():
+    assert curve_math.ln(curve_math.SCALE) == 0
+    assert curve_math.exp(0) == curve_math.SCALE
+    for n in range(1, 128):
+        assert curve_math.exp2(n * curve_math.SCALE) == 2 ** n * curve_math.SCALE
+        assert curve_math.log2(2 ** n * curve_math.SCALE) == n * curve_math.SCALE
+
+
+def test_fixed_point_reverts():
+    with pytest.raises(curve_math.CurveRevert):
+        curve_math.ln(curve_math.SCALE - 1)
+    with pytest.raises(curve_math.CurveRevert):
+        curve_math.exp(curve_math.MAX_EXP_INPUT)
+    with pytest.raises(curve_math.CurveRevert):
+        curve_math.exp2(curve_math.MAX_EXP2_INPUT)
+
+
+def test_model_close_to_float_maths():
+    reserve = 10 ** 18
+    for n in range(1, 30):
+        amount = 10 ** n
+        predicted = constants_unit.K * ln((reserve + amount) / reserve) * 1e18
+        assert abs(curve_math.mintable_for_reserve_amount(reserve, amount) - predicted) <= \
+            max(constants_unit.ACCURACY, predicted * 1e-12)
+
+
+def test_model_matches_views(contracts):
+    _, learning_curve = contracts
+    reserve = learning_curve.reserveBalance()
+    for n in range(0, 40, 3):
+        amount = 10 ** n
+        assert learning_curve.getMintableForReserveAmount(amount) == \
+            curve_math.mintable_for_reserve_amount(reserve, amount)
+        try:
+            predicted = curve_math.predicted_burn(reserve, amount)
+        except curve_math.CurveRevert as exc:
+            # from 1e24 LEARN, amount / K is past exp's domain and both revert
+            with brownie.reverts(exc.revert_msg):
+                learning_curve.getPredictedBurn(amount)
+            continue
+        assert learning_curve.getPredictedBurn(amount) == predicted
+
+
+def test_model_matches_mint_and_burn(learners, token, deployer, contracts):
+    _, learning_curve = contracts
+    model = curve_math.LearningCurveModel.from_contract(learning_curve, learners)
+    for n, learner in enumerate(learners):
+        amount = constants_unit.MINT_AMOUNT * (n + 1)
+        token.transfer(learner, amount, {"from": deployer})
+        token.approve(learning_curve, amount, {"from": learner})
+        tx = learning_curve.mint(amount, {"from": learner})
+        assert tx.events["LearnMinted"]["amountMinted"] == model.mint(learner, amount)
+    for learner in learners:
+        burn_amount = model.balance_of(learner) // 2
+        tx = learning_curve.burn(burn_amount, {"from": learner})
+        assert tx.events["LearnBurned"]["daiReturned"] == model.burn(learner, burn_amount)
+        assert learning_curve.balanceOf(learner) == model.balance_of(learner)
+    assert learning_curve.reserveBalance() == model.reserve_balance
+    assert learning_curve.totalSupply() == model.total_supply
+
+
+def test_model_reverts(deployer):
+    model = curve_math.LearningCurveModel()
+    with pytest.raises(curve_math.CurveRevert, match="!initialised"):
+        model.mint(deployer, constants_unit.MINT_AMOUNT)
+    model.initialise(deployer)
+    with pytest.raises(curve_math.CurveRevert, match="^initialised"):
+        model.initialise(deployer)
+    with pytest.raises(curve_math.CurveRevert, match="Integer overflow"):
+        model.burn(deployer, model.balance_of(deployer) + 1)
+    assert model.reserve_balance == curve_math.INITIAL_RESERVE
+    assert model.total_supply == curve_math.INITIAL_SUPPLY
+
@@ -0,0 +1,64 @@
+import numpy as np
+
+from scripts import curve_math
+from scripts.curve_path import BURN, MINT, quote_path, quote_paths
+
+PATHS = [
+    [(MINT, 10 ** 21), (BURN, 5 * 10 ** 22), (MINT, 10 ** 18), (BURN, 10 ** 18)],
+    [(MINT, 10 ** 15), (MINT, 3 * 10 ** 24), (BURN, 10 ** 23), (MINT, 7)],
+    # burns more LEARN than exists
+    [(MINT, 10 ** 18), (BURN, 10 ** 30), (MINT, 10 ** 18), (MINT, 10 ** 18)],
+    # beyond exp's domain
+    [(BURN, curve_math.K * curve_math.MAX_EXP_INPUT), (MINT, 10 ** 18), (MINT, 10 ** 18), (MINT, 10 ** 18)],
+]
+
+
+def replay(operations, reserve, supply):
+    model = curve_math.LearningCurveModel(reserve, supply, {"holder": supply})
+    outputs = []
+    for kind, amount in operations:
+        try:
+            if kind == MINT:
+                outputs.append(model.mint("holder", amount))
+            else:
+                outputs.append(model.burn("holder", amount))
+        except curve_math.CurveRevert:
+            return outputs + [None] * (len(operations) - len(outputs)), None
+    return outputs, model
+
+
+def test_exact_paths_match_model():
+    reserve, supply = 10 ** 21, 3 * 10 ** 25
+    for operations in PATHS:
+        quote = quote_path(operations, reserve, supply, exact=True)
+        outputs, model = replay(operations, reserve, supply)
+        assert quote.outputs == outputs
+        if model is None:
+            assert quote.reverted_at == outputs.index(None)
+            assert quote.reserve_balance is None
+        else:
+            assert quote.reverted_at is None
+            assert (quote.reserve_balance, quote.total_supply) == (model.reserve_balance, model.total_supply)
+
+
+def test_float_paths_match_exact():
+    reserve, supply = 10 ** 21, 3 * 10 ** 25
+    kinds = [[kind for kind, _ in operations] for operations in PATHS]
+    amounts = [[amount for _, amount in operations] for operations in PATHS]
+    outputs, reserves, supplies, reverted_at = quote_paths(kinds, amounts, reserve, supply)
+    exact = quote_paths(kinds, amounts, reserve, supply, exact=True)
+    assert list(reverted_at) == list(exact[3]) == [-1, -1, 1, 0]
+    for i in range(len(PATHS)):
+        for value, expected in zip(outputs[i], exact[0][i]):
+            if expected is None:
+                assert np.isnan(value)
+            else:
+                assert abs(value - expected) <= 1e-9 * expected + 10 ** 6
+        if reverted_at[i] < 0:
+            assert abs(reserves[i] - exact[1][i]) <= 1e-9 * exact[1][i]
+            assert abs(supplies[i] - exact[2][i]) <= 1e-9 * exact[2][i]
+        else:
+            assert np.isnan(reserves[i]) and exact[1][i] is None
+
+    quote = quote_path(PATHS[0], reserve, supply)
+    assert quote.reverted_at is None and quote.outputs == list(outputs[0])
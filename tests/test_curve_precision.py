@@ -0,0 +1,40 @@
+from scripts import curve_math
+from scripts.curve_precision import ErrorProfiler, sample_points
+from scripts.curve_sweep import BURN_DEVIATION, MINT_DEVIATION
+
+
+def test_profile_is_cached(tmp_path):
+    cache = str(tmp_path / "precision.sqlite")
+    profiler = ErrorProfiler(cache, processes=2)
+    report = profiler.profile(("ln", "exp"), samples_per_cell=2)
+    assert profiler.computed == sum(len(cells) * 2 for cells in report.values())
+    profiler.close()
+
+    profiler = ErrorProfiler(cache, processes=2)
+    assert profiler.profile(("ln", "exp"), samples_per_cell=2) == report
+    assert profiler.computed == 0
+    # more samples per cell only computes the new ones
+    profiler.profile(("ln",), samples_per_cell=3)
+    assert profiler.computed == len(report["ln"])
+
+
+def test_errors_within_sweep_bounds():
+    report = ErrorProfiler(":memory:", processes=2).profile(("mint", "burn"), samples_per_cell=3)
+    for cell in report["mint"]:
+        assert cell["max_abs_error"] <= MINT_DEVIATION
+    for cell in report["burn"]:
+        if "max_abs_error" in cell:
+            reserve_upper_bound = 10 ** (cell["decades"][0] + 1)
+            assert cell["max_abs_error"] <= BURN_DEVIATION * reserve_upper_bound + 2
+    # every truncation in mint is downwards, so it never mints more than the exact curve (up
+    # to the rounding of the reference to whole wei); burn rounds exp's exponent to nearest
+    assert all(cell["max_error"] <= 1 for cell in report["mint"])
+
+
+def test_burns_past_the_exp_limit_revert():
+    report = ErrorProfiler(":memory:", processes=1).profile(("burn",), samples_per_cell=2)
+    limit_decade = len(str(curve_math.MAX_EXP_INPUT * curve_math.K)) - 1
+    for cell in report["burn"]:
+        if cell["decades"][1] > limit_decade:
+            assert cell["reverts"] == cell["samples"]
+    assert sample_points("burn", 2) == sample_points("burn", 2)
@@ -0,0 +1,142 @@
+import brownie
+from brownie import accounts
+from brownie.test import strategy
+import constants_unit
+from scripts import curve_math
+from scripts.permit import sign_permit
+
+ACTORS = 4
+ACTOR_FUNDS = 10 ** 30
+MAX_UINT256 = 2 ** 256 - 1
+# steps between reads of the reserve from the chain
+CHAIN_CHECK_INTERVAL = 50
+
+
+class CurveStateMachine:
+    """
+    Random interleavings of mint, mintForAddress, permitAndMint and burn.
+
+    `curve_math.LearningCurveModel` is the oracle: every step sends one
+    transaction and compares its event with the model's prediction, so the
+    invariants are checked on the model without view calls. The reserve is read
+    from the chain every `CHAIN_CHECK_INTERVAL` steps, so a drift there is caught
+    close to the step that caused it; balances and supply are compared once, at
+    the end of each run.
+    """
+
+    st_actor = strategy("uint8", max_value=ACTORS - 1)
+    st_other = strategy("uint8", max_value=ACTORS - 1)
+    st_wad = strategy("uint256", max_value=10 ** 27)
+    # burn amounts are drawn relative to the balance, up to twice it
+    st_fraction = strategy("uint16")
+
+    def __init__(cls, token, learning_curve, deployer):
+        cls.token = token
+        cls.learning_curve = learning_curve
+        cls.actors = [accounts.add() for _ in range(ACTORS)]
+        for actor in cls.actors:
+            deployer.transfer(actor, "1 ether")
+            token.transfer(actor, ACTOR_FUNDS, {"from": deployer})
+            token.approve(learning_curve, MAX_UINT256, {"from": actor})
+        cls.initial_model = curve_math.LearningCurveModel.from_contract(learning_curve, cls.actors)
+        cls.initial_curve_dai = token.balanceOf(learning_curve)
+
+    def setup(self):
+        self.model = self.initial_model.copy()
+        self.curve_dai = self.initial_curve_dai
+        self.deposited = 0
+        self.returned = 0
+        self.nonces = {actor: 0 for actor in self.actors}
+        self.steps = 0
+
+    def _mint(self, send, learner, wad):
+        """Send a mint of `wad` to `learner`, returning whether it went through."""
+        try:
+            expected = self.model.mint_for_address(learner, wad)
+        except curve_math.CurveRevert as exc:
+            with brownie.reverts(exc.revert_msg):
+                send()
+            return False
+        tx = send()
+        assert tx.events["LearnMinted"]["amountMinted"] == expected
+        self.curve_dai += wad
+        self.deposited += wad
+        # burning what was just minted never returns more than was paid for it
+        assert self.model.copy().burn(learner, expected) <= wad
+        return True
+
+    def rule_mint(self, st_actor, st_wad):
+        actor = self.actors[st_actor]
+        self._mint(lambda: self.learning_curve.mint(st_wad, {"from": actor}), actor, st_wad)
+
+    def rule_mint_for_address(self, st_actor, st_other, st_wad):
+        sender, learner = self.actors[st_actor], self.actors[st_other]
+        self._mint(
+            lambda: self.learning_curve.mintForAddress(learner, st_wad, {"from": sender}),
+            learner,
+            st_wad,
+        )
+
+    def rule_permit_and_mint(self, st_actor, st_wad):
+        actor = self.actors[st_actor]
+        permit = sign_permit(self.token, actor, self.learning_curve, self.nonces[actor])
+        if self._mint(
+            lambda: self.learning_curve.permitAndMint(st_wad, *permit, {"from": actor}),
+            actor,
+            st_wad,
+        ):
+            self.nonces[actor] += 1
+
+    def rule_burn(self, st_actor, st_fraction):
+        actor = self.actors[st_actor]
+        amount = self.model.balance_of(actor) * st_fraction // 2 ** 15
+        try:
+            expected = self.model.burn(actor, amount)
+        except curve_math.CurveRevert as exc:
+            with brownie.reverts(exc.revert_msg):
+                self.learning_curve.burn(amount, {"from": actor})
+            return
+        tx = self.learning_curve.burn(amount, {"from": actor})
+        assert tx.events["LearnBurned"]["daiReturned"] == expected
+        self.curve_dai -= expected
+        self.returned += expected
+
+    def invariant_reserve(self):
+        # reserveBalance == token.balanceOf(learning_curve)
+        assert self.model.reserve_balance == self.curve_dai
+        assert self.model.reserve_balance >= curve_math.INITIAL_RESERVE
+        self.steps += 1
+        if self.steps % CHAIN_CHECK_INTERVAL == 0:
+            assert self.learning_curve.reserveBalance() == self.model.reserve_balance
+            assert self.token.balanceOf(self.learning_curve) == self.curve_dai
+
+    def invariant_no_profit(self):
+        # the actors start without LEARN, so nothing they burn can return more than they put in
+        assert self.returned <= self.deposited
+
+    def invariant_total_supply(self):
+        actors_supply = sum(self.model.balance_of(actor) for actor in self.actors)
+        initial_supply = sum(self.initial_model.balance_of(actor) for actor in self.actors)
+        assert self.model.total_supply - actors_supply == \
+            self.initial_model.total_supply - initial_supply
+
+    def teardown(self):
+        assert self.learning_curve.reserveBalance() == self.model.reserve_balance
+        assert self.token.balanceOf(self.learning_curve) == self.curve_dai
+        assert self.learning_curve.totalSupply() == self.model.total_supply
+        for actor in self.actors:
+            assert self.learning_curve.balanceOf(actor) == self.model.balance_of(actor)
+
+
+def test_curve_state_machine(state_machine, contracts, token, deployer):
+    _, learning_curve = contracts
+    state_machine(
+        CurveStateMachine,
+        token,
+        learning_curve,
+        deployer,
+        settings={
+            "max_examples": constants_unit.FUZZ_EXAMPLES,
+            "stateful_step_count": constants_unit.FUZZ_STEPS,
+        },
+    )
@@ -0,0 +1,48 @@
+import numpy as np
+
+from scripts import curve_math, curve_sweep
+
+RESERVES = np.array([10 ** 18, 3 * 10 ** 21, 10 ** 30, 2 ** 200], dtype=object)
+MINT_AMOUNTS = np.array([1, 10 ** 18, 10 ** 22, 10 ** 40, 2 ** 250], dtype=object)
+BURN_AMOUNTS = np.array([1, 10 ** 4, 10 ** 18, 10 ** 22, 887 * 10 ** 21, 10 ** 30], dtype=object)
+
+
+def exact_or_none(fn, *args):
+    try:
+        return fn(*args)
+    except curve_math.CurveRevert:
+        return None
+
+
+def test_exact_sweep_matches_model():
+    minted = curve_sweep.mint_sweep(RESERVES[:, None], MINT_AMOUNTS[None, :], tolerance=0)
+    returned = curve_sweep.burn_sweep(RESERVES[:, None], BURN_AMOUNTS[None, :], tolerance=0)
+    for i, reserve in enumerate(RESERVES):
+        for j, amount in enumerate(MINT_AMOUNTS):
+            assert minted[i, j] == exact_or_none(curve_math.mintable_for_reserve_amount, reserve, amount)
+        for j, amount in enumerate(BURN_AMOUNTS):
+            assert returned[i, j] == exact_or_none(curve_math.predicted_burn, reserve, amount)
+
+
+def test_float_sweep_within_tolerance():
+    tolerance = 10 ** 7
+    reserves = np.logspace(18, 26, 40)
+    amounts = np.logspace(10, 26, 40)
+    minted = curve_sweep.mint_sweep(reserves[:, None], amounts[None, :], tolerance=tolerance)
+    returned = curve_sweep.burn_sweep(reserves[:, None], amounts[None, :], tolerance=tolerance)
+    for i, reserve in enumerate(reserves):
+        for j, amount in enumerate(amounts):
+            expected = curve_math.mintable_for_reserve_amount(int(reserve), int(amount))
+            assert abs(minted[i, j] - expected) <= tolerance
+            expected = exact_or_none(curve_math.predicted_burn, int(reserve), int(amount))
+            if expected is None:
+                assert returned[i, j] is None
+            else:
+                assert abs(returned[i, j] - expected) <= tolerance
+
+
+def test_float_sweep_marks_reverts():
+    minted = curve_sweep.mint_sweep([0, 10 ** 18], [10 ** 18, 2 ** 255])
+    assert np.isnan(minted).all()
+    returned = curve_sweep.burn_sweep(10 ** 18, [curve_math.K * curve_math.MAX_EXP_INPUT, 10 ** 18])
+    assert np.isnan(returned[0]) and not np.isnan(returned[1])
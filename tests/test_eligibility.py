@@ -0,0 +1,44 @@
+import brownie
+import constants_unit
+
+from scripts.eligibility import EligibilityScheduler
+from scripts.fast_forward import fast_forward
+from scripts.indexer import EventIndexer
+
+
+def test_fires_as_learners_become_eligible(contracts_with_learners, learners):
+    deschool, learning_curve = contracts_with_learners
+    indexer = EventIndexer(":memory:", deschool, learning_curve)
+    indexer.sync()
+    fired = []
+    scheduler = EligibilityScheduler.from_index(indexer, lambda *args: fired.append(args))
+    first = scheduler.next_block()
+    assert scheduler.step() == []
+
+    # one block short, the next transaction can't redeem yet
+    fast_forward(first - brownie.chain.height - 2)
+    assert scheduler.step() == []
+    with brownie.reverts("redeem: not yet eligible - wait for the full course duration to pass"):
+        deschool.redeem(0, {"from": learners[0]})
+
+    fast_forward(constants_unit.DURATION)
+    assert sorted(learner for _, learner, _ in scheduler.step()) == sorted(str(learner) for learner in learners)
+    assert fired[0][2] == first
+    for _, learner, _ in fired:
+        assert deschool.verify(learner, 0)
+    assert scheduler.step() == [] and scheduler.next_block() is None
+
+
+def test_settled_learners_never_fire(contracts_with_learners, learners):
+    deschool, learning_curve = contracts_with_learners
+    indexer = EventIndexer(":memory:", deschool, learning_curve)
+    indexer.sync()
+    scheduler = EligibilityScheduler.from_index(indexer, lambda *args: None)
+    fast_forward(constants_unit.DURATION)
+    deschool.redeem(0, {"from": learners[0]})
+    deschool.mint(0, {"from": learners[1]})
+
+    fired = scheduler.step()
+    assert sorted(learner for _, learner, _ in fired) == sorted(str(learner) for learner in learners[2:])
+    for _, learner, _ in fired:
+        deschool.redeem(0, {"from": learner})
@@ -0,0 +1,36 @@
+import brownie
+import constants_unit
+import pytest
+
+from scripts.fast_forward import fast_forward
+
+
+def test_fast_forward_mines_exactly(contracts_with_learners, learners):
+    deschool, learning_curve = contracts_with_learners
+    height = brownie.chain.height
+    # the last learner to register becomes eligible DURATION + 1 blocks after registering
+    last = max(learners, key=lambda learner: deschool.getBlockRegistered(learner, 0))
+    assert fast_forward(constants_unit.DURATION - 1) == height + constants_unit.DURATION - 1
+    assert fast_forward(0) == brownie.chain.height
+    assert not deschool.verify(last, 0)
+    fast_forward(1)
+    assert deschool.verify(last, 0)
+    with pytest.raises(ValueError):
+        fast_forward(-1)
+
+
+def test_fast_forward_undo_redo(token, deployer, hackerman):
+    height = brownie.chain.height
+    token.transfer(hackerman, 1, {"from": deployer})
+    fast_forward(100)
+    assert brownie.chain.height == height + 101
+    # undoing the transaction drops the blocks mined after it too
+    assert brownie.chain.undo() == height
+    assert token.balanceOf(hackerman) == 0
+    assert brownie.chain.redo() == height + 1
+    assert token.balanceOf(hackerman) == 1
+
+    brownie.chain.undo()
+    fast_forward(10)
+    with pytest.raises(ValueError, match="Redo buffer is empty"):
+        brownie.chain.redo()
@@ -0,0 +1,24 @@
+import constants_unit
+
+from scripts.flash_scenarios import ORDERS, burn_order, explore, replay_on_chain, run_scenario
+
+SCENARIO = (int(constants_unit.MALICIOUS_AMOUNT), 3, int(constants_unit.MINT_AMOUNT), "whale_last_reversed")
+
+
+def test_explore_grid():
+    rows = explore(whales=[0, 10 ** 24], learner_counts=[1, 4], learner_amounts=[10 ** 20], processes=2)
+    assert len(rows) == 2 * 2 * len(ORDERS)
+    assert rows == explore(whales=[0, 10 ** 24], learner_counts=[1, 4], learner_amounts=[10 ** 20], processes=1)
+    for row in rows:
+        assert row["reverted"] == ""
+        # the curve never pays out more than it took in, so someone's gain is someone else's loss
+        assert row["whale_pnl"] + row["learner_pnl_total"] <= 0
+        assert row["learner_pnl_min"] <= row["learner_pnl_max"]
+        assert row == run_scenario((row["whale_amount"], row["learners"], row["learner_amount"], row["order"]))
+    for order in ORDERS:
+        assert sorted(burn_order(order, 4), key=str) == [0, 1, 2, 3, "whale"]
+
+
+def test_model_matches_chain(contracts, token, deployer, hackerman, learners):
+    _, learning_curve = contracts
+    assert replay_on_chain(SCENARIO, learning_curve, token, deployer, hackerman, learners) == run_scenario(SCENARIO)
@@ -0,0 +1,61 @@
+from scripts.gas_benchmark import compare, format_gas_report, is_generated, parse_gas_report, replace_gas_report
+
+REPORT = {
+    "LearningCurve": {
+        "mint": {"min": 61356, "avg": 61697, "max": 62166},
+        "burn": {"min": 65642, "avg": 65850, "max": 66346},
+    },
+    "DeSchool": {
+        "register": {"min": 22511, "avg": 59684, "max": 86669},
+        "constructor": {"min": 2722866, "avg": 2722866, "max": 2722866},
+    },
+}
+
+
+def _readme(block):
+    return "# README\n\n## Current gas report\n```\n" + block + "```\n\nmore text\n"
+
+
+def test_format_parse_round_trip():
+    pasted = _readme("DeSchool <Contract>\n")
+    assert not is_generated(pasted)
+    readme = replace_gas_report(pasted, format_gas_report(REPORT))
+    assert readme.endswith("```\n\nmore text\n") and is_generated(readme)
+    baseline = parse_gas_report(readme)
+    assert sorted(baseline) == ["DeSchool", "LearningCurve"]
+    for contract, functions in REPORT.items():
+        for fn_name, stats in functions.items():
+            assert baseline[contract][fn_name] == {
+                "avg": stats["avg"],
+                "avg (confirmed)": stats["avg"],
+                "low": stats["min"],
+                "high": stats["max"],
+            }
+
+
+def test_format_orders_contracts_and_functions():
+    report = dict(REPORT, MockVault={"deposit": {"min": 1, "avg": 2, "max": 3}})
+    lines = format_gas_report(report).splitlines()
+    contracts = [line for line in lines if line.endswith("<Contract>")]
+    assert contracts == ["DeSchool <Contract>", "LearningCurve <Contract>", "MockVault <Contract>"]
+    assert lines[2].split()[1] == "constructor" and lines[3].split()[0] == "└─"
+    assert parse_gas_report(_readme(format_gas_report(report)))["MockVault"]["deposit"]["high"] == 3
+
+
+def test_compare_flags_regressions_beyond_threshold():
+    baseline = parse_gas_report(_readme(format_gas_report(REPORT)))
+    report = {
+        "LearningCurve": {
+            # avg 4% up, within 5%
+            "mint": {"min": 61356, "avg": 64164, "max": 62166},
+            # max 6% up
+            "burn": {"min": 65642, "avg": 65850, "max": 70327},
+            # not in the baseline, never a regression
+            "permitAndMint": {"min": 10 ** 6, "avg": 10 ** 6, "max": 10 ** 6},
+        },
+        "MockVault": {"deposit": {"min": 1, "avg": 2, "max": 3}},
+    }
+    regressions = compare(report, baseline, 5)
+    assert len(regressions) == 1 and regressions[0].startswith("LearningCurve.burn max: 70327 > 66346")
+    assert compare(report, baseline, 7) == []
+    assert len(compare(report, baseline, 3)) == 2
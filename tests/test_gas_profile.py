@@ -0,0 +1,52 @@
+from scripts.gas_profile import INTRINSIC, GasProfile, profile_curve, step_costs
+
+
+def step(op, gas, gas_cost, depth=0, fn="LearningCurve.mint", jump_depth=0):
+    return {"op": op, "gas": gas, "gasCost": gas_cost, "depth": depth, "fn": fn, "jumpDepth": jump_depth,
+            "source": False}
+
+
+def test_step_costs_and_stacks():
+    trace = [
+        step("PUSH1", 1000, 3),
+        step("JUMP", 997, 8),
+        step("ADD", 989, 3, fn="PRBMathUD60x18.ln", jump_depth=1),
+        step("JUMP", 986, 8, fn="PRBMath.mostSignificantBit", jump_depth=2),
+        step("JUMP", 978, 8, fn="PRBMathUD60x18.ln", jump_depth=1),
+        # a call forwarding 500 gas, of which the callee uses 120
+        step("CALL", 970, 600, fn="LearningCurve.mint"),
+        step("PUSH1", 500, 3, depth=1, fn="Dai.transferFrom"),
+        step("SSTORE", 497, 100, depth=1, fn="Dai.transferFrom"),
+        step("RETURN", 397, 17, depth=1, fn="Dai.transferFrom"),
+        step("POP", 230, 2),
+        step("STOP", 228, 0),
+    ]
+    costs = step_costs(trace)
+    assert costs == [3, 8, 3, 8, 8, 740 - 120, 3, 100, 17, 2, 0]
+
+    profile = GasProfile()
+    profile.add_trace(trace, 21000 + sum(costs), "mint")
+    profile.add_trace(trace, 21000 + sum(costs), "mint")
+    assert profile.stacks[("mint", "LearningCurve.mint")] == 2 * (3 + 8 + 620 + 2)
+    assert profile.stacks[("mint", "LearningCurve.mint", "PRBMathUD60x18.ln")] == 2 * (3 + 8)
+    assert profile.stacks[("mint", "LearningCurve.mint", "PRBMathUD60x18.ln", "PRBMath.mostSignificantBit")] == 16
+    assert profile.stacks[("mint", "LearningCurve.mint", "Dai.transferFrom")] == 2 * 120
+    assert profile.stacks[("mint", INTRINSIC)] == 2 * 21000
+    assert sum(profile.stacks.values()) == profile.gas_used["mint"]
+
+    summary = profile.summary()
+    assert summary["transactions"]["mint"] == {"count": 2, "avg_gas_used": 21000 + sum(costs)}
+    assert summary["functions"]["PRBMathUD60x18.ln"]["inclusive"] == 2 * (3 + 8) + 16
+    assert "mint;LearningCurve.mint;PRBMathUD60x18.ln;PRBMath.mostSignificantBit 16\n" in profile.folded()
+
+
+def test_profile_curve(contracts, token, deployer):
+    deschool, learning_curve = contracts
+    profile = profile_curve(learning_curve, token, deployer, reserves=(10 ** 18, 10 ** 21), wads=(10 ** 18,))
+    assert profile.transactions == {"mint": 2, "burn": 2}
+    for label in ("mint", "burn"):
+        assert sum(gas for stack, gas in profile.stacks.items() if stack[0] == label) == profile.gas_used[label]
+    functions = profile.summary()["functions"]
+    assert functions["PRBMathUD60x18.ln"]["inclusive"] > 0
+    assert functions["PRBMathUD60x18.exp"]["inclusive"] > 0
+    assert any(line.startswith("contracts/PRBMath") for _, line in profile.lines)
@@ -0,0 +1,49 @@
+import brownie
+import constants_unit
+
+from scripts.fast_forward import fast_forward
+from scripts.history import StateHistory
+from scripts.indexer import EventIndexer
+
+
+def test_state_at_past_blocks(contracts_with_learners, token, deployer, learners):
+    deschool, learning_curve = contracts_with_learners
+    first_block = brownie.chain.height
+    fast_forward(constants_unit.DURATION)
+    deschool.mint(0, {"from": learners[0]})
+    learning_curve.transfer(learners[1], learning_curve.balanceOf(learners[0]) // 3, {"from": learners[0]})
+    learning_curve.burn(learning_curve.balanceOf(learners[1]), {"from": learners[1]})
+    token.approve(learning_curve, constants_unit.MINT_AMOUNT, {"from": deployer})
+    learning_curve.mint(constants_unit.MINT_AMOUNT, {"from": deployer})
+
+    indexer = EventIndexer(":memory:", deschool, learning_curve)
+    indexer.sync()
+    # checkpoints every couple of events, so queries replay from one
+    history = StateHistory(indexer, interval=2)
+    assert len(history.checkpoints) > 2
+
+    for block in [first_block] + list(range(brownie.chain.height - 5, brownie.chain.height + 1)):
+        assert history.reserve_balance(block) == learning_curve.reserveBalance(block_identifier=block)
+        assert history.total_supply(block) == learning_curve.totalSupply(block_identifier=block)
+        batch_id = deschool.getCurrentBatchId(block_identifier=block)
+        assert history.batch_total(batch_id, block) == deschool.getCurrentBatchTotal(block_identifier=block)
+        state = history.state_at(block)
+        for account in [learning_curve, deployer] + list(learners[:2]):
+            balance = learning_curve.balanceOf(account, block_identifier=block)
+            assert history.balance_of(account, block) == state.balances.get(str(account), 0) == balance
+
+
+def test_update_folds_new_blocks(contracts_with_learners, token, deployer, learners, tmp_path):
+    deschool, learning_curve = contracts_with_learners
+    indexer = EventIndexer(str(tmp_path / "events.sqlite"), deschool, learning_curve)
+    indexer.sync()
+    history = StateHistory(indexer)
+    before = brownie.chain.height
+    assert history.batch_total(0, before) == constants_unit.STAKE * len(learners)
+
+    token.approve(learning_curve, constants_unit.MINT_AMOUNT, {"from": deployer})
+    learning_curve.mint(constants_unit.MINT_AMOUNT, {"from": deployer})
+    indexer.sync()
+    assert history.update() == brownie.chain.height
+    assert history.reserve_balance(brownie.chain.height) == learning_curve.reserveBalance()
+    assert history.reserve_balance(before) == learning_curve.reserveBalance(block_identifier=before)
@@ -0,0 +1,40 @@
+import brownie
+import constants_unit
+
+from scripts.fast_forward import fast_forward
+from scripts.indexer import EventIndexer
+
+
+def test_index_courses_and_learners(contracts_with_learners, learners, tmp_path):
+    deschool, learning_curve = contracts_with_learners
+    indexer = EventIndexer(str(tmp_path / "events.sqlite"), deschool, learning_curve, page_size=5)
+    indexer.sync()
+
+    assert indexer.last_block == brownie.chain.height
+    assert indexer.learners_in_course(0) == [str(learner) for learner in learners]
+    assert indexer.learners_in_course(1) == []
+    assert indexer.course(0)["stake"] == constants_unit.STAKE
+    assert indexer.course(4)["url"] == constants_unit.URL
+    # no deposits yet, so everyone is in the first batch
+    assert len(indexer.unredeemed_learners_in_batch(0)) == len(learners)
+
+
+def test_index_resumes_from_checkpoint(contracts_with_learners, learners, token, tmp_path):
+    deschool, learning_curve = contracts_with_learners
+    db_path = str(tmp_path / "events.sqlite")
+    indexer = EventIndexer(db_path, deschool, learning_curve)
+    indexer.sync()
+    indexer.close()
+
+    fast_forward(constants_unit.DURATION)
+    deschool.redeem(0, {"from": learners[0]})
+    deschool.mint(0, {"from": learners[1]})
+
+    indexer = EventIndexer(db_path, deschool, learning_curve)
+    indexed_before = indexer.last_block
+    indexer.sync()
+
+    assert indexed_before < indexer.last_block == brownie.chain.height
+    assert indexer.unredeemed_learners_in_batch(0) == [(0, str(learner)) for learner in learners[2:]]
+    (mint,) = indexer.db.execute("SELECT account, dai_amount FROM curve_events WHERE kind = 'mint'")
+    assert mint == (str(learners[1]), str(int(constants_unit.STAKE)))
@@ -0,0 +1,16 @@
+from scripts.load_generator import LoadGenerator
+
+
+def test_load_generator(deployer):
+    report = LoadGenerator(deployer, courses=3, learners=12, workers=4, batches=2).run()
+    operations = report["operations"]
+
+    assert sorted(operations) == ["batchDeposit", "mint", "permitAndRegister", "redeem", "register"]
+    assert all(summary["errors"] == 0 for summary in operations.values())
+    assert operations["register"]["count"] == operations["permitAndRegister"]["count"] == 6
+    assert operations["mint"]["count"] == operations["redeem"]["count"] == 6
+    assert operations["batchDeposit"]["count"] == 2
+    for summary in operations.values():
+        assert summary["tx_per_s"] > 0
+        assert summary["latency_s"]["p50"] <= summary["latency_s"]["p99"]
+        assert summary["gas_total"] >= summary["gas_avg"] * summary["count"]
@@ -1,6 +1,7 @@
-import brownie
 import constants_unit
 
+from scripts.fast_forward import fast_forward
+
 
 def test_full(deployer, learners, steward, contracts, token):
     deschool, learning_curve = contracts
@@ -37,7 +38,7 @@ def test_full(deployer, learners, steward, contracts, token):
     assert deschool.getCurrentBatchTotal() == constants_unit.STAKE * len(learners)
     assert token.balanceOf(deschool) == constants_unit.STAKE * len(learners)
 
-    brownie.chain.mine(constants_unit.DURATION)
+    fast_forward(constants_unit.DURATION)
 
     assert deschool.verify(learners[0], 0, {"from": steward})
 
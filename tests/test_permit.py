@@ -0,0 +1,32 @@
+from eth_account import Account
+from eth_keys import keys
+
+from scripts.permit import POOL_THRESHOLD, PermitSigner, permit_digest
+
+
+def test_sign_many_across_pool(contracts, token, deployer):
+    _, learning_curve = contracts
+    holders = [Account.create() for _ in range(100)]
+    signers = holders * 3
+    assert len(signers) > POOL_THRESHOLD
+
+    pooled, local = PermitSigner(token, processes=2), PermitSigner(token, processes=1)
+    for signer in (pooled, local):
+        # fresh accounts, so spare the nonce lookups
+        signer.nonces.update(dict.fromkeys((holder.address for holder in holders), 0))
+    permits = pooled.sign_many(signers, learning_curve)
+    assert permits == local.sign_many(signers, learning_curve)
+    assert pooled.nonces == dict.fromkeys((holder.address for holder in holders), 3)
+
+    for n, (holder, (nonce, expiry, v, r, s)) in enumerate(zip(signers, permits)):
+        assert nonce == n // len(holders)
+        digest = permit_digest(pooled.domain_separator, holder.address, learning_curve, nonce, expiry)
+        signature = keys.Signature(vrs=(v - 27, r, s))
+        assert signature.recover_public_key_from_msg_hash(digest).to_checksum_address() == holder.address
+
+    # and the token takes them, in nonce order
+    holder = holders[0]
+    for nonce, expiry, v, r, s in permits[::len(holders)]:
+        token.permit(holder.address, learning_curve, nonce, expiry, True, v, r, s, {"from": deployer})
+    assert token.nonces(holder.address) == 3
+    assert token.allowance(holder.address, learning_curve) == 2 ** 256 - 1
@@ -0,0 +1,51 @@
+import pytest
+import constants_unit
+from brownie import web3
+
+from scripts.tx_sender import SendError, TxSender
+
+
+def test_send_across_accounts(contracts_with_courses, token, deployer, learners):
+    deschool, learning_curve = contracts_with_courses
+    sender = TxSender(workers=3)
+    receipts = sender.send(
+        [(token.transfer, learner, constants_unit.STAKE, {"from": deployer}) for learner in learners]
+        + [(token.approve, deschool, constants_unit.STAKE, {"from": learner}) for learner in learners]
+    )
+    assert [tx.fn_name for tx in receipts] == ["transfer"] * len(learners) + ["approve"] * len(learners)
+    assert [tx.nonce for tx in receipts[:len(learners)]] == sorted(tx.nonce for tx in receipts[:len(learners)])
+
+    receipts = sender.send((deschool.register, n % 2, {"from": learner}) for n, learner in enumerate(learners))
+    for n, (learner, tx) in enumerate(zip(learners, receipts)):
+        assert tx.events["LearnerRegistered"]["learner"] == learner
+        assert tx.events["LearnerRegistered"]["courseId"] == n % 2
+        assert sender.nonces[learner.address] == web3.eth.get_transaction_count(learner.address)
+    assert token.balanceOf(deschool) == constants_unit.STAKE * len(learners)
+
+
+def test_failed_calls(contracts_with_courses, token, deployer, learners):
+    deschool, learning_curve = contracts_with_courses
+    sender = TxSender()
+    first, second = learners[:2]
+    token.transfer(first, constants_unit.STAKE, {"from": deployer})
+    with pytest.raises(SendError) as exc:
+        sender.send(
+            [
+                (token.approve, deschool, constants_unit.STAKE, {"from": first}),
+                # second has no DAI to stake
+                (deschool.register, 0, {"from": second}),
+            ]
+        )
+    approval, failed = exc.value.receipts
+    assert approval.status == 1
+    assert failed is None or failed.status == 0
+    assert len(exc.value.failures) == 1
+
+    # whether or not the failed call used its nonce, both accounts carry on
+    receipts = sender.send(
+        [
+            (deschool.register, 0, {"from": first}),
+            (token.approve, deschool, constants_unit.STAKE, {"from": second}),
+        ]
+    )
+    assert [tx.status for tx in receipts] == [1, 1]
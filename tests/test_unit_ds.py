@@ -3,9 +3,9 @@ from brownie import LearningCurve, DeSchool
 import constants_unit
 
 from eth_account import Account
-from eth_account._utils.structured_data.hashing import hash_domain
-from eth_account.messages import encode_structured_data
-from eth_utils import encode_hex
+
+from scripts.fast_forward import fast_forward
+from scripts.permit import sign_permit
 
 
 def test_register_permit(contracts_with_courses, learners, token, deployer):
@@ -14,10 +14,9 @@ def test_register_permit(contracts_with_courses, learners, token, deployer):
     holder = signer.address
     token.transfer(holder, constants_unit.STAKE, {"from": deployer})
     assert token.balanceOf(holder) == constants_unit.STAKE
-    permit = build_permit(holder, str(deschool), token, 3600)
-    signed = signer.sign_message(permit)
+    permit = sign_permit(token, signer, deschool)
     print(token.balanceOf(deschool.address))
-    tx = deschool.permitAndRegister(0, 0, 0, signed.v, signed.r, signed.s, {"from": holder})
+    tx = deschool.permitAndRegister(0, *permit, {"from": holder})
     print(token.balanceOf(deschool.address))
     print(deschool.getYieldRewards(deployer.address))
     assert "LearnerRegistered" in tx.events
@@ -106,7 +105,7 @@ def test_register_malicious(contracts_with_courses, token, deployer, hackerman):
 
 def test_mint(contracts_with_learners, learners, token, deployer):
     deschool, learning_curve = contracts_with_learners
-    brownie.chain.mine(constants_unit.DURATION)
+    fast_forward(constants_unit.DURATION)
     for n, learner in enumerate(learners):
         assert deschool.verify(learner, 0)
         mintable_balance = learning_curve.getMintableForReserveAmount(constants_unit.STAKE)
@@ -126,14 +125,14 @@ def test_mint_malicious(contracts_with_learners, hackerman, learners):
     deschool, learning_curve = contracts_with_learners
     with brownie.reverts("mint: not a learner on this course"):
         deschool.mint(0, {"from": hackerman})
-    brownie.chain.mine(constants_unit.COURSE_RUNNING)
+    fast_forward(constants_unit.COURSE_RUNNING)
     with brownie.reverts("mint: not yet eligible - wait for the full course duration to pass"):
         deschool.mint(0, {"from": learners[0]})
 
 
 def test_redeem(contracts_with_learners, learners, token, kernelTreasury):
     deschool, learning_curve = contracts_with_learners
-    brownie.chain.mine(constants_unit.DURATION)
+    fast_forward(constants_unit.DURATION)
     for n, learner in enumerate(learners):
         kt_dai_balance = token.balanceOf(kernelTreasury)
         ds_dai_balance = token.balanceOf(deschool)
@@ -150,7 +149,7 @@ def test_redeem_malicious(hackerman, contracts_with_learners, learners):
     deschool, learning_curve = contracts_with_learners
     with brownie.reverts("redeem: not a learner on this course"):
         deschool.redeem(0, {"from": hackerman})
-    brownie.chain.mine(constants_unit.COURSE_RUNNING)
+    fast_forward(constants_unit.COURSE_RUNNING)
     with brownie.reverts("redeem: not yet eligible - wait for the full course duration to pass"):
         deschool.redeem(0, {"from": learners[0]})
 
@@ -159,7 +158,7 @@ def test_verify(contracts_with_learners, learners):
     deschool, learning_curve = contracts_with_learners
     learner = learners[0]
     assert not(deschool.verify(learner, 0, {"from": learner}))
-    brownie.chain.mine(constants_unit.DURATION)
+    fast_forward(constants_unit.DURATION)
     assert deschool.verify(learner, 0, {"from": learner})
 
 
@@ -197,42 +196,6 @@ def test_mint_lc_not_initialised(token, deployer, steward, learners):
         )
         token.approve(deschool, constants_unit.STAKE, {"from": learner})
         deschool.register(0, {"from": learner})
-        brownie.chain.mine(constants_unit.DURATION)
+        fast_forward(constants_unit.DURATION)
         with brownie.reverts("!initialised"):
             deschool.mint(0, {"from": learner})
-
-
-def build_permit(holder, spender, token, expiry):
-    data = {
-        "types": {
-            "EIP712Domain": [
-                {"name": "name", "type": "string"},
-                {"name": "version", "type": "string"},
-                {"name": "chainId", "type": "uint256"},
-                {"name": "verifyingContract", "type": "address"},
-            ],
-            "Permit": [
-                {"name": "holder", "type": "address"},
-                {"name": "spender", "type": "address"},
-                {"name": "nonce", "type": "uint256"},
-                {"name": "expiry", "type": "uint256"},
-                {"name": "allowed", "type": "bool"},
-            ],
-        },
-        "domain": {
-            "name": token.name(),
-            "version": token.version(),
-            "chainId": 1,
-            "verifyingContract": str(token),
-        },
-        "primaryType": "Permit",
-        "message": {
-            "holder": holder,
-            "spender": spender,
-            "nonce": token.nonces(holder),
-            "expiry": 0,
-            "allowed": True,
-        },
-    }
-    assert encode_hex(hash_domain(data)) == token.DOMAIN_SEPARATOR()
-    return encode_structured_data(data)
\ No newline at end of file
@@ -0,0 +1,60 @@
+import brownie
+import constants_unit
+
+from scripts.view_cache import BlockClock, CachedContract
+
+
+def test_views_cached_until_a_transaction(contracts, token, deployer):
+    deschool, learning_curve = contracts
+    clock = BlockClock(max_age=3600)
+    cached_lc, cached_ds = CachedContract(learning_curve, clock), CachedContract(deschool, clock)
+    reserve = cached_lc.reserveBalance()
+    assert cached_lc.reserveBalance() == reserve
+    assert cached_lc.balanceOf(learning_curve) == cached_lc.balanceOf(learning_curve.address)
+    assert cached_ds.getCurrentBatchId() == cached_ds.getCurrentBatchId() == 0
+    assert (cached_lc.hits, cached_lc.misses) == (2, 2)
+
+    token.approve(learning_curve, constants_unit.MINT_AMOUNT, {"from": deployer})
+    cached_lc.mint(constants_unit.MINT_AMOUNT, {"from": deployer})
+    assert cached_lc.reserveBalance() == reserve + constants_unit.MINT_AMOUNT
+    assert cached_lc.balanceOf(deployer) == learning_curve.balanceOf(deployer) > 0
+    # reads at a past block are cached whatever happens after
+    assert cached_lc.reserveBalance(block_identifier=brownie.chain.height - 2) == reserve
+
+
+def test_revert_invalidates(contracts, token, deployer):
+    deschool, learning_curve = contracts
+    cached = CachedContract(learning_curve, BlockClock(max_age=3600))
+    brownie.chain.snapshot()
+    token.approve(learning_curve, constants_unit.MINT_AMOUNT, {"from": deployer})
+    learning_curve.mint(constants_unit.MINT_AMOUNT, {"from": deployer})
+    minted = cached.totalSupply()
+    brownie.chain.revert()
+    assert cached.totalSupply() == learning_curve.totalSupply() < minted
+
+
+def test_blocks_mined_elsewhere(contracts, token, deployer):
+    deschool, learning_curve = contracts
+    cached = CachedContract(learning_curve, BlockClock(max_age=3600))
+    polled = CachedContract(learning_curve, BlockClock(max_age=0))
+    supply = learning_curve.totalSupply()
+    token.approve(learning_curve, constants_unit.MINT_AMOUNT, {"from": deployer})
+    height = brownie.chain.height
+    reserve = cached.reserveBalance()
+    assert polled.reserveBalance() == reserve
+
+    # a mint this process didn't send, so the clock doesn't see its block
+    brownie.web3.eth.send_transaction(
+        {
+            "from": deployer.address,
+            "to": learning_curve.address,
+            "data": learning_curve.mint.encode_input(constants_unit.MINT_AMOUNT),
+        }
+    )
+    assert brownie.chain.height == height + 1
+    assert cached.reserveBalance() == reserve
+    assert polled.reserveBalance() == reserve + constants_unit.MINT_AMOUNT
+    # read at the head, a block past the clock, and not served for the clock's block
+    assert cached.totalSupply() > supply
+    assert cached.totalSupply(block_identifier=height) == supply
+    assert cached.totalSupply(block_identifier=height + 1) > supply